@@ -7,20 +7,25 @@ env_path = Path(__file__).parent / '.env'
 if env_path.exists():
     load_dotenv(dotenv_path=env_path, override=True)
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from backend.graph import Graph
 from backend.services.websocket_manager import WebSocketManager
 import logging
 import uvicorn
-from datetime import datetime
 import asyncio
+import json
 import uuid
-from collections import defaultdict
+from datetime import datetime
+from typing import List, Literal
+from contextlib import asynccontextmanager
 from backend.services.mongodb import MongoDBService
+from backend.services.clients import get_clients
+from backend.services.job_backend import InMemoryJobBackend, create_job_backend
 from backend.services.pdf_service import PDFService
+from backend.utils.tokens import start_loading_tokenizer
 
 # Configure logging
 logger = logging.getLogger()
@@ -28,7 +33,37 @@ logger.setLevel(logging.INFO)
 console_handler = logging.StreamHandler()
 logger.addHandler(console_handler)
 
-app = FastAPI(title="Tavily Company Research API")
+job_backend = InMemoryJobBackend()
+manager = WebSocketManager(backend=job_backend)
+pdf_service = PDFService({"pdf_output_dir": "pdfs"})
+
+async def connect_job_backend():
+    """Share job state through Redis when REDIS_URL is set and the server answers."""
+    global job_backend
+    if not (redis_url := os.getenv("REDIS_URL")):
+        return
+    try:
+        backend = create_job_backend(redis_url)
+        # Connections are lazy, so only a round trip tells whether Redis is up
+        await backend.ping()
+    except Exception as e:
+        logger.warning(f"Failed to connect to Redis: {e}. Job state stays local to this worker.")
+        return
+    job_backend = manager.backend = backend
+    logger.info("Redis job backend enabled")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_job_backend()
+    await manager.start()
+    # Token counts are estimated until the tokenizer has loaded
+    start_loading_tokenizer()
+    yield
+    await manager.stop()
+    await job_backend.close()
+    await get_clients().aclose()
+
+app = FastAPI(title="Tavily Company Research API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,19 +73,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-manager = WebSocketManager()
-pdf_service = PDFService({"pdf_output_dir": "pdfs"})
-
-job_status = defaultdict(lambda: {
-    "status": "pending",
-    "result": None,
-    "error": None,
-    "debug_info": [],
-    "company": None,
-    "report": None,
-    "last_update": datetime.now().isoformat()
-})
-
 mongodb = None
 if mongo_uri := os.getenv("MONGODB_URI"):
     try:
@@ -59,11 +81,22 @@ if mongo_uri := os.getenv("MONGODB_URI"):
     except Exception as e:
         logger.warning(f"Failed to initialize MongoDB: {e}. Continuing without persistence.")
 
+# Statuses after which a job emits no further events
+TERMINAL_STATUSES = {"completed", "failed"}
+SSE_KEEPALIVE_SECONDS = 15
+MAX_POLL_TIMEOUT_SECONDS = 60
+
 class ResearchRequest(BaseModel):
     company: str
     company_url: str | None = None
     industry: str | None = None
     hq_location: str | None = None
+    # Overall time budget in seconds; stages degrade to finish within it
+    deadline_s: float | None = Field(default=None, gt=0)
+    # Research depth preset: "fast", "standard" or "deep"
+    depth: Literal["fast", "standard", "deep"] = "standard"
+    # Report sections to research; all of them when omitted
+    categories: List[Literal["company", "industry", "financial", "news"]] | None = Field(default=None, min_length=1)
 
 class PDFGenerationRequest(BaseModel):
     report_content: str
@@ -86,13 +119,16 @@ async def research(data: ResearchRequest):
     try:
         logger.info(f"Received research request for {data.company}")
         job_id = str(uuid.uuid4())
+        await job_backend.update_job(job_id, company=data.company)
         asyncio.create_task(process_research(job_id, data))
 
         response = JSONResponse(content={
             "status": "accepted",
             "job_id": job_id,
             "message": "Research started. Connect to WebSocket for updates.",
-            "websocket_url": f"/research/ws/{job_id}"
+            "websocket_url": f"/research/ws/{job_id}",
+            "events_url": f"/research/{job_id}/events",
+            "poll_url": f"/research/{job_id}/events/poll"
         })
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
@@ -109,6 +145,7 @@ async def process_research(job_id: str, data: ResearchRequest):
             mongodb.create_job(job_id, data.dict())
         await asyncio.sleep(1)  # Allow WebSocket connection
 
+        await job_backend.update_job(job_id, status="processing")
         await manager.send_status_update(job_id, status="processing", message="Starting research")
 
         graph = Graph(
@@ -116,6 +153,9 @@ async def process_research(job_id: str, data: ResearchRequest):
             url=data.company_url,
             industry=data.industry,
             hq_location=data.hq_location,
+            deadline_s=data.deadline_s,
+            depth=data.depth,
+            categories=data.categories,
             websocket_manager=manager,
             job_id=job_id
         )
@@ -128,12 +168,12 @@ async def process_research(job_id: str, data: ResearchRequest):
         report_content = state.get('report') or (state.get('editor') or {}).get('report')
         if report_content:
             logger.info(f"Found report in final state (length: {len(report_content)})")
-            job_status[job_id].update({
-                "status": "completed",
-                "report": report_content,
-                "company": data.company,
-                "last_update": datetime.now().isoformat()
-            })
+            await job_backend.update_job(
+                job_id,
+                status="completed",
+                report=report_content,
+                company=data.company
+            )
             if mongodb:
                 mongodb.update_job(job_id=job_id, status="completed")
                 mongodb.store_report(job_id=job_id, report_data={"report": report_content})
@@ -155,6 +195,7 @@ async def process_research(job_id: str, data: ResearchRequest):
             if error := state.get('error'):
                 error_message = f"Error: {error}"
             
+            await job_backend.update_job(job_id, status="failed", error=error_message)
             await manager.send_status_update(
                 job_id=job_id,
                 status="failed",
@@ -164,6 +205,7 @@ async def process_research(job_id: str, data: ResearchRequest):
 
     except Exception as e:
         logger.error(f"Research failed: {str(e)}")
+        await job_backend.update_job(job_id, status="failed", error=str(e))
         await manager.send_status_update(
             job_id=job_id,
             status="failed",
@@ -189,15 +231,19 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
         await websocket.accept()
         await manager.connect(websocket, job_id)
 
-        if job_id in job_status:
-            status = job_status[job_id]
-            await manager.send_status_update(
-                job_id,
-                status=status["status"],
-                message="Connected to status stream",
-                error=status["error"],
-                result=status["result"]
-            )
+        # The snapshot is for this socket only; it is not a job event, so
+        # it stays out of the event log that SSE and long-poll clients replay
+        if status := await job_backend.get_job(job_id):
+            await websocket.send_text(json.dumps({
+                "type": "status_update",
+                "data": {
+                    "status": status["status"],
+                    "message": "Connected to status stream",
+                    "error": status["error"],
+                    "result": status["result"]
+                },
+                "timestamp": datetime.now().isoformat()
+            }))
 
         while True:
             try:
@@ -210,6 +256,77 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
         logger.error(f"WebSocket error for job {job_id}: {str(e)}", exc_info=True)
         manager.disconnect(websocket, job_id)
 
+def _is_terminal_event(message: dict) -> bool:
+    return (message.get("type") == "status_update"
+            and (message.get("data") or {}).get("status") in TERMINAL_STATUSES)
+
+def _compact_event(event_id: int, message: dict) -> dict:
+    """Flatten an event for long-poll clients, dropping empty fields."""
+    compact = {"id": event_id, "type": message.get("type"), "timestamp": message.get("timestamp")}
+    compact.update({key: value for key, value in (message.get("data") or {}).items() if value is not None})
+    return compact
+
+@app.get("/research/{job_id}/events")
+async def research_events(job_id: str, request: Request, last_event_id: int | None = Header(default=None)):
+    """Stream job progress as Server-Sent Events, resuming after Last-Event-ID."""
+    if not await job_backend.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Research job not found")
+
+    async def event_stream():
+        last_id = last_event_id or 0
+        async with manager.listen(job_id) as queue:
+            while not await request.is_disconnected():
+                # The queue only signals new events; the job's event log is
+                # the source of truth so that ordering and resume stay exact.
+                while not queue.empty():
+                    queue.get_nowait()
+                for event_id, message in await manager.get_events(job_id, last_id):
+                    last_id = event_id
+                    yield f"id: {event_id}\ndata: {json.dumps(message)}\n\n"
+                    if _is_terminal_event(message):
+                        return
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    job = await job_backend.get_job(job_id) or {}
+                    if job.get("status") in TERMINAL_STATUSES:
+                        return
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/research/{job_id}/events/poll")
+async def poll_research_events(job_id: str, after: int = 0, timeout: float = 25.0):
+    """Return job events newer than `after`, waiting up to `timeout` seconds for one."""
+    job = await job_backend.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Research job not found")
+
+    timeout = min(max(timeout, 0.0), MAX_POLL_TIMEOUT_SECONDS)
+    async with manager.listen(job_id) as queue:
+        events = await manager.get_events(job_id, after)
+        if not events and timeout and job.get("status") not in TERMINAL_STATUSES:
+            try:
+                await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            events = await manager.get_events(job_id, after)
+
+    done = any(_is_terminal_event(message) for _, message in events)
+    if not events:
+        job = await job_backend.get_job(job_id) or job
+        done = job.get("status") in TERMINAL_STATUSES
+    return {
+        "job_id": job_id,
+        "events": [_compact_event(event_id, message) for event_id, message in events],
+        "last_event_id": events[-1][0] if events else after,
+        "done": done
+    }
+
 @app.get("/research/{job_id}")
 async def get_research(job_id: str):
     if not mongodb:
@@ -222,8 +339,7 @@ async def get_research(job_id: str):
 @app.get("/research/{job_id}/report")
 async def get_research_report(job_id: str):
     if not mongodb:
-        if job_id in job_status:
-            result = job_status[job_id]
+        if result := await job_backend.get_job(job_id):
             if report := result.get("report"):
                 return {"report": report}
         raise HTTPException(status_code=404, detail="Report not found")
@@ -235,6 +351,8 @@ async def get_research_report(job_id: str):
 
 @app.post("/research/{job_id}/generate-pdf")
 async def generate_pdf(job_id: str):
+    job = await job_backend.get_job(job_id)
+    job_status = {job_id: job} if job else {}
     return pdf_service.generate_pdf_from_job(job_id, job_status, mongodb)
 
 @app.post("/generate-pdf")
@@ -9,10 +9,14 @@ class InputState(TypedDict, total=False):
     industry: NotRequired[str]
     websocket_manager: NotRequired[WebSocketManager]
     job_id: NotRequired[str]
+    deadline_s: NotRequired[float]
+    deadline_at: NotRequired[float]
+    depth: NotRequired[str]
 
 class ResearchState(InputState):
-    site_scrape: Dict[str, Any]
     messages: List[Any]
+    planned_queries: Dict[str, List[str]]
+    speculative_queries: Dict[str, List[str]]
     financial_data: Dict[str, Any]
     news_data: Dict[str, Any]
     industry_data: Dict[str, Any]
@@ -27,4 +31,6 @@ class ResearchState(InputState):
     company_briefing: str
     references: List[str]
     briefings: Dict[str, Any]
-    report: str
\ No newline at end of file
+    report: str
+    reference_titles: Dict[str, str]
+    reference_info: Dict[str, Any]
@@ -3,23 +3,38 @@ from langgraph.graph import StateGraph
 from typing import Dict, Any, AsyncIterator
 import logging
 
-from .classes.state import InputState
+from .classes.state import InputState, ResearchState
 from .nodes import GroundingNode
 from .nodes.researchers import (FinancialAnalyst, NewsScanner, 
                                IndustryAnalyzer, CompanyAnalyzer)
 from .nodes.collector import Collector
 from .nodes.curator import Curator
 from .nodes.enricher import Enricher
+from .nodes.condenser import Condenser
 from .nodes.briefing import Briefing
 from .nodes.editor import Editor
+from .nodes.lane import CategoryLane
+from .nodes.planner import QueryPlanner
+from .services.search_broker import SearchBroker
+from .services.tavily_client import ResilientTavilyClient
+from .utils.deadline import deadline_at
+from .utils.depth import depth_profile
+from .utils.report_format import SECTION_TITLES
 
 logger = logging.getLogger(__name__)
 
 class Graph:
     def __init__(self, company=None, url=None, hq_location=None, industry=None,
-                 websocket_manager=None, job_id=None):
+                 websocket_manager=None, job_id=None, deadline_s=None, depth=None, categories=None):
         self.websocket_manager = websocket_manager
         self.job_id = job_id
+        self.depth = depth or "standard"
+        self.profile = depth_profile(self.depth)
+        # Research categories to run, in report order; all of them by default
+        categories = set(categories or SECTION_TITLES)
+        if unknown := categories - set(SECTION_TITLES):
+            raise ValueError(f"Unknown research categories: {sorted(unknown)}")
+        self.categories = [category for category in SECTION_TITLES if category in categories]
         
         # Initialize InputState
         self.input_state = InputState(
@@ -29,6 +44,9 @@ class Graph:
             industry=industry,
             websocket_manager=websocket_manager,
             job_id=job_id,
+            deadline_s=deadline_s,
+            deadline_at=deadline_at(deadline_s),
+            depth=self.depth,
             messages=[
                 SystemMessage(content="Expert researcher starting investigation")
             ]
@@ -40,54 +58,101 @@ class Graph:
 
     def _init_nodes(self):
         """Initialize all workflow nodes"""
+        # Nodes are built per job, so the depth preset is applied to them here
+        profile = self.profile
         self.ground = GroundingNode()
-        self.financial_analyst = FinancialAnalyst()
-        self.news_scanner = NewsScanner()
-        self.industry_analyst = IndustryAnalyzer()
-        self.company_analyst = CompanyAnalyzer()
+        self.ground.crawler.max_pages = profile['site_pages']
+        # Only the requested categories get a researcher and a lane
+        analysts = {
+            'financial': ('💰 Financial', FinancialAnalyst),
+            'news': ('📰 News', NewsScanner),
+            'industry': ('🏭 Industry', IndustryAnalyzer),
+            'company': ('🏢 Company', CompanyAnalyzer)
+        }
+        researchers = {
+            category: (label, analyst())
+            for category, (label, analyst) in analysts.items() if category in self.categories
+        }
+        for _, researcher in researchers.values():
+            researcher.max_queries = profile['queries']
+            researcher.max_results = profile['max_results']
+            researcher.search_depth = profile['search_depth']
+            researcher.include_raw_content = researcher.include_raw_content or profile['search_raw_content']
+            researcher.search_score_threshold = profile['relevance_threshold']
+            researcher.search_target_docs = profile['search_target_docs']
         self.collector = Collector()
         self.curator = Curator()
-        self.enricher = Enricher()
-        self.briefing = Briefing()
-        self.editor = Editor()
+        self.curator.relevance_threshold = profile['relevance_threshold']
+        self.curator.max_curated_docs = profile['max_curated_docs']
+        self.curator.categories = list(self.categories)
+        self.condenser = Condenser()
+        self.editor = Editor(mode=profile['editor_mode'])
+        self.editor.categories = list(self.categories)
+        pipelined = self.editor.mode == "pipelined"
+        if pipelined:
+            # Lanes finish in any order; sections are emitted in report order
+            self.editor.section_order = list(self.categories)
+        # In pipelined mode each finished briefing goes straight to section editing
+        self.briefing = Briefing(
+            mode=profile['briefing_mode'],
+            on_briefing=self.editor.queue_section if pipelined else None
+        )
+        self.briefing.max_doc_tokens = profile['max_doc_tokens']
+        # Enrich only what the briefing prompt has room for
+        self.enricher = Enricher(
+            budget_tokens=self.briefing.document_budget(),
+            max_doc_tokens=self.briefing.max_doc_tokens
+        )
+        self.enricher.enabled = profile['enrich']
+
+        # Searches and extracts that several lanes ask for run once per job
+        self.search_broker = SearchBroker(ResilientTavilyClient())
+        for node in [researcher for _, researcher in researchers.values()] + [self.enricher]:
+            node.tavily_client = self.search_broker
+
+        # Grounding only starts the website extraction; each lane merges it
+        # into its documents once its own searches are done
+        self.lanes = {
+            category: CategoryLane(category, label, researcher, self.collector, self.ground.site_index,
+                                   self.curator, self.enricher, self.condenser, self.briefing)
+            for category, (label, researcher) in researchers.items()
+        }
+        # One LLM call plans the queries of every researcher
+        self.planner = QueryPlanner({
+            category: researcher for category, (_, researcher) in researchers.items()
+        })
+        self.planner.max_queries = profile['queries']
 
     def _build_workflow(self):
         """Configure the state graph workflow"""
-        self.workflow = StateGraph(InputState)
+        self.workflow = StateGraph(ResearchState, input=InputState)
         
         # Add nodes with their respective processing functions
         self.workflow.add_node("grounding", self.ground.run)
-        self.workflow.add_node("financial_analyst", self.financial_analyst.run)
-        self.workflow.add_node("news_scanner", self.news_scanner.run)
-        self.workflow.add_node("industry_analyst", self.industry_analyst.run)
-        self.workflow.add_node("company_analyst", self.company_analyst.run)
-        self.workflow.add_node("collector", self.collector.run)
-        self.workflow.add_node("curator", self.curator.run)
-        self.workflow.add_node("enricher", self.enricher.run)
-        self.workflow.add_node("briefing", self.briefing.run)
-        self.workflow.add_node("editor", self.editor.run)
+        self.workflow.add_node("planner", self.planner.run)
+        self.workflow.add_node("editor", self.join_lanes)
 
         # Configure workflow edges
         self.workflow.set_entry_point("grounding")
+        self.workflow.add_edge("grounding", "planner")
         self.workflow.set_finish_point("editor")
-        
-        research_nodes = [
-            "financial_analyst", 
-            "news_scanner",
-            "industry_analyst", 
-            "company_analyst"
-        ]
 
-        # Connect grounding to all research nodes
-        for node in research_nodes:
-            self.workflow.add_edge("grounding", node)
-            self.workflow.add_edge(node, "collector")
+        # Each category runs research, curation, enrichment and briefing in
+        # its own lane; the lanes only meet again at the editor
+        lane_nodes = []
+        for category, lane in self.lanes.items():
+            node = f"{category}_lane"
+            self.workflow.add_node(node, lane.run)
+            self.workflow.add_edge("planner", node)
+            lane_nodes.append(node)
+        self.workflow.add_edge(lane_nodes, "editor")
 
-        # Connect remaining nodes
-        self.workflow.add_edge("collector", "curator")
-        self.workflow.add_edge("curator", "enricher")
-        self.workflow.add_edge("enricher", "briefing")
-        self.workflow.add_edge("briefing", "editor")
+    async def join_lanes(self, state: ResearchState) -> ResearchState:
+        """Select references across all lanes, then compile the report."""
+        logger.info(f"Search broker for job {self.job_id}: {dict(self.search_broker.stats)}")
+        await self.curator.report_curation(state)
+        self.curator.select_references(state)
+        return await self.editor.run(state)
 
     async def run(self, thread: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """Execute the research workflow"""
@@ -111,7 +176,7 @@ class Graph:
                 "keys": list(state.keys())
             }
         }
-        await self.websocket_manager.broadcast_to_job(
+        await self.websocket_manager.publish(
             self.job_id,
             update
         )
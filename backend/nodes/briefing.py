@@ -1,10 +1,14 @@
 import google.generativeai as genai
-from typing import Dict, Any, Union, List
+from typing import Dict, Any, Union, List, Callable, Awaitable
 import os
 import logging
 from ..classes import ResearchState
+from ..services.clients import get_clients
+from ..utils.concurrency import llm_semaphore
+from ..utils.deadline import FULL_BRIEFING_SECONDS, briefing_budget_scale, running_short
+from ..utils.packing import chunk_documents, pack_documents
+from ..utils.tokens import count_tokens
 import asyncio
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 
 logger = logging.getLogger(__name__)
@@ -12,20 +16,49 @@ logger = logging.getLogger(__name__)
 class Briefing:
     """Creates briefings for each research category and updates the ResearchState."""
     
-    def __init__(self) -> None:
-        self.max_doc_length = 8000  # Maximum document content length
+    # Briefing modes: "single" packs what fits into one prompt, "map_reduce"
+    # summarizes document chunks in parallel before the final briefing, and
+    # "auto" switches to map-reduce only when the documents overflow the budget.
+    MODES = ("single", "map_reduce", "auto")
+
+    def __init__(
+        self,
+        mode: str | None = None,
+        on_briefing: Callable[[ResearchState, str, str], Awaitable[None]] | None = None
+    ) -> None:
+        self.mode = mode or os.getenv("BRIEFING_MODE", "auto")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown briefing mode: {self.mode}")
+        # Called with (state, category, content) as each briefing finishes so
+        # that downstream editing can start without waiting for the others
+        self.on_briefing = on_briefing
+        self.map_chunk_tokens = 8000  # Document tokens per map-step call
+        self.context_window = int(os.getenv("LLM_CONTEXT_TOKENS", "32768"))  # Model context size in tokens
+        self.output_token_reserve = 4096  # Tokens left free for the briefing itself
+        self.max_doc_tokens = 2000  # Maximum tokens taken by a single document
+        self.instruction_reserve = 1024  # Upper bound on category instruction tokens
 
         self.openai_key = os.getenv("OPENAI_API_KEY")
         if not self.openai_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         
-        # Configure ChatOpenAI
-        self.openai_client = ChatOpenAI(
+        # Shared ChatOpenAI on the pooled LLM connection
+        self.openai_client = get_clients().llm(
             model="qwen2.5_72b_instruct-gptq-int4",
             openai_api_key=self.openai_key,
             openai_api_base="http://172.17.3.88:8021/v1"
         )
 
+    def document_budget(self) -> int | None:
+        """Tokens a briefing prompt can spend on documents.
+
+        None when every briefing goes through map-reduce, which has no
+        fixed document budget.
+        """
+        if self.mode == "map_reduce":
+            return None
+        return self.context_window - self.output_token_reserve - self.instruction_reserve
+
     async def generate_category_briefing(
         self, docs: Union[Dict[str, Any], List[Dict[str, Any]]], 
         category: str, context: Dict[str, Any]
@@ -160,35 +193,43 @@ class Briefing:
             reverse=True
         )
         
-        doc_texts = []
-        total_length = 0
-        for _ , doc in sorted_items:
-            title = doc.get('title', '')
-            content = doc.get('raw_content') or doc.get('content', '')
-            if len(content) > self.max_doc_length:
-                content = content[:self.max_doc_length] + "... [content truncated]"
-            doc_entry = f"Title: {title}\n\nContent: {content}"
-            if total_length + len(doc_entry) < 120000:  # Keep under limit
-                doc_texts.append(doc_entry)
-                total_length += len(doc_entry)
-            else:
-                break
-        
-        separator = "\n" + "-" * 40 + "\n"
-        prompt = f"""{prompts.get(category, f'请根据所提供的文档，为{company}（{industry}行业）撰写一份聚焦、信息丰富且有洞见的研究简报。')}
+        instructions = f"""{prompts.get(category, f'请根据所提供的文档，为{company}（{industry}行业）撰写一份聚焦、信息丰富且有洞见的研究简报。')}
 
 请分析以下文档，提取关键信息。只需输出简报内容，不要有任何解释或评论：
-
-{separator}{separator.join(doc_texts)}{separator}
-
 """
+        doc_entries = [
+            {
+                'title': doc.get('title', ''),
+                'content': doc.get('raw_content') or doc.get('content', ''),
+                'score': float(doc.get('evaluation', {}).get('overall_score', '0'))
+            }
+            for _, doc in sorted_items
+        ]
+
+        # Share the context left after instructions and output across documents;
+        # shorter prompts when the job is running out of time
+        budget = self.context_window - self.output_token_reserve - count_tokens(instructions)
+        budget = int(budget * briefing_budget_scale(context))
+        short_on_time = running_short(context, FULL_BRIEFING_SECONDS)
         
         try:
+            needed = sum(min(count_tokens(doc['content']), self.max_doc_tokens) for doc in doc_entries)
+            # Map-reduce adds a round of generations, which a tight deadline can't afford
+            if not short_on_time and (self.mode == "map_reduce" or (self.mode == "auto" and needed > budget)):
+                logger.info(f"Using map-reduce for {category} briefing ({needed} tokens, budget {budget})")
+                if notes := await self.summarize_chunks(doc_entries, category, context):
+                    doc_entries = notes
+
+            packed_docs = pack_documents(doc_entries, budget_tokens=budget, max_doc_tokens=self.max_doc_tokens)
+            logger.info(f"Packed {len(packed_docs)}/{len(doc_entries)} {category} documents "
+                        f"into {sum(d['tokens'] for d in packed_docs)} of {budget} tokens")
+            prompt = f"""{instructions}
+{self.format_documents(packed_docs)}
+
+"""
+
             logger.info("Sending prompt to LLM")
-            # Use ainvoke for async call, and construct HumanMessage
-            response = await self.openai_client.ainvoke([HumanMessage(content=prompt)])
-            # Access content from the AIMessage response
-            content = response.content.strip()
+            content = await self.generate(prompt)
             if not content:
                 logger.error(f"Empty response from LLM for {category} briefing")
                 return {'content': ''}
@@ -211,101 +252,85 @@ class Briefing:
             logger.error(f"Error generating {category} briefing: {e}")
             return {'content': ''}
 
-    async def create_briefings(self, state: ResearchState) -> ResearchState:
-        """Create briefings for all categories in parallel."""
-        company = state.get('company', 'Unknown Company')
-        websocket_manager = state.get('websocket_manager')
-        job_id = state.get('job_id')
-        
-        # Send initial briefing status
-        if websocket_manager and job_id:
-            await websocket_manager.send_status_update(
-                job_id=job_id,
-                status="processing",
-                message="Starting research briefings",
-                result={"step": "Briefing"}
-            )
-
-        context = {
-            "company": company,
-            "industry": state.get('industry', 'Unknown'),
-            "hq_location": state.get('hq_location', 'Unknown'),
-            "websocket_manager": websocket_manager,
-            "job_id": job_id
-        }
-        logger.info(f"Creating section briefings for {company}")
-        
-        # Mapping of curated data fields to briefing categories
-        categories = {
-            'financial_data': ("financial", "financial_briefing"),
-            'news_data': ("news", "news_briefing"),
-            'industry_data': ("industry", "industry_briefing"),
-            'company_data': ("company", "company_briefing")
-        }
-        
-        briefings = {}
-
-        # Create tasks for parallel processing
-        briefing_tasks = []
-        for data_field, (cat, briefing_key) in categories.items():
-            curated_key = f'curated_{data_field}'
-            curated_data = state.get(curated_key, {})
-            
-            if curated_data:
-                logger.info(f"Processing {data_field} with {len(curated_data)} documents")
-                
-                # Create task for this category
-                briefing_tasks.append({
-                    'category': cat,
-                    'briefing_key': briefing_key,
-                    'data_field': data_field,
-                    'curated_data': curated_data
-                })
-            else:
-                logger.info(f"No data available for {data_field}")
-                state[briefing_key] = ""
-
-        # Process briefings in parallel with rate limiting
-        if briefing_tasks:
-            # Rate limiting semaphore for LLM API
-            briefing_semaphore = asyncio.Semaphore(2)  # Limit to 2 concurrent briefings
-            
-            async def process_briefing(task: Dict[str, Any]) -> Dict[str, Any]:
-                """Process a single briefing with rate limiting."""
-                async with briefing_semaphore:
-                    result = await self.generate_category_briefing(
-                        task['curated_data'],
-                        task['category'],
-                        context
-                    )
-                    
-                    if result['content']:
-                        briefings[task['category']] = result['content']
-                        state[task['briefing_key']] = result['content']
-                        logger.info(f"Completed {task['data_field']} briefing ({len(result['content'])} characters)")
-                    else:
-                        logger.error(f"Failed to generate briefing for {task['data_field']}")
-                        state[task['briefing_key']] = ""
-                    
-                    return {
-                        'category': task['category'],
-                        'success': bool(result['content']),
-                        'length': len(result['content']) if result['content'] else 0
+    def format_documents(self, docs: List[Dict[str, Any]]) -> str:
+        """Join packed documents into the separator-delimited prompt block."""
+        separator = "\n" + "-" * 40 + "\n"
+        doc_texts = [f"Title: {doc['title']}\n\nContent: {doc['content']}" for doc in docs]
+        return f"{separator}{separator.join(doc_texts)}{separator}"
+
+    async def generate(self, prompt: str) -> str:
+        """Run one LLM generation under the process-wide concurrency limit."""
+        async with llm_semaphore():
+            response = await self.openai_client.ainvoke([HumanMessage(content=prompt)])
+        return response.content.strip()
+
+    async def summarize_chunks(
+        self, docs: List[Dict[str, Any]], category: str, context: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Map step: condense document chunks into fact notes in parallel.
+
+        Returns the notes as documents for the final briefing prompt, or an
+        empty list if every chunk failed.
+        """
+        company = context.get('company', 'Unknown')
+        topics = {'company': '公司', 'industry': '行业', 'financial': '财务', 'news': '新闻'}
+        chunks = chunk_documents(docs, self.map_chunk_tokens, self.max_doc_tokens)
+
+        if websocket_manager := context.get('websocket_manager'):
+            if job_id := context.get('job_id'):
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="briefing_map",
+                    message=f"Summarizing {len(docs)} {category} documents in {len(chunks)} groups",
+                    result={
+                        "step": "Briefing",
+                        "category": category,
+                        "chunks": len(chunks)
                     }
+                )
 
-            # Process all briefings in parallel
-            results = await asyncio.gather(*[
-                process_briefing(task) 
-                for task in briefing_tasks
-            ])
-            
-            # Log completion statistics
-            successful_briefings = sum(1 for r in results if r['success'])
-            total_length = sum(r['length'] for r in results)
-            logger.info(f"Generated {successful_briefings}/{len(briefing_tasks)} briefings with total length {total_length}")
-
-        state['briefings'] = briefings
-        return state
-
-    async def run(self, state: ResearchState) -> ResearchState:
-        return await self.create_briefings(state)
\ No newline at end of file
+        map_prompt = f"""请从以下关于{company}的文档中，提取撰写{topics.get(category, '')}简报所需的全部关键事实。
+要求如下：
+1. 只用*号要点列出具体事实，尽量保留数字、日期、名称和来源标题
+2. 不要推测或编造，不要写总结性评论
+3. 只输出要点，不要有任何解释。
+"""
+        results = await asyncio.gather(*[
+            self.generate(f"{map_prompt}\n{self.format_documents(chunk)}\n")
+            for chunk in chunks
+        ], return_exceptions=True)
+
+        notes = []
+        for index, (chunk, result) in enumerate(zip(chunks, results), start=1):
+            if isinstance(result, Exception):
+                logger.error(f"Map step {index}/{len(chunks)} failed for {category}: {result}")
+                continue
+            if result:
+                notes.append({
+                    'title': f"文档摘要 {index}: " + "; ".join(doc['title'] for doc in chunk if doc['title'])[:200],
+                    'content': result,
+                    'score': max(doc['score'] for doc in chunk)
+                })
+        return notes
+
+    async def brief_category(self, state: ResearchState, category: str, context: Dict[str, Any]) -> str:
+        """Write the briefing of one category into state and hand it to on_briefing."""
+        data_field = f'{category}_data'
+        briefing_key = f'{category}_briefing'
+        curated_data = state.get(f'curated_{data_field}', {})
+
+        content = ''
+        if curated_data:
+            result = await self.generate_category_briefing(curated_data, category, context)
+            content = result['content']
+            if content:
+                logger.info(f"Completed {data_field} briefing ({len(content)} characters)")
+            else:
+                logger.error(f"Failed to generate briefing for {data_field}")
+        else:
+            logger.info(f"No data available for {data_field}")
+        state[briefing_key] = content
+
+        if self.on_briefing:
+            await self.on_briefing(state, category, content)
+        return content
@@ -1,44 +1,62 @@
 from langchain_core.messages import AIMessage
+import asyncio
+import logging
 from ..classes import ResearchState
+from ..utils.site_index import SiteIndex
+
+logger = logging.getLogger(__name__)
 
 class Collector:
     """Collects and organizes all research data before curation."""
 
-    async def collect(self, state: ResearchState) -> ResearchState:
-        """Collect and verify all research data is present."""
+    def __init__(self) -> None:
+        self.max_site_passages = 12  # Website passages routed into each category
+        # Curation score of routed website documents, which have no Tavily
+        # score and would otherwise always fall below the threshold
+        self.site_score = 0.6
+
+    async def collect_category(self, state: ResearchState, data_field: str, label: str,
+                               site: SiteIndex, site_query: str) -> None:
+        """Merge the relevant company website passages into one category's search results.
+
+        The website is extracted while the researchers search, so it only
+        joins their documents here rather than before research starts. Only
+        the passages matching the category's queries come along, one
+        document per page.
+        """
         company = state.get('company', 'Unknown Company')
-        msg = [f"📦 Collecting research data for {company}:"]
+        data = state.get(data_field, {})
 
         if websocket_manager := state.get('websocket_manager'):
             if job_id := state.get('job_id'):
                 await websocket_manager.send_status_update(
                     job_id=job_id,
                     status="processing",
-                    message=f"Collecting research data for {company}",
-                    result={"step": "Collecting"}
+                    message=f"Collecting {label} research data for {company}",
+                    result={"step": "Collecting", "category": data_field}
                 )
-        
-        # Check each type of research data
-        research_types = {
-            'financial_data': '💰 Financial',
-            'news_data': '📰 News',
-            'industry_data': '🏭 Industry',
-            'company_data': '🏢 Company'
-        }
-        
-        for data_field, label in research_types.items():
-            data = state.get(data_field, {})
-            if data:
-                msg.append(f"• {label}: {len(data)} documents collected")
-            else:
-                msg.append(f"• {label}: No data found")
-        
-        # Update state with collection message
+
+        if site:
+            site_query = site_query.format(company=company)
+            queries = sorted({doc['query'] for doc in data.values() if doc.get('query')})
+            queries += [site_query, company]
+            indices = await asyncio.to_thread(site.route, queries, self.max_site_passages)
+            site_docs = site.documents(indices)
+            for doc in site_docs.values():
+                doc['title'] = doc['title'] or company
+                doc['query'] = site_query
+                doc['score'] = self.site_score
+            # Website pages go first; a search result for the same page keeps
+            # its own fields but gains the routed passages
+            for url, doc in data.items():
+                if url in site_docs and not doc.get('raw_content'):
+                    doc['raw_content'] = site_docs[url]['raw_content']
+                    doc['site_passages'] = site_docs[url]['site_passages']
+            data = {**site_docs, **data}
+            state[data_field] = data
+            logger.info(f"Routed {len(indices)} of {len(site)} website passages to {data_field}")
+
+        msg = f"📦 {label}: {len(data)} documents collected" if data else f"📦 {label}: No data found"
         messages = state.get('messages', [])
-        messages.append(AIMessage(content="\n".join(msg)))
+        messages.append(AIMessage(content=msg))
         state['messages'] = messages
-        
-        return state
-
-    async def run(self, state: ResearchState) -> ResearchState:
-        return await self.collect(state)
\ No newline at end of file
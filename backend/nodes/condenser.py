@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Tuple
+import asyncio
+import logging
+from ..classes import ResearchState
+from ..utils.extractive import strip_boilerplate, select_passages
+from ..utils.packing import split_passages
+
+logger = logging.getLogger(__name__)
+
+class Condenser:
+    """Shrinks enriched raw content to the passages most relevant to each category."""
+
+    def __init__(self) -> None:
+        self.max_passages = 8  # Passages kept per document
+        self.min_length = 2000  # Raw content shorter than this is left untouched
+
+    def condense_category(self, docs: Dict[str, Dict[str, Any]], queries: List[str]) -> Tuple[int, int]:
+        """Strip boilerplate and keep the top BM25 passages of each long document.
+
+        Returns the total raw content length before and after condensing.
+        """
+        passages_by_doc = {}
+        for url, doc in docs.items():
+            # Website passages were already routed to the category by relevance
+            if doc.get('site_passages'):
+                continue
+            raw_content = doc.get('raw_content') or ''
+            if len(raw_content) >= self.min_length:
+                passages_by_doc[url] = split_passages(strip_boilerplate(raw_content))
+
+        if not passages_by_doc:
+            return 0, 0
+
+        before = after = 0
+        for url, passages in select_passages(passages_by_doc, queries, self.max_passages).items():
+            before += len(docs[url]['raw_content'])
+            docs[url]['raw_content'] = "\n\n".join(passages)
+            after += len(docs[url]['raw_content'])
+        return before, after
+
+    async def condense_field(self, state: ResearchState, data_field: str) -> Tuple[int, int]:
+        """Condense the curated documents stored under one data field in place."""
+        curated_field = f'curated_{data_field}'
+        curated_docs = state.get(curated_field, {})
+        if not curated_docs:
+            return 0, 0
+
+        # Rank passages against the queries that found this category's documents
+        queries = sorted({doc['query'] for doc in curated_docs.values() if doc.get('query')})
+        queries.append(state.get('company', 'Unknown Company'))
+
+        # BM25 scoring is CPU-bound; keep the event loop free for status updates
+        before, after = await asyncio.to_thread(self.condense_category, curated_docs, queries)
+        state[curated_field] = curated_docs
+        return before, after
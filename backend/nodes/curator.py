@@ -1,15 +1,23 @@
-from langchain_core.messages import AIMessage
-from typing import Dict
+from typing import Any, Dict, List
 from ..classes import ResearchState
 from urllib.parse import urlparse, urljoin
+from collections import Counter, defaultdict
 import logging
 from ..utils.references import process_references_from_search_results
+from ..utils.dedup import find_near_duplicates
+from ..utils.report_format import SECTION_TITLES
 
 logger = logging.getLogger(__name__)
 
 class Curator:
     def __init__(self) -> None:
         self.relevance_threshold = 0.4  # Fixed initialization of class attribute
+        self.duplicate_threshold = 0.8  # MinHash similarity treated as the same document
+        self.max_curated_docs = 30  # Documents kept per category
+        self.categories: list = list(SECTION_TITLES)  # Categories the job researches, in report order
+        # A curator serves one job; its stats cover every lane
+        self.dedup_totals: Counter = Counter()
+        self.doc_counts: Dict[str, Dict[str, int]] = {}
         logger.info("Curator initialized with relevance threshold: {relevance_threshhold}")
 
     async def evaluate_documents(self, state: ResearchState, docs: list, context: Dict[str, str]) -> list:
@@ -82,134 +90,180 @@ class Curator:
         
         return evaluated_docs
 
-    async def curate_data(self, state: ResearchState) -> ResearchState:
-        """Curate all collected data based on Tavily scores."""
-        company = state.get('company', 'Unknown Company')
-        logger.info(f"Starting curation for company: {company}")
-        
-        # Send initial status update through WebSocket
-        if websocket_manager := state.get('websocket_manager'):
-            if job_id := state.get('job_id'):
-                logger.info(f"Sending initial curation status update for job {job_id}")
-                await websocket_manager.send_status_update(
-                    job_id=job_id,
-                    status="processing",
-                    message=f"Starting document curation for {company}",
-                    result={
-                        "step": "Curation",
-                        "doc_counts": {
-                            "company": {"initial": 0, "kept": 0},
-                            "industry": {"initial": 0, "kept": 0},
-                            "financial": {"initial": 0, "kept": 0},
-                            "news": {"initial": 0, "kept": 0}
-                        }
-                    }
-                )
+    def remove_near_duplicates(self, evaluated: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Keep only the highest-scoring copy of near-duplicate documents in the given categories."""
+        items = [
+            ((data_field, index), doc.get('raw_content') or doc.get('content', ''), doc['evaluation']['overall_score'])
+            for data_field, docs in evaluated.items()
+            for index, doc in enumerate(docs)
+        ]
+        clusters = find_near_duplicates(items, threshold=self.duplicate_threshold)
 
-        industry = state.get('industry', 'Unknown')
-        context = {
-            "company": company,
-            "industry": industry,
-            "hq_location": state.get('hq_location', 'Unknown')
-        }
+        dropped = set()
+        for (data_field, index), duplicate_keys in clusters.items():
+            representative = evaluated[data_field][index]
+            representative['duplicate_urls'] = [
+                evaluated[field][i].get('url') for field, i in duplicate_keys
+            ]
+            dropped.update(duplicate_keys)
 
-        msg = [f"🔍 Curating research data for {company}"]
-        
-        data_types = {
-            'financial_data': ('💰 Financial', 'financial'),
-            'news_data': ('📰 News', 'news'),
-            'industry_data': ('🏭 Industry', 'industry'),
-            'company_data': ('🏢 Company', 'company')
+        removed = defaultdict(int)
+        for data_field, docs in evaluated.items():
+            kept = []
+            for index, doc in enumerate(docs):
+                if (data_field, index) in dropped:
+                    removed[data_field] += 1
+                else:
+                    kept.append(doc)
+            evaluated[data_field] = kept
+
+        logger.info(f"Removed {len(dropped)} near-duplicate documents in {len(clusters)} clusters")
+        return {
+            "clusters": len(clusters),
+            "removed": len(dropped),
+            "total": len(items),
+            "ratio": round(len(dropped) / len(items), 3) if items else 0.0,
+            "per_category": dict(removed)
         }
 
-        # Create all evaluation tasks upfront
-        curation_tasks = []
-        for data_field, (emoji, doc_type) in data_types.items():
-            data = state.get(data_field, {})
-            if not data:
+    def prepare_documents(self, data: Dict[str, Any], doc_type: str) -> Dict[str, Dict[str, Any]]:
+        """Normalize document URLs and drop documents that only differ by query or fragment."""
+        unique_docs = {}
+        for url, doc in data.items():
+            try:
+                parsed = urlparse(url)
+                if not parsed.scheme:
+                    url = urljoin('https://', url)
+                clean_url = parsed._replace(query='', fragment='').geturl()
+                if clean_url not in unique_docs:
+                    doc['url'] = clean_url
+                    doc['doc_type'] = doc_type
+                    unique_docs[clean_url] = doc
+            except Exception as e:
                 continue
+        return unique_docs
 
-            # Filter and normalize URLs
-            unique_docs = {}
-            for url, doc in data.items():
-                try:
-                    parsed = urlparse(url)
-                    if not parsed.scheme:
-                        url = urljoin('https://', url)
-                    clean_url = parsed._replace(query='', fragment='').geturl()
-                    if clean_url not in unique_docs:
-                        doc['url'] = clean_url
-                        doc['doc_type'] = doc_type
-                        unique_docs[clean_url] = doc
-                except Exception as e:
-                    continue
-
-            docs = list(unique_docs.values())
-            curation_tasks.append((data_field, emoji, doc_type, unique_docs.keys(), docs))
-
-        # Track document counts for each type
-        doc_counts = {}
-
-        for data_field, emoji, doc_type, urls, docs in curation_tasks:
-            msg.append(f"\n{emoji}: Found {len(docs)} documents")
-
-            if websocket_manager := state.get('websocket_manager'):
-                if job_id := state.get('job_id'):
-                    await websocket_manager.send_status_update(
-                        job_id=job_id,
-                        status="category_start",
-                        message=f"Processing {doc_type} documents",
-                        result={
-                            "step": "Curation",
-                            "doc_type": doc_type,
-                            "initial_count": len(docs)
-                        }
-                    )
+    def settle_cross_category(self, state: ResearchState) -> int:
+        """Keep the highest-scoring copy of documents that several categories kept.
 
-            evaluated_docs = await self.evaluate_documents(state, docs, context)
+        Lanes curate concurrently and each keeps its own copy, so the owner of
+        a shared URL or syndicated text is decided here by score, not by which
+        lane finished first. The other copies stay in their category's
+        briefing but are marked duplicate_of and left out of the references.
+        Website documents are exempt: each category holds other passages of
+        the page. Returns the number of copies marked.
+        """
+        copies = sorted(
+            (
+                (doc_type, url, doc)
+                for doc_type in sorted(self.doc_counts)
+                for url, doc in state.get(f'curated_{doc_type}_data', {}).items()
+                if 'site_passages' not in doc
+            ),
+            key=lambda item: item[2]['evaluation']['overall_score'],
+            reverse=True
+        )
+        owners: Dict[str, Dict[str, Any]] = {}  # URL -> highest-scoring copy
+        for _, url, doc in copies:
+            if url in owners:
+                doc['duplicate_of'] = url
+            else:
+                owners[url] = doc
 
-            if not evaluated_docs:
-                msg.append(f"  ⚠️ No relevant documents found")
-                doc_counts[data_field] = {"initial": len(docs), "kept": 0}
-                continue
+        items = [
+            (url, doc.get('raw_content') or doc.get('content', ''), doc['evaluation']['overall_score'])
+            for url, doc in owners.items()
+        ]
+        for url, duplicate_urls in find_near_duplicates(items, threshold=self.duplicate_threshold).items():
+            for duplicate_url in duplicate_urls:
+                owners[duplicate_url]['duplicate_of'] = url
+            owners[url].setdefault('duplicate_urls', []).extend(duplicate_urls)
 
-            # Filter and sort by Tavily score
-            relevant_docs = {url: doc for url, doc in zip(urls, evaluated_docs)}
-            sorted_items = sorted(relevant_docs.items(), key=lambda item: item[1]['evaluation']['overall_score'], reverse=True)
-            
-            # Limit to top 30 documents per category
-            if len(sorted_items) > 30:
-                sorted_items = sorted_items[:30]
-            relevant_docs = dict(sorted_items)
-
-            doc_counts[data_field] = {
-                "initial": len(docs),
-                "kept": len(relevant_docs)
-            }
-
-            if relevant_docs:
-                msg.append(f"  ✓ Kept {len(relevant_docs)} relevant documents")
-                logger.info(f"Kept {len(relevant_docs)} documents for {doc_type} with scores above threshold")
-            else:
-                msg.append(f"  ⚠️ No documents met relevance threshold")
-                logger.info(f"No documents met relevance threshold for {doc_type}")
+        marked = sum(1 for _, _, doc in copies if doc.get('duplicate_of'))
+        self.dedup_totals['cross_category'] += marked
+        self.dedup_totals['removed'] += marked
+        return marked
 
-            # Store curated documents in state
-            state[f'curated_{data_field}'] = relevant_docs
-            
-        # Process references using the references module
+    def select_references(self, state: ResearchState) -> None:
+        """Pick the report references from the curated documents of every category."""
         top_reference_urls, reference_titles, reference_info = process_references_from_search_results(state)
         logger.info(f"Selected top {len(top_reference_urls)} references for the report")
-        
-        # Update state with references and their titles
-        messages = state.get('messages', [])
-        messages.append(AIMessage(content="\n".join(msg)))
-        state['messages'] = messages
         state['references'] = top_reference_urls
         state['reference_titles'] = reference_titles
         state['reference_info'] = reference_info
 
-        # Send final curation stats
+    async def curate_category(self, state: ResearchState, data_field: str, doc_type: str) -> Dict[str, int]:
+        """Curate a single category without waiting for the others.
+
+        Used by the per-category lanes. Near-duplicates are clustered within
+        the category; copies shared with other categories are settled and
+        references selected once all lanes join. Returns the document counts
+        of the category.
+        """
+        context = {
+            "company": state.get('company', 'Unknown Company'),
+            "industry": state.get('industry', 'Unknown'),
+            "hq_location": state.get('hq_location', 'Unknown')
+        }
+        unique_docs = self.prepare_documents(state.get(data_field, {}), doc_type)
+        docs = list(unique_docs.values())
+
+        if websocket_manager := state.get('websocket_manager'):
+            if job_id := state.get('job_id'):
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="category_start",
+                    message=f"Processing {doc_type} documents",
+                    result={
+                        "step": "Curation",
+                        "doc_type": doc_type,
+                        "initial_count": len(docs)
+                    }
+                )
+
+        evaluated = {data_field: await self.evaluate_documents(state, docs, context)}
+        dedup_stats = self.remove_near_duplicates(evaluated)
+        for key in ("clusters", "removed", "total"):
+            self.dedup_totals[key] += dedup_stats[key]
+        relevant_docs = {}
+        for doc in evaluated[data_field][:self.max_curated_docs]:
+            relevant_docs.setdefault(doc['url'], doc)
+        duplicates = dedup_stats["removed"]
+        state[f'curated_{data_field}'] = relevant_docs
+        logger.info(f"Kept {len(relevant_docs)} of {len(docs)} {doc_type} documents "
+                    f"({duplicates} duplicates)")
+
+        doc_count = {
+            "initial": len(docs),
+            "kept": len(relevant_docs),
+            "duplicates": duplicates
+        }
+        self.doc_counts[doc_type] = doc_count
+        if websocket_manager := state.get('websocket_manager'):
+            if job_id := state.get('job_id'):
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="category_complete",
+                    message=f"Curated {doc_type} documents",
+                    result={
+                        "step": "Curation",
+                        "doc_type": doc_type,
+                        "doc_count": doc_count
+                    }
+                )
+        return doc_count
+
+    async def report_curation(self, state: ResearchState) -> Dict[str, Any]:
+        """Settle shared documents, then send the counts and dedup stats of every lane."""
+        self.settle_cross_category(state)
+        total = self.dedup_totals['total']
+        dedup = {
+            "clusters": self.dedup_totals['clusters'],
+            "removed": self.dedup_totals['removed'],
+            "cross_category": self.dedup_totals['cross_category'],
+            "ratio": round(self.dedup_totals['removed'] / total, 3) if total else 0.0
+        }
+        logger.info(f"Curation dedup stats: {dedup}")
         if websocket_manager := state.get('websocket_manager'):
             if job_id := state.get('job_id'):
                 await websocket_manager.send_status_update(
@@ -219,15 +273,10 @@ class Curator:
                     result={
                         "step": "Curation",
                         "doc_counts": {
-                            "company": doc_counts.get('company_data', {"initial": 0, "kept": 0}),
-                            "industry": doc_counts.get('industry_data', {"initial": 0, "kept": 0}),
-                            "financial": doc_counts.get('financial_data', {"initial": 0, "kept": 0}),
-                            "news": doc_counts.get('news_data', {"initial": 0, "kept": 0})
-                        }
+                            doc_type: self.doc_counts.get(doc_type, {"initial": 0, "kept": 0})
+                            for doc_type in self.categories
+                        },
+                        "dedup": dedup
                     }
                 )
-
-        return state
-
-    async def run(self, state: ResearchState) -> ResearchState:
-        return await self.curate_data(state)
+        return dedup
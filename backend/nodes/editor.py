@@ -1,24 +1,48 @@
 from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
 from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+import asyncio
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
 from ..classes import ResearchState
+from ..services.clients import get_clients
 from ..utils.references import format_references_section
+from ..utils.concurrency import llm_semaphore
+from ..utils.deadline import CONTENT_SWEEP_SECONDS, running_short
+from ..utils.report_format import SECTION_TITLES, dedupe_section_lines, normalize_report
+
+# What each section holds, as described to the editor model
+SECTION_CONTENT = {
+    'company': '公司内容',
+    'industry': '行业内容',
+    'financial': '财务内容',
+    'news': '新闻内容'
+}
 
 class Editor:
     """Compiles individual section briefings into a cohesive final report."""
     
-    def __init__(self) -> None:
+    # Editor modes: "two_pass" compiles the briefings and then sweeps the
+    # compiled report in a second generation; "single_pass" does both in one
+    # streamed generation followed by deterministic local cleanup;
+    # "sectioned" edits every section in its own concurrent generation;
+    # "pipelined" is sectioned editing that starts on each briefing as soon
+    # as Briefing hands it over through queue_section.
+    MODES = ("two_pass", "single_pass", "sectioned", "pipelined")
+
+    def __init__(self, mode: str | None = None) -> None:
+        self.mode = mode or os.getenv("EDITOR_MODE", "two_pass")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown editor mode: {self.mode}")
+
         self.openai_key = os.getenv("OPENAI_API_KEY")
         if not self.openai_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         
         # Configure a single OpenAI client for all tasks
-        self.llm_client = ChatOpenAI(
+        self.llm_client = get_clients().llm(
             model="qwen2.5_72b_instruct-gptq-int4",
             openai_api_key=self.openai_key,
             openai_api_base="http://172.17.3.88:8021/v1",
@@ -32,6 +56,30 @@ class Editor:
             "hq_location": "Unknown"
         }
 
+        # Pipelined mode: section edits started before the editor node runs
+        self.section_tasks: Dict[str, asyncio.Task] = {}
+        self.sections: Dict[str, str | None] = {}
+        self.section_order: list | None = None
+        # Categories requested for the report, in report order
+        self.categories: list = list(SECTION_TITLES)
+        self.emitted_sections = 0
+        self._emit_lock = asyncio.Lock()
+
+    def section_titles(self) -> list:
+        """Headings of the requested sections, in report order."""
+        return [SECTION_TITLES[category] for category in self.categories]
+
+    def section_outline(self, news_headings: bool = False) -> str:
+        """Report structure for the compile prompts, limited to the requested sections."""
+        outline = []
+        for category in self.categories:
+            if category == 'news' and not news_headings:
+                body = "[新闻内容，仅用*号要点，不要有标题]"
+            else:
+                body = f"[{SECTION_CONTENT[category]}，包含###子标题]"
+            outline.append(f"## {SECTION_TITLES[category]}\n{body}")
+        return "\n\n".join(outline)
+
     async def compile_briefings(self, state: ResearchState) -> ResearchState:
         """Compile individual briefing categories from state into a final report."""
         company = state.get('company', 'Unknown Company')
@@ -87,6 +135,8 @@ class Editor:
 
         individual_briefings = {}
         for category, key in briefing_keys.items():
+            if category not in self.categories:
+                continue
             if content := state.get(key):
                 individual_briefings[category] = content
                 msg.append(f"Found {category} briefing ({len(content)} characters)")
@@ -127,37 +177,51 @@ class Editor:
                         }
                     )
 
-            edited_report = await self.compile_content(state, briefings, company)
-            if not edited_report:
-                logger.error("Initial compilation failed")
-                return ""
-
-            # Step 2: Deduplication and Cleanup
-            if websocket_manager := state.get('websocket_manager'):
-                if job_id := state.get('job_id'):
-                    await websocket_manager.send_status_update(
-                        job_id=job_id,
-                        status="processing",
-                        message="Cleaning up and organizing report",
-                        result={
-                            "step": "Editor",
-                            "substep": "cleanup"
-                        }
-                    )
+            if self.mode == "single_pass":
+                final_report = await self.compile_and_clean(state, briefings)
+            elif self.mode == "sectioned":
+                final_report = await self.compile_sections(state, briefings)
+            elif self.mode == "pipelined":
+                final_report = await self.compile_pipelined(state, briefings)
+            else:
+                edited_report = await self.compile_content(state, briefings, company)
+                if not edited_report:
+                    logger.error("Initial compilation failed")
+                    return ""
+
+                # Step 2: Deduplication and Cleanup
+                if websocket_manager := state.get('websocket_manager'):
+                    if job_id := state.get('job_id'):
+                        await websocket_manager.send_status_update(
+                            job_id=job_id,
+                            status="processing",
+                            message="Cleaning up and organizing report",
+                            result={
+                                "step": "Editor",
+                                "substep": "cleanup"
+                            }
+                        )
 
-            # Step 3: Formatting Final Report
-            if websocket_manager := state.get('websocket_manager'):
-                if job_id := state.get('job_id'):
-                    await websocket_manager.send_status_update(
-                        job_id=job_id,
-                        status="processing",
-                        message="Formatting final report",
-                        result={
-                            "step": "Editor",
-                            "substep": "format"
-                        }
+                # Step 3: Formatting Final Report
+                if websocket_manager := state.get('websocket_manager'):
+                    if job_id := state.get('job_id'):
+                        await websocket_manager.send_status_update(
+                            job_id=job_id,
+                            status="processing",
+                            message="Formatting final report",
+                            result={
+                                "step": "Editor",
+                                "substep": "format"
+                            }
+                        )
+                if running_short(state, CONTENT_SWEEP_SECONDS):
+                    # Local cleanup instead of a second generation to meet the deadline
+                    logger.info("Skipping content sweep to meet the job deadline")
+                    final_report = normalize_report(
+                        edited_report, company, self.reference_text(state), self.section_titles()
                     )
-            final_report = await self.content_sweep(state, edited_report, company)
+                else:
+                    final_report = await self.content_sweep(state, edited_report, company)
             
             final_report = final_report or ""
             
@@ -197,25 +261,30 @@ class Editor:
             logger.error(f"Error in edit_report: {e}")
             return ""
     
+    def reference_text(self, state: ResearchState) -> str:
+        """Format the curated references as the report's reference section."""
+        references = state.get('references', [])
+        if not references:
+            return ""
+
+        logger.info(f"Found {len(references)} references to add during compilation")
+        
+        # Get pre-processed reference info from curator
+        reference_info = state.get('reference_info', {})
+        reference_titles = state.get('reference_titles', {})
+        
+        logger.info(f"Reference info from state: {reference_info}")
+        logger.info(f"Reference titles from state: {reference_titles}")
+        
+        # Use the references module to format the references section
+        reference_text = format_references_section(references, reference_info, reference_titles)
+        logger.info(f"Added {len(references)} references during compilation")
+        return reference_text
+
     async def compile_content(self, state: ResearchState, briefings: Dict[str, str], company: str) -> str:
         """Initial compilation of research sections."""
         combined_content = "\n\n".join(content for content in briefings.values())
-        
-        references = state.get('references', [])
-        reference_text = ""
-        if references:
-            logger.info(f"Found {len(references)} references to add during compilation")
-            
-            # Get pre-processed reference info from curator
-            reference_info = state.get('reference_info', {})
-            reference_titles = state.get('reference_titles', {})
-            
-            logger.info(f"Reference info from state: {reference_info}")
-            logger.info(f"Reference titles from state: {reference_titles}")
-            
-            # Use the references module to format the references section
-            reference_text = format_references_section(references, reference_info, reference_titles)
-            logger.info(f"Added {len(references)} references during compilation")
+        reference_text = self.reference_text(state)
         
         # 使用集中上下文的值
         company = self.context["company"]
@@ -239,17 +308,7 @@ class Editor:
 
 # {company} 研究报告
 
-## 公司概览
-[公司内容，包含###子标题]
-
-## 行业概览
-[行业内容，包含###子标题]
-
-## 财务概览
-[财务内容，包含###子标题]
-
-## 新闻
-[新闻内容，包含###子标题]
+{self.section_outline(news_headings=True)}
 
 请以干净的Markdown格式返回报告，不要添加任何解释或评论。"""
 
@@ -276,6 +335,8 @@ class Editor:
         industry = self.context["industry"]
         hq_location = self.context["hq_location"]
         
+        allowed_headings = "\n".join(f"   - ## {title}" for title in self.section_titles())
+
         prompt = f"""你是一位专业的报告编辑。你收到了一份关于{company}的研究报告。
 
 当前报告内容如下：
@@ -290,17 +351,7 @@ class Editor:
 
 严格遵循以下文档结构（不要更改标题顺序和格式）：
 
-## 公司概览
-[公司内容，包含###子标题]
-
-## 行业概览
-[行业内容，包含###子标题]
-
-## 财务概览
-[财务内容，包含###子标题]
-
-## 新闻
-[新闻内容，仅用*号要点，不要有标题]
+{self.section_outline()}
 
 ## 参考文献
 [MLA格式参考文献——务必原样保留，不要更改]
@@ -308,10 +359,7 @@ class Editor:
 关键规则：
 1. 文档必须以“# {company} 研究报告”开头
 2. 只允许使用以下##标题，且顺序如下：
-   - ## 公司概览
-   - ## 行业概览
-   - ## 财务概览
-   - ## 新闻
+{allowed_headings}
    - ## 参考文献
 3. 不允许出现其他##标题
 4. 公司/行业/财务部分的子标题请用###，新闻部分只用*号要点，不要用标题
@@ -325,57 +373,247 @@ class Editor:
 """
         
         try:
-            response_stream = self.llm_client.astream([
+            accumulated_text = await self.stream_report(state, [
                 SystemMessage(content="你是一位专业的Markdown格式化编辑，确保文档结构一致且规范。"),
                 HumanMessage(content=prompt)
-            ])
-            
-            accumulated_text = ""
-            buffer = ""
-            
-            async for chunk in response_stream:
-                chunk_text = chunk.content
-                if chunk_text:
-                    accumulated_text += chunk_text
-                    buffer += chunk_text
-                    
-                    # Send buffer content via WebSocket if conditions are met
-                    if any(char in buffer for char in ['.', '!', '?', '\\n']) and len(buffer) > 10:
-                        websocket_manager = state.get('websocket_manager')
-                        if websocket_manager:
-                            job_id = state.get('job_id')
-                            if job_id:
-                                await websocket_manager.send_status_update(
-                                    job_id=job_id,
-                                    status="report_chunk",
-                                    message="Formatting final report",
-                                    result={
-                                        "chunk": buffer,
-                                        "step": "Editor"
-                                    }
-                                )
-                        buffer = ""
-            # After the loop, send any remaining text in the buffer
-            if buffer:
-                websocket_manager = state.get('websocket_manager')
-                if websocket_manager:
-                    job_id = state.get('job_id')
-                    if job_id:
-                        await websocket_manager.send_status_update(
-                            job_id=job_id,
-                            status="report_chunk",
-                            message="Formatting final report",
-                            result={
-                                "chunk": buffer,
-                                "step": "Editor"
-                            }
-                        )
-            
+            ], "Formatting final report")
             return (accumulated_text or "").strip()
         except Exception as e:
             logger.error(f"Error in formatting: {e}")
             return (content or "").strip()
 
+    async def stream_report(self, state: ResearchState, messages: list, status_message: str) -> str:
+        """Stream a report generation to the client and return the full text."""
+        websocket_manager = state.get('websocket_manager')
+        job_id = state.get('job_id')
+
+        async def send_chunk(chunk: str) -> None:
+            if websocket_manager and job_id:
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="report_chunk",
+                    message=status_message,
+                    result={
+                        "chunk": chunk,
+                        "step": "Editor"
+                    }
+                )
+
+        accumulated_text = ""
+        buffer = ""
+        async for chunk in self.llm_client.astream(messages):
+            chunk_text = chunk.content
+            if chunk_text:
+                accumulated_text += chunk_text
+                buffer += chunk_text
+                
+                # Send buffer content via WebSocket at sentence or line ends
+                if any(char in buffer for char in ['.', '!', '?', '。', '！', '？', '\n']) and len(buffer) > 10:
+                    await send_chunk(buffer)
+                    buffer = ""
+        # After the loop, send any remaining text in the buffer
+        if buffer:
+            await send_chunk(buffer)
+        return accumulated_text
+
+    async def compile_and_clean(self, state: ResearchState, briefings: Dict[str, str]) -> str:
+        """Compile and clean the report in a single streamed generation.
+
+        Structure rules that the second pass used to enforce (heading order,
+        bullets, blank lines, code fences, references) are applied locally
+        by normalize_report instead of by another LLM call.
+        """
+        company = self.context["company"]
+        industry = self.context["industry"]
+        hq_location = self.context["hq_location"]
+        combined_content = "\n\n".join(content for content in briefings.values())
+
+        prompt = f"""你是一位专业的报告编辑，现在需要将关于{company}的研究简报整合成一份全面、干净的公司研究报告。
+
+已整理的简报内容如下：
+{combined_content}
+
+请根据以下要求，撰写一份关于{company}（这是一家总部位于{hq_location}的{industry}公司）的综合性、重点突出的研究报告：
+
+1. 将所有部分的信息整合为连贯且无重复的叙述，保留每个部分的重要细节
+2. 删除冗余或重复的信息，以及与{company}无关或内容空洞的信息
+3. 删除所有元评论或过渡性说明（如“以下是新闻...”等）
+
+严格按照以下文档结构输出（不要更改标题顺序和格式）：
+
+# {company} 研究报告
+
+{self.section_outline()}
+
+关键规则：
+1. 只允许使用以上##标题，不要添加参考文献部分
+2. 所有要点请用*号格式
+3. 严禁出现代码块（```）
+
+请以干净的Markdown格式返回报告，不要添加任何解释或评论。"""
+
+        try:
+            report = await self.stream_report(state, [
+                SystemMessage(content="你是一位专业的报告编辑，负责将研究简报整合成结构规范的公司研究报告。"),
+                HumanMessage(content=prompt)
+            ], "Compiling final report")
+        except Exception as e:
+            logger.error(f"Error in single-pass compilation: {e}")
+            report = combined_content
+
+        return normalize_report(report, company, self.reference_text(state), self.section_titles())
+
+    async def edit_section(self, state: ResearchState, category: str, briefing: str) -> str:
+        """Edit one category briefing into its report section body.
+
+        Falls back to the unedited briefing if the generation fails.
+        """
+        company = self.context["company"]
+        industry = self.context["industry"]
+        hq_location = self.context["hq_location"]
+        title = SECTION_TITLES[category]
+        heading_rule = ("只用*号要点，不要有任何标题" if category == 'news'
+                        else "子标题请用###，要点请用*号")
+
+        prompt = f"""你是一位专业的报告编辑，正在编写关于{company}（一家总部位于{hq_location}的{industry}公司）的研究报告中的“{title}”部分。
+
+该部分的研究简报如下：
+{briefing}
+
+请严格按照以下要求进行处理：
+
+1. 保留重要细节，删除冗余或重复的信息
+2. 删除与{company}无关或内容空洞的信息
+3. 删除所有元评论或过渡性说明
+4. {heading_rule}
+5. 不要输出#或##标题，严禁出现代码块（```）
+
+只输出该部分的正文内容，不要添加任何解释或评论。"""
+
+        try:
+            async with llm_semaphore():
+                response = await self.llm_client.ainvoke([
+                    SystemMessage(content="你是一位专业的报告编辑，负责编辑公司研究报告中的单个部分。"),
+                    HumanMessage(content=prompt)
+                ])
+            return response.content.strip() or briefing
+        except Exception as e:
+            logger.error(f"Error editing {category} section: {e}")
+            return briefing
+
+    async def emit_sections_in_order(
+        self, state: ResearchState, order: list, sections: Dict[str, str], emitted: int
+    ) -> int:
+        """Stream every finished section that continues the emitted prefix.
+
+        Returns the new number of emitted sections.
+        """
+        websocket_manager = state.get('websocket_manager')
+        job_id = state.get('job_id')
+        while emitted < len(order) and order[emitted] in sections:
+            category = order[emitted]
+            if sections[category] is None:
+                # This category produced no briefing; nothing to stream
+                emitted += 1
+                continue
+            chunk = f"## {SECTION_TITLES[category]}\n\n{sections[category]}\n\n"
+            if not any(sections.get(previous) for previous in order[:emitted]):
+                chunk = f"# {self.context['company']} 研究报告\n\n{chunk}"
+            if websocket_manager and job_id:
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="report_chunk",
+                    message=f"Edited {category} section",
+                    result={
+                        "chunk": chunk,
+                        "step": "Editor",
+                        "section": category
+                    }
+                )
+            emitted += 1
+        return emitted
+
+    async def compile_sections(self, state: ResearchState, briefings: Dict[str, str]) -> str:
+        """Edit all sections concurrently and stream them in report order."""
+        order = [category for category in SECTION_TITLES if category in briefings]
+        tasks = {
+            asyncio.create_task(self.edit_section(state, category, briefings[category])): category
+            for category in order
+        }
+
+        sections: Dict[str, str] = {}
+        emitted = 0
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                sections[tasks[task]] = task.result()
+            emitted = await self.emit_sections_in_order(state, order, sections, emitted)
+
+        return self.assemble_sections(state, sections, order)
+
+    def expected_sections(self, state: ResearchState) -> list:
+        """Categories that will get a briefing, in report order."""
+        return [category for category in self.categories if state.get(f'curated_{category}_data')]
+
+    async def queue_section(self, state: ResearchState, category: str, briefing: str) -> None:
+        """Start editing a section as soon as its briefing is ready.
+
+        Called by Briefing for every category, with an empty briefing when
+        generation failed so that later sections are not held back.
+        """
+        self.context = {
+            "company": state.get('company', 'Unknown Company'),
+            "industry": state.get('industry', 'Unknown'),
+            "hq_location": state.get('hq_location', 'Unknown')
+        }
+        if self.section_order is None:
+            self.section_order = self.expected_sections(state)
+        if not briefing:
+            self.sections[category] = None
+            await self._emit_pipelined(state)
+            return
+
+        async def edit_and_emit() -> str:
+            content = await self.edit_section(state, category, briefing)
+            self.sections[category] = content
+            await self._emit_pipelined(state)
+            return content
+
+        self.section_tasks[category] = asyncio.create_task(edit_and_emit())
+
+    async def _emit_pipelined(self, state: ResearchState) -> None:
+        async with self._emit_lock:
+            self.emitted_sections = await self.emit_sections_in_order(
+                state, self.section_order, self.sections, self.emitted_sections
+            )
+
+    async def compile_pipelined(self, state: ResearchState, briefings: Dict[str, str]) -> str:
+        """Finish the section edits queued during briefing and assemble the report."""
+        for category, briefing in briefings.items():
+            if category not in self.section_tasks:
+                await self.queue_section(state, category, briefing)
+        await asyncio.gather(*self.section_tasks.values())
+
+        order = [category for category in SECTION_TITLES if category in briefings]
+        if self.section_order is None:
+            self.section_order = order
+        # Anything still unaccounted for never got a briefing
+        for category in self.section_order:
+            self.sections.setdefault(category, None)
+        await self._emit_pipelined(state)
+        return self.assemble_sections(state, self.sections, order)
+
+    def assemble_sections(self, state: ResearchState, sections: Dict[str, str], order: list) -> str:
+        """Join edited sections, drop facts repeated across them and clean up."""
+        ordered = dedupe_section_lines({category: sections[category] for category in order})
+        report = "\n\n".join(
+            f"## {SECTION_TITLES[category]}\n\n{content}" for category, content in ordered.items()
+        )
+        return normalize_report(
+            report, self.context["company"], self.reference_text(state), self.section_titles()
+        )
+
     async def run(self, state: ResearchState) -> ResearchState:
         state = await self.compile_briefings(state)
         # Ensure the Editor node's output is stored both top-level and under "editor"
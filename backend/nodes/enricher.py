@@ -1,19 +1,28 @@
-from langchain_core.messages import AIMessage
 from typing import Dict, List
 import os
-from tavily import AsyncTavilyClient
 import asyncio
+import logging
 from ..classes import ResearchState
+from ..services.tavily_client import ResilientTavilyClient
+from ..utils.deadline import ENRICHMENT_SECONDS, running_short
+from ..utils.enrichment import EnrichmentPolicy
+from ..utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
 
 class Enricher:
     """Enriches curated documents with raw content."""
     
-    def __init__(self) -> None:
+    def __init__(self, budget_tokens: int | None = None, max_doc_tokens: int = 2000) -> None:
         tavily_key = os.getenv("TAVILY_API_KEY")
         if not tavily_key:
             raise ValueError("TAVILY_API_KEY environment variable is not set")
-        self.tavily_client = AsyncTavilyClient(api_key=tavily_key)
+        self.tavily_client = ResilientTavilyClient(api_key=tavily_key)
         self.batch_size = 20
+        # Only documents whose full text will make it into the briefing prompt
+        # are extracted; budget_tokens is the prompt's document budget
+        self.policy = EnrichmentPolicy(budget_tokens=budget_tokens, max_doc_tokens=max_doc_tokens)
+        self.enabled = True  # Off for fast research, which briefs from search snippets
 
     async def fetch_single_content(self, url: str, websocket_manager=None, job_id=None, category=None) -> Dict[str, str]:
         """Fetch raw content for a single URL."""
@@ -31,6 +40,8 @@ class Enricher:
                 )
 
             result = await self.tavily_client.extract(url)
+            raw_content = result['results'][0].get('raw_content', '') if result and result.get('results') else ''
+            self.policy.history.record(url, count_tokens(raw_content) if raw_content else None)
             if result and result.get('results'):
                 if websocket_manager and job_id:
                     await websocket_manager.send_status_update(
@@ -44,9 +55,10 @@ class Enricher:
                             "success": True
                         }
                     )
-                return {url: result['results'][0].get('raw_content', '')}
+                return {url: raw_content}
         except Exception as e:
             print(f"Error fetching raw content for {url}: {e}")
+            self.policy.history.record(url, None)
             error_msg = str(e)
             if websocket_manager and job_id:
                 await websocket_manager.send_status_update(
@@ -61,7 +73,7 @@ class Enricher:
                         "error": error_msg
                     }
                 )
-            return {url: '', "error": error_msg}
+            return {url: {'error': error_msg}}
         return {url: ''}
 
     async def fetch_raw_content(self, urls: List[str], websocket_manager=None, job_id=None, category=None) -> Dict[str, str]:
@@ -113,167 +125,85 @@ class Enricher:
 
         return raw_contents
 
-    async def enrich_data(self, state: ResearchState) -> ResearchState:
-        """Enrich curated documents with raw content."""
-        company = state.get('company', 'Unknown Company')
-        websocket_manager = state.get('websocket_manager')
-        job_id = state.get('job_id')
-
-        if websocket_manager and job_id:
-            await websocket_manager.send_status_update(
-                job_id=job_id,
-                status="processing",
-                message=f"Starting content enrichment for {company}",
-                result={
-                    "step": "Enriching",
-                    "substep": "initialization"
-                }
-            )
-
-        msg = [f"📚 Enriching curated data for {company}:"]
-
-        # Process each type of curated data
-        data_types = {
-            'financial_data': ('💰 Financial', 'financial'),
-            'news_data': ('📰 News', 'news'),
-            'industry_data': ('🏭 Industry', 'industry'),
-            'company_data': ('🏢 Company', 'company')
-        }
+    async def enrich_documents(
+        self, curated_docs: Dict[str, Dict], urls: List[str],
+        websocket_manager=None, job_id=None, category=None, label=None
+    ) -> Dict[str, int]:
+        """Fetch raw content for the given URLs and store it on the curated documents."""
+        try:
+            raw_contents = await self.fetch_raw_content(urls, websocket_manager, job_id, category)
 
-        # Create tasks for parallel processing
-        enrichment_tasks = []
-        for data_field, (label, category) in data_types.items():
-            curated_field = f'curated_{data_field}'
-            curated_docs = state.get(curated_field, {})
-            
-            if not curated_docs:
-                msg.append(f"\n• No curated {label} documents to enrich")
-                continue
+            enriched_count = 0
+            error_count = 0
 
-            # Find documents needing enrichment
-            docs_needing_content = {url: doc for url, doc in curated_docs.items() 
-                                  if not doc.get('raw_content')}
-            
-            if not docs_needing_content:
-                msg.append(f"\n• All {label} documents already have raw content")
-                continue
-            
-            msg.append(f"\n• Enriching {len(docs_needing_content)} {label} documents...")
+            for url, content_or_error in raw_contents.items():
+                if isinstance(content_or_error, dict) and content_or_error.get('error'):
+                    # This is an error result - just skip it
+                    error_count += 1
+                elif content_or_error:
+                    # This is a successful content
+                    curated_docs[url]['raw_content'] = content_or_error
+                    enriched_count += 1
 
             if websocket_manager and job_id:
                 await websocket_manager.send_status_update(
                     job_id=job_id,
-                    status="category_start",
-                    message=f"Processing {label} documents",
+                    status="category_complete",
+                    message=f"Completed {label} documents",
                     result={
                         "step": "Enriching",
                         "category": category,
-                        "count": len(docs_needing_content)
+                        "enriched": enriched_count,
+                        "total": len(urls)
                     }
                 )
 
-            # Create task for this category
-            enrichment_tasks.append({
-                'field': curated_field,
+            return {
                 'category': category,
-                'label': label,
-                'docs': docs_needing_content,
-                'curated_docs': curated_docs
-            })
-
-        # Process all categories in parallel
-        if enrichment_tasks:
-            async def process_category(task):
-                try:
-                    raw_contents = await self.fetch_raw_content(
-                        list(task['docs'].keys()),
-                        websocket_manager,
-                        job_id,
-                        task['category']
-                    )
-                    
-                    enriched_count = 0
-                    error_count = 0
-                    
-                    for url, content_or_error in raw_contents.items():
-                        if isinstance(content_or_error, dict) and content_or_error.get('error'):
-                            # This is an error result - just skip it
-                            error_count += 1
-                        elif content_or_error:
-                            # This is a successful content
-                            task['curated_docs'][url]['raw_content'] = content_or_error
-                            enriched_count += 1
-
-                    # Update state with enriched documents
-                    state[task['field']] = task['curated_docs']
-                    
-                    if websocket_manager and job_id:
-                        await websocket_manager.send_status_update(
-                            job_id=job_id,
-                            status="category_complete",
-                            message=f"Completed {task['label']} documents",
-                            result={
-                                "step": "Enriching",
-                                "category": task['category'],
-                                "enriched": enriched_count,
-                                "total": len(task['docs'])
-                            }
-                        )
-                    
-                    return {
-                        'category': task['category'],
-                        'enriched': enriched_count,
-                        'total': len(task['docs']),
-                        'errors': error_count
-                    }
-                except Exception as e:
-                    # Log the error but don't fail the entire process
-                    print(f"Error processing category {task['category']}: {e}")
-                    return {
-                        'category': task['category'],
-                        'enriched': 0,
-                        'total': len(task['docs']),
-                        'errors': len(task['docs'])
-                    }
-
-            # Process all categories in parallel
-            results = await asyncio.gather(*[process_category(task) for task in enrichment_tasks])
-            
-            # Calculate totals
-            total_enriched = sum(r['enriched'] for r in results)
-            total_documents = sum(r['total'] for r in results)
-            total_errors = sum(r.get('errors', 0) for r in results)
-
-            # Send final status update
-            if websocket_manager and job_id:
-                status_message = f"Content enrichment complete. Successfully enriched {total_enriched}/{total_documents} documents"
-                if total_errors > 0:
-                    status_message += f". Skipped {total_errors} documents."
-                
-                await websocket_manager.send_status_update(
-                    job_id=job_id,
-                    status="enrichment_complete",
-                    message=status_message,
-                    result={
-                        "step": "Enriching",
-                        "total_enriched": total_enriched,
-                        "total_documents": total_documents,
-                        "total_errors": total_errors
-                    }
-                )
+                'enriched': enriched_count,
+                'total': len(urls),
+                'errors': error_count
+            }
+        except Exception as e:
+            # Log the error but don't fail the entire process
+            print(f"Error processing category {category}: {e}")
+            return {
+                'category': category,
+                'enriched': 0,
+                'total': len(urls),
+                'errors': len(urls)
+            }
+
+    async def enrich_category(self, state: ResearchState, data_field: str, category: str, label: str) -> Dict[str, int]:
+        """Enrich the curated documents of a single category, for the per-category lanes."""
+        curated_field = f'curated_{data_field}'
+        curated_docs = state.get(curated_field, {})
+        if not self.enabled:
+            return {'category': category, 'enriched': 0, 'total': 0, 'errors': 0}
+        if running_short(state, ENRICHMENT_SECONDS):
+            # Briefing from search snippets is better than missing the deadline
+            logger.info(f"Skipping {category} enrichment to meet the job deadline")
+            return {'category': category, 'enriched': 0, 'total': 0, 'errors': 0}
+        urls, decisions = self.policy.select(curated_docs)
+        logger.info(f"Enrichment plan for {category}: {decisions}")
+        if not urls:
+            return {'category': category, 'enriched': 0, 'total': 0, 'errors': 0}
 
-        # Update state with enrichment message
-        messages = state.get('messages', [])
-        messages.append(AIMessage(content="\n".join(msg)))
-        state['messages'] = messages
-        
-        return state
+        websocket_manager = state.get('websocket_manager')
+        job_id = state.get('job_id')
+        if websocket_manager and job_id:
+            await websocket_manager.send_status_update(
+                job_id=job_id,
+                status="category_start",
+                message=f"Processing {label} documents",
+                result={
+                    "step": "Enriching",
+                    "category": category,
+                    "count": len(urls),
+                    "decisions": decisions
+                }
+            )
 
-    async def run(self, state: ResearchState) -> ResearchState:
-        try:
-            return await self.enrich_data(state)
-        except Exception as e:
-            # Log the error but don't fail the research process
-            print(f"Error in enrichment process: {e}")
-            # Return the original state without any enrichment
-            return state 
\ No newline at end of file
+        result = await self.enrich_documents(curated_docs, urls, websocket_manager, job_id, category, label)
+        state[curated_field] = curated_docs
+        return result
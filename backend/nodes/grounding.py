@@ -1,8 +1,11 @@
 from langchain_core.messages import AIMessage
-from tavily import AsyncTavilyClient
+import asyncio
 import os
 import logging
 from ..classes import InputState, ResearchState
+from ..services.site_crawler import SiteCrawler
+from ..services.tavily_client import ResilientTavilyClient
+from ..utils.site_index import SiteIndex
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +13,76 @@ class GroundingNode:
     """Gathers initial grounding data about the company."""
     
     def __init__(self) -> None:
-        self.tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        self.tavily_client = ResilientTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        self.crawler = SiteCrawler(self.tavily_client)
+        self.site_task: asyncio.Task | None = None  # Website extraction of the current job
+
+    async def extract_site(self, state: InputState, url: str) -> SiteIndex:
+        """Crawl the company website and split it into passages, empty on failure."""
+        company = state.get('company', 'Unknown Company')
+        site_scrape = {}
+        logger.info(f"Starting website analysis for {url}")
+
+        # Send initial briefing status
+        if websocket_manager := state.get('websocket_manager'):
+            if job_id := state.get('job_id'):
+                await websocket_manager.send_status_update(
+                    job_id=job_id,
+                    status="processing",
+                    message="Analyzing company website",
+                    result={"step": "Initial Site Scrape"}
+                )
+
+        try:
+            logger.info("Initiating site crawl")
+            site_scrape = await self.crawler.crawl(url, company)
+
+            if site_scrape:
+                logger.info(f"Successfully extracted {len(site_scrape)} website pages")
+                if websocket_manager := state.get('websocket_manager'):
+                    if job_id := state.get('job_id'):
+                        await websocket_manager.send_status_update(
+                            job_id=job_id,
+                            status="processing",
+                            message=f"Successfully extracted content from {len(site_scrape)} website pages",
+                            result={"step": "Initial Site Scrape", "pages": list(site_scrape)}
+                        )
+            else:
+                logger.warning("No content found in extraction results")
+                if websocket_manager := state.get('websocket_manager'):
+                    if job_id := state.get('job_id'):
+                        await websocket_manager.send_status_update(
+                            job_id=job_id,
+                            status="processing",
+                            message="⚠️ No content found in provided URL",
+                            result={"step": "Initial Site Scrape"}
+                        )
+        except Exception as e:
+            error_str = str(e)
+            logger.error(f"Website extraction error: {error_str}", exc_info=True)
+            error_msg = f"⚠️ Error extracting website content: {error_str}"
+            print(error_msg)
+            if websocket_manager := state.get('websocket_manager'):
+                if job_id := state.get('job_id'):
+                    await websocket_manager.send_status_update(
+                        job_id=job_id,
+                        status="website_error",
+                        message=error_msg,
+                        result={
+                            "step": "Initial Site Scrape", 
+                            "error": error_str,
+                            "continue_research": True  # Continue with research even if website extraction fails
+                        }
+                    )
+        # Segmented once here; lanes only pick the passages they need
+        return await asyncio.to_thread(SiteIndex, site_scrape)
+
+    async def site_index(self) -> SiteIndex:
+        """Wait for the website extraction started by initial_search."""
+        if self.site_task is None:
+            return SiteIndex({})
+        # Shielded, since every lane awaits the same extraction
+        return await asyncio.shield(self.site_task)
 
     async def initial_search(self, state: InputState) -> ResearchState:
         # Add debug logging at the start to check websocket manager
@@ -34,76 +106,12 @@ class GroundingNode:
                     result={"step": "Initializing"}
                 )
 
-        site_scrape = {}
-
         # 仅在有URL时尝试提取
         if url := state.get('company_url'):
             msg += f"\n🌐 Analyzing company website: {url}"
-            logger.info(f"Starting website analysis for {url}")
-            
-            # Send initial briefing status
-            if websocket_manager := state.get('websocket_manager'):
-                if job_id := state.get('job_id'):
-                    await websocket_manager.send_status_update(
-                        job_id=job_id,
-                        status="processing",
-                        message="Analyzing company website",
-                        result={"step": "Initial Site Scrape"}
-                    )
-
-            try:
-                logger.info("Initiating Tavily extraction")
-                site_extraction = await self.tavily_client.extract(url, extract_depth="basic")
-                
-                raw_contents = []
-                for item in site_extraction.get("results", []):
-                    if content := item.get("raw_content"):
-                        raw_contents.append(content)
-                
-                if raw_contents:
-                    site_scrape = {
-                        'title': company,
-                        'raw_content': "\n\n".join(raw_contents)
-                    }
-                    logger.info(f"Successfully extracted {len(raw_contents)} content sections")
-                    msg += f"\n✅ Successfully extracted content from website"
-                    if websocket_manager := state.get('websocket_manager'):
-                        if job_id := state.get('job_id'):
-                            await websocket_manager.send_status_update(
-                                job_id=job_id,
-                                status="processing",
-                                message="Successfully extracted content from website",
-                                result={"step": "Initial Site Scrape"}
-                            )
-                else:
-                    logger.warning("No content found in extraction results")
-                    msg += f"\n⚠️ No content found in website extraction"
-                    if websocket_manager := state.get('websocket_manager'):
-                        if job_id := state.get('job_id'):
-                            await websocket_manager.send_status_update(
-                                job_id=job_id,
-                                status="processing",
-                                message="⚠️ No content found in provided URL",
-                                result={"step": "Initial Site Scrape"}
-                            )
-            except Exception as e:
-                error_str = str(e)
-                logger.error(f"Website extraction error: {error_str}", exc_info=True)
-                error_msg = f"⚠️ Error extracting website content: {error_str}"
-                print(error_msg)
-                msg += f"\n{error_msg}"
-                if websocket_manager := state.get('websocket_manager'):
-                    if job_id := state.get('job_id'):
-                        await websocket_manager.send_status_update(
-                            job_id=job_id,
-                            status="website_error",
-                            message=error_msg,
-                            result={
-                                "step": "Initial Site Scrape", 
-                                "error": error_str,
-                                "continue_research": True  # Continue with research even if website extraction fails
-                            }
-                        )
+            # The extraction runs alongside query planning and searching;
+            # lanes wait for it only when they collect their documents
+            self.site_task = asyncio.create_task(self.extract_site(state, url))
         else:
             msg += "\n⏩ No company URL provided, proceeding directly to research phase"
             if websocket_manager := state.get('websocket_manager'):
@@ -132,16 +140,14 @@ class GroundingNode:
             "industry": state.get('industry'),
             # Initialize research fields
             "messages": [AIMessage(content=msg)],
-            "site_scrape": site_scrape,
             # Pass through websocket info
             "websocket_manager": state.get('websocket_manager'),
-            "job_id": state.get('job_id')
+            "job_id": state.get('job_id'),
+            # Pass through the job's time budget
+            "deadline_s": state.get('deadline_s'),
+            "deadline_at": state.get('deadline_at')
         }
 
-        # If there was an error in the initial extraction, store it in the state
-        if "⚠️ Error extracting website content:" in msg:
-            research_state["error"] = error_str
-
         return research_state
 
     async def run(self, state: InputState) -> ResearchState:
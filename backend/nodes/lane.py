@@ -0,0 +1,74 @@
+from typing import Any, Awaitable, Callable, Dict
+import logging
+from ..classes import ResearchState
+from .collector import Collector
+from .curator import Curator
+from .enricher import Enricher
+from .condenser import Condenser
+from .briefing import Briefing
+from ..utils.site_index import SiteIndex
+
+logger = logging.getLogger(__name__)
+
+class CategoryLane:
+    """Takes one research category from search through to its briefing.
+
+    A lane only waits on its own researcher, so a slow category no longer
+    holds back curation, enrichment and briefing of the others. All lanes
+    join at the editor.
+    """
+
+    def __init__(self, category: str, label: str, researcher: Any, collector: Collector,
+                 site_index: Callable[[], Awaitable[SiteIndex]], curator: Curator,
+                 enricher: Enricher, condenser: Condenser, briefing: Briefing) -> None:
+        self.category = category
+        self.label = label
+        self.researcher = researcher
+        self.collector = collector
+        self.site_index = site_index  # Awaits the website extraction started at grounding
+        self.curator = curator
+        self.enricher = enricher
+        self.condenser = condenser
+        self.briefing = briefing
+
+    async def run(self, state: ResearchState) -> Dict[str, Any]:
+        data_field = f'{self.category}_data'
+        curated_field = f'curated_{data_field}'
+        briefing_key = f'{self.category}_briefing'
+
+        # Lanes run concurrently, so each works on its own copy of the state
+        # and only returns the keys of its category
+        lane_state = dict(state)
+        lane_state['messages'] = list(state.get('messages', []))
+
+        result = await self.researcher.run(lane_state)
+        lane_state[data_field] = result.get(data_field, {})
+        logger.info(f"{self.category} lane found {len(lane_state[data_field])} documents")
+
+        await self.collector.collect_category(
+            lane_state, data_field, self.label, await self.site_index(), self.researcher.site_query
+        )
+
+        await self.curator.curate_category(lane_state, data_field, self.category)
+        await self.enricher.enrich_category(lane_state, data_field, self.category, self.label)
+        try:
+            await self.condenser.condense_field(lane_state, data_field)
+        except Exception as e:
+            # Briefing can still work from the uncondensed content
+            logger.error(f"Error condensing {self.category} content: {e}")
+
+        context = {
+            "company": state.get('company', 'Unknown Company'),
+            "industry": state.get('industry', 'Unknown'),
+            "hq_location": state.get('hq_location', 'Unknown'),
+            "websocket_manager": state.get('websocket_manager'),
+            "job_id": state.get('job_id'),
+            "deadline_at": state.get('deadline_at')
+        }
+        await self.briefing.brief_category(lane_state, self.category, context)
+
+        return {
+            data_field: lane_state[data_field],
+            curated_field: lane_state.get(curated_field, {}),
+            briefing_key: lane_state.get(briefing_key, '')
+        }
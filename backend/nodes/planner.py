@@ -0,0 +1,171 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from datetime import datetime
+from typing import Any, Dict, List
+import json
+import logging
+import os
+import re
+from ..classes import ResearchState
+from ..services.clients import get_clients
+from ..utils.concurrency import llm_semaphore
+from ..utils.deadline import query_count
+from ..utils.dedup import query_tokens, token_jaccard
+from ..utils.llm_cache import llm_cache
+
+logger = logging.getLogger(__name__)
+
+class QueryPlanner:
+    """Generates the search queries of every analyst in one LLM call.
+
+    Researchers pick up their slice from state['planned_queries'] and only
+    generate queries themselves when planning failed.
+    """
+
+    def __init__(self, researchers: Dict[str, Any], speculative: bool | None = None) -> None:
+        self.researchers = researchers  # category -> researcher, in planning order
+        # Search templated queries while the LLM is still planning
+        if speculative is None:
+            speculative = os.getenv("SPECULATIVE_QUERIES", "true").lower() in ("1", "true", "yes")
+        self.speculative = speculative
+        self.duplicate_threshold = 0.7  # Token overlap at which two queries count as the same
+        self.max_queries = 4  # Queries per analyst when the job is not short on time
+
+        openai_key = os.getenv("OPENAI_API_KEY")
+        if not openai_key:
+            raise ValueError("OPENAI_API_KEY environment variable is not set")
+        self.openai_client = get_clients().llm(
+            model="qwen2.5_72b_instruct-gptq-int4",
+            openai_api_key=openai_key,
+            openai_api_base="http://172.17.3.88:8021/v1",
+            temperature=0,
+            max_tokens=4096
+        )
+
+    def build_messages(self, state: ResearchState, count: int) -> list:
+        company = state.get("company", "Unknown Company")
+        industry = state.get("industry", "Unknown Industry")
+        hq = state.get("hq_location", "Unknown HQ")
+        year = datetime.now().year
+
+        sections = "\n".join(
+            f"### {category}\n{researcher.query_prompt.format(company=company, industry=industry, hq=hq, year=year).strip()}\n"
+            for category, researcher in self.researchers.items()
+        )
+        example = json.dumps({category: ["..."] for category in self.researchers}, ensure_ascii=False)
+        # The plan is cached by these messages, so they name the year but not the day
+        return [
+            SystemMessage(content=f"你正在研究{company}，这是一家{industry}行业的公司。"),
+            HumanMessage(content=f"""正在研究{company}，研究年份：{year}。
+请同时为以下{len(self.researchers)}个研究方向分别生成检索查询：
+
+{sections}
+重要提示:
+- 只关注与{company}相关的具体信息
+- 查询要简洁明了，直奔主题
+- 每个方向请严格给出{count}条检索查询，不要使用连字符或破折号
+- 不同方向之间不要出现相同或相近的查询
+- 不要对行业做任何假设，只能使用已提供的行业信息
+
+请只输出一个JSON对象，键为方向名称，值为查询字符串数组，例如：{example}
+不要输出任何其他内容。""")
+        ]
+
+    def parse_plan(self, text: str, count: int) -> Dict[str, List[str]]:
+        """Read the JSON plan, keeping only known categories and string queries."""
+        match = re.search(r'\{.*\}', text or '', re.DOTALL)
+        if not match:
+            raise ValueError("No JSON object in planner response")
+        raw_plan = json.loads(match.group(0))
+        plan = {}
+        for category in self.researchers:
+            queries = raw_plan.get(category) or []
+            if isinstance(queries, str):
+                queries = [queries]
+            plan[category] = [query.strip() for query in queries if isinstance(query, str) and query.strip()][:count]
+        return plan
+
+    def dedupe_plan(self, plan: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Drop queries that repeat an earlier one, in this or another category.
+
+        Every category keeps at least its first query.
+        """
+        seen: List[set] = []
+        deduped = {}
+        for category, queries in plan.items():
+            kept = []
+            for query in queries:
+                tokens = query_tokens(query)
+                if any(token_jaccard(tokens, other) >= self.duplicate_threshold for other in seen):
+                    logger.info(f"Dropping duplicate {category} query: {query}")
+                    continue
+                kept.append(query)
+                seen.append(tokens)
+            if not kept and queries:
+                kept = queries[:1]
+            deduped[category] = kept
+        return deduped
+
+    async def plan_queries(self, state: ResearchState) -> Dict[str, Any]:
+        company = state.get('company', 'Unknown Company')
+        websocket_manager = state.get('websocket_manager')
+        job_id = state.get('job_id')
+        count = query_count(state, self.max_queries)
+
+        if websocket_manager and job_id:
+            await websocket_manager.send_status_update(
+                job_id=job_id,
+                status="processing",
+                message=f"Planning research queries for {company}",
+                result={"step": "Query Planning"}
+            )
+
+        messages = self.build_messages(state, count)
+        cache = llm_cache()
+        cache_key = cache.fingerprint(
+            self.openai_client.model_name, messages, temperature=self.openai_client.temperature
+        )
+        if (plan := cache.get(cache_key)) is None:
+            async with llm_semaphore():
+                response = await self.openai_client.ainvoke(messages)
+            plan = self.dedupe_plan(self.parse_plan(response.content, count))
+            cache.set(cache_key, plan)
+
+        logger.info(f"Planned queries for {company}: {plan}")
+        for category, queries in plan.items():
+            researcher = self.researchers[category]
+            if websocket_manager and job_id:
+                for number, query in enumerate(queries, start=1):
+                    await websocket_manager.send_status_update(
+                        job_id=job_id,
+                        status="query_generated",
+                        message="Generated new research query",
+                        result={
+                            "query": query,
+                            "query_number": number,
+                            "category": researcher.analyst_type,
+                            "is_complete": True
+                        }
+                    )
+
+        total = sum(len(queries) for queries in plan.values())
+        return {
+            'planned_queries': plan,
+            'messages': state.get('messages', []) + [
+                AIMessage(content=f"🗺️ Planned {total} research queries for {company}")
+            ]
+        }
+
+    async def run(self, state: ResearchState) -> Dict[str, Any]:
+        speculative_queries = {}
+        if self.speculative:
+            speculative_queries = {
+                category: researcher.speculate(state) for category, researcher in self.researchers.items()
+            }
+        try:
+            result = await self.plan_queries(state)
+        except Exception as e:
+            # Each researcher falls back to generating its own queries
+            logger.error(f"Query planning failed: {e}")
+            result = {'planned_queries': {}}
+        result['speculative_queries'] = speculative_queries
+        return result
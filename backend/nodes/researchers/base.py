@@ -1,17 +1,41 @@
 import os
 from datetime import datetime
-from langchain_openai import ChatOpenAI
+from string import Formatter
 from langchain_core.messages import HumanMessage, SystemMessage
-from tavily import AsyncTavilyClient
 from ...classes import ResearchState
-from typing import Dict, Any, List
+from ...services.clients import get_clients
+from ...services.tavily_client import ResilientTavilyClient
+from typing import Dict, Any, List, Optional
 import logging
 from ...utils.references import clean_title
+from ...utils.deadline import query_count
+from ...utils.dedup import query_tokens, token_jaccard
+from ...utils.llm_cache import llm_cache
+from ...utils.search_budget import SearchBudget
 import asyncio
 
 logger = logging.getLogger(__name__)
 
 class BaseResearcher:
+    category = "base"  # Report section the researcher gathers documents for
+    site_query = "{company}"  # Query recorded on the company website document, formatted with company
+    query_prompt = ""  # Query generation instructions, formatted with company, industry, hq and year
+    # Queries that need no LLM, formatted with company, year and industry
+    query_templates = [
+        "{company} overview {year}",
+        "{company} recent news {year}",
+        "{company} financial reports {year}",
+        "{company} industry analysis {year}"
+    ]
+    duplicate_query_threshold = 0.7  # Token overlap at which two queries count as the same
+    max_queries = 4  # Search queries per analyst when the job is not short on time
+    max_results = 5  # Tavily results per query
+    search_depth = "basic"
+    search_score_threshold = 0.4  # Score at which a result counts as good, as in Curator
+    search_target_docs = 8  # Good documents after which the remaining queries are skipped
+    search_wave_size = 2  # Queries searched together before the budget is checked
+    max_raw_content_chars = 20000  # Raw content kept per result when search returns it
+
     def __init__(self):
         tavily_key = os.getenv("TAVILY_API_KEY")
         openai_key = os.getenv("OPENAI_API_KEY")
@@ -19,8 +43,8 @@ class BaseResearcher:
         if not tavily_key or not openai_key:
             raise ValueError("Missing API keys")
             
-        self.tavily_client = AsyncTavilyClient(api_key=tavily_key)
-        self.openai_client = ChatOpenAI(
+        self.tavily_client = ResilientTavilyClient(api_key=tavily_key)
+        self.openai_client = get_clients().llm(
             model="qwen2.5_72b_instruct-gptq-int4", # model_name is deprecated, use model
             openai_api_key=openai_key,
             openai_api_base="http://172.17.3.88:8021/v1", # base_url is deprecated, use openai_api_base
@@ -29,6 +53,10 @@ class BaseResearcher:
             max_tokens=4096
         )
         self.analyst_type = "base_researcher"  # Default type
+        self.speculative_tasks: set = set()
+        # Fetch page content with the search itself, leaving Enricher only
+        # the results that came back without it
+        self.include_raw_content = os.getenv("SEARCH_RAW_CONTENT", "false").lower() in ("1", "true", "yes")
 
     @property
     def analyst_type(self) -> str:
@@ -47,18 +75,50 @@ class BaseResearcher:
         current_year = datetime.now().year
         websocket_manager = state.get('websocket_manager')
         job_id = state.get('job_id')
+        # Fewer queries when the job is short on time
+        count = query_count(state, self.max_queries)
+
+        # The query planner may already have generated queries for every analyst
+        if planned_queries := (state.get('planned_queries') or {}).get(self.category):
+            logger.info(f"Using planned queries for {self.analyst_type}: {planned_queries}")
+            return planned_queries[:count]
         
         try:
             logger.info(f"Generating queries for {company} as {self.analyst_type}")
             
+            # Only the year goes into the prompt: a full date would change the
+            # cache key below every day, at the cost of no day-level recency hint
             messages = [
                 SystemMessage(content=f"你正在研究{company}，这是一家{industry}行业的公司。"),
                 HumanMessage(
-                    content=f"""正在研究{company}，研究日期：{datetime.now().strftime("%B %d, %Y")}。
-{self._format_query_prompt(prompt, company, industry, hq, current_year)}"""
+                    content=f"""正在研究{company}，研究年份：{current_year}。
+{self._format_query_prompt(prompt, company, industry, hq, current_year, count)}"""
                 )
             ]
 
+            # Query generation runs at temperature 0, so repeat research of the
+            # same company by the same analyst can reuse the earlier answer
+            cache = llm_cache()
+            cache_key = cache.fingerprint(
+                self.openai_client.model_name, messages, temperature=self.openai_client.temperature
+            )
+            if cached_queries := cache.get(cache_key):
+                logger.info(f"Using cached queries for {company} as {self.analyst_type}: {cached_queries}")
+                if websocket_manager and job_id:
+                    for number, query in enumerate(cached_queries, start=1):
+                        await websocket_manager.send_status_update(
+                            job_id=job_id,
+                            status="query_generated",
+                            message="Generated new research query",
+                            result={
+                                "query": query,
+                                "query_number": number,
+                                "category": self.analyst_type,
+                                "is_complete": True
+                            }
+                        )
+                return list(cached_queries)
+
             response_stream = self.openai_client.astream(messages)
             
             queries = []
@@ -132,9 +192,10 @@ class BaseResearcher:
             if not queries:
                 raise ValueError(f"No queries generated for {company}")
 
-            # Limit to at most 4 queries.
-            queries = queries[:4]
+            # Limit to the requested number of queries.
+            queries = queries[:count]
             logger.info(f"Final queries for {self.analyst_type}: {queries}")
+            cache.set(cache_key, list(queries))
             
             return queries
             
@@ -149,7 +210,7 @@ class BaseResearcher:
                 )
             return []
 
-    def _format_query_prompt(self, prompt_template: str, company: str, industry: str, hq: str, year: int):
+    def _format_query_prompt(self, prompt_template: str, company: str, industry: str, hq: str, year: int, count: int = 4):
         # Format the passed-in prompt template first
         # We use a dictionary for formatting to avoid errors if a placeholder is not in the prompt_template
         # and to make it more readable.
@@ -160,17 +221,74 @@ class BaseResearcher:
         重要提示:
         - 只关注与{company}相关的具体信息
         - 查询要简洁明了，直奔主题
-        - 请严格给出4条检索查询（每行一条），不要使用连字符或破折号
+        - 请严格给出{count}条检索查询（每行一条），不要使用连字符或破折号
         - 不要对行业做任何假设，只能使用已提供的行业信息"""
 
-    def _fallback_queries(self, company, year):
+    def _fallback_queries(self, company, year, industry=""):
+        # A template missing one of its values would search off-topic, e.g.
+        # an industry trend query without the industry
+        values = {"company": company, "year": year, "industry": industry}
         return [
-            f"{company} overview {year}",
-            f"{company} recent news {year}",
-            f"{company} financial reports {year}",
-            f"{company} industry analysis {year}"
+            template.format(**values).strip()
+            for template in self.query_templates
+            if all(values.get(field) for _, field, _, _ in Formatter().parse(template) if field)
         ]
 
+    def search_params(self) -> Dict[str, Any]:
+        """Tavily search parameters used for every query of this analyst."""
+        # Add news topic for news analysts
+        search_params = {
+            "search_depth": self.search_depth,
+            "include_raw_content": self.include_raw_content,
+            "max_results": self.max_results
+        }
+        
+        if self.analyst_type == "news_analyst":
+            search_params["topic"] = "news"
+        elif self.analyst_type == "financial_analyst":
+            search_params["topic"] = "finance"
+        return search_params
+
+    def speculate(self, state: ResearchState) -> List[str]:
+        """Start searching the templated queries before any LLM query exists.
+
+        The searches run in the background through tavily_client; with the
+        job's SearchBroker in place, searching the same query later picks
+        up the in-flight result instead of issuing it again.
+        """
+        queries = self._fallback_queries(
+            state.get('company', 'Unknown Company'), datetime.now().year, state.get('industry') or ''
+        )
+        search_params = self.search_params()
+        for query in queries:
+            task = asyncio.create_task(self.tavily_client.search(query, **search_params))
+            self.speculative_tasks.add(task)
+            task.add_done_callback(self._finish_speculation)
+        logger.info(f"Speculatively searching for {self.analyst_type}: {queries}")
+        return queries
+
+    def _finish_speculation(self, task: asyncio.Task) -> None:
+        self.speculative_tasks.discard(task)
+        if not task.cancelled() and (error := task.exception()):
+            logger.warning(f"Speculative search failed for {self.analyst_type}: {error}")
+
+    def uncovered_speculative(self, state: ResearchState, queries: List[str]) -> List[str]:
+        """Speculative queries of this category that no planned query already covers."""
+        speculative = (state.get('speculative_queries') or {}).get(self.category) or []
+        covered = [query_tokens(query) for query in queries]
+        uncovered = []
+        for query in speculative:
+            tokens = query_tokens(query)
+            if any(token_jaccard(tokens, other) >= self.duplicate_query_threshold for other in covered):
+                logger.info(f"Dropping speculative query covered by a planned one: {query}")
+                continue
+            uncovered.append(query)
+        return uncovered
+
+    def truncate_raw_content(self, result: Dict[str, Any]) -> str:
+        """Raw page content of a search result, cut to max_raw_content_chars."""
+        return (result.get("raw_content") or "")[:self.max_raw_content_chars]
+
     async def search_single_query(self, query: str, websocket_manager=None, job_id=None) -> Dict[str, Any]:
         """Execute a single search query with proper error handling."""
         if not query or len(query.split()) < 3:
@@ -188,21 +306,9 @@ class BaseResearcher:
                     }
                 )
 
-            # Add news topic for news analysts
-            search_params = {
-                "search_depth": "basic",
-                "include_raw_content": False,
-                "max_results": 5
-            }
-            
-            if self.analyst_type == "news_analyst":
-                search_params["topic"] = "news"
-            elif self.analyst_type == "financial_analyst":
-                search_params["topic"] = "finance"
-
             results = await self.tavily_client.search(
                 query,
-                **search_params
+                **self.search_params()
             )
             
             docs = {}
@@ -230,6 +336,8 @@ class BaseResearcher:
                     "source": "web_search",
                     "score": result.get("score", 0.0)
                 }
+                if raw_content := self.truncate_raw_content(result):
+                    docs[url]["raw_content"] = raw_content
 
             if websocket_manager and job_id:
                 await websocket_manager.send_status_update(
@@ -260,7 +368,8 @@ class BaseResearcher:
                 )
             return {}
 
-    async def search_documents(self, state: ResearchState, queries: List[str]) -> Dict[str, Any]:
+    async def search_documents(self, state: ResearchState, queries: List[str],
+                               search_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Execute all Tavily searches in parallel at maximum speed
         """
@@ -286,16 +395,7 @@ class BaseResearcher:
             )
 
         # Prepare all search parameters upfront
-        search_params = {
-            "search_depth": "basic",
-            "include_raw_content": False,
-            "max_results": 5
-        }
-        
-        if self.analyst_type == "news_analyst":
-            search_params["topic"] = "news"
-        elif self.analyst_type == "financial_analyst":
-            search_params["topic"] = "finance"
+        search_params = search_params or self.search_params()
 
         if websocket_manager and job_id:
             await websocket_manager.send_status_update(
@@ -313,16 +413,16 @@ class BaseResearcher:
             for query in queries
         ]
 
-        # Execute all API calls in parallel
-        try:
-            results = await asyncio.gather(*search_tasks)
-        except Exception as e:
-            logger.error(f"Error during parallel search execution: {e}")
-            return {}
+        # Execute all API calls in parallel; a query that still fails after
+        # retries only loses its own results
+        results = await asyncio.gather(*search_tasks, return_exceptions=True)
 
         # Process results
         merged_docs = {}
         for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.error(f"Search failed for query '{query}': {result}")
+                continue
             for item in result.get("results", []):
                 if not item.get("content") or not item.get("url"):
                     continue
@@ -343,6 +443,8 @@ class BaseResearcher:
                     "source": "web_search",
                     "score": item.get("score", 0.0)
                 }
+                if raw_content := self.truncate_raw_content(item):
+                    merged_docs[url]["raw_content"] = raw_content
 
         # Send completion status
         if websocket_manager and job_id:
@@ -358,3 +460,43 @@ class BaseResearcher:
             )
 
         return merged_docs
+
+    async def search_adaptively(self, state: ResearchState, queries: List[str]) -> Dict[str, Any]:
+        """Search the planned queries in waves until the category has enough good documents.
+
+        The speculative results are collected first. See SearchBudget: at
+        least one wave of planned queries always runs, later ones are
+        skipped once enough documents clear the curation threshold, and
+        searched harder when a wave comes back poor.
+        """
+        budget = SearchBudget(
+            target_docs=self.search_target_docs,
+            score_threshold=self.search_score_threshold,
+            wave_size=self.search_wave_size
+        )
+        search_params = self.search_params()
+        docs = {}
+
+        # Speculative searches have been in flight since planning, so their
+        # results cost nothing extra; they count towards the budget but can
+        # never stand in for the planned queries
+        if speculative := self.uncovered_speculative(state, queries):
+            results = await self.search_documents(state, speculative)
+            budget.record(results, speculative=True)
+            docs.update(results)
+
+        waves = budget.waves(queries)
+        for number, wave in enumerate(waves):
+            if budget.satisfied():
+                skipped = [query for later in waves[number:] for query in later]
+                logger.info(f"{self.analyst_type} has {budget.good_count()} good documents; "
+                            f"skipping queries: {skipped}")
+                break
+            results = await self.search_documents(state, wave, search_params)
+            new_good = budget.record(results)
+            docs.update(results)
+            if escalated := budget.escalate(search_params, new_good, len(wave)):
+                logger.info(f"{self.analyst_type} found {new_good} good documents in {len(wave)} queries; "
+                            f"escalating search to {escalated}")
+                search_params = escalated
+        return docs
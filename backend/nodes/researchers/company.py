@@ -5,6 +5,21 @@ from ...classes import ResearchState
 from .base import BaseResearcher
 
 class CompanyAnalyzer(BaseResearcher):
+    category = "company"
+    site_query = "Company overview and information about {company}"
+    query_prompt = """
+        针对{company}（所属行业：{industry}），生成公司基本面相关的检索查询，包括但不限于以下方面：
+        - 核心产品与服务
+        - 公司历史与重要里程碑
+        - 管理团队
+        - 商业模式与发展战略
+        """
+
+    query_templates = [
+        "{company} 公司简介 产品与服务",
+        "{company} 创始人 管理团队"
+    ]
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "company_analyzer"
@@ -14,13 +29,7 @@ class CompanyAnalyzer(BaseResearcher):
         msg = [f"🏢 Company Analyzer analyzing {company}"]
         
         # Generate search queries using LLM
-        queries = await self.generate_queries(state, """
-        针对{company}（所属行业：{industry}），生成公司基本面相关的检索查询，包括但不限于以下方面：
-        - 核心产品与服务
-        - 公司历史与重要里程碑
-        - 管理团队
-        - 商业模式与发展战略
-        """)
+        queries = await self.generate_queries(state, self.query_prompt)
 
         # Add message to show subqueries with emojis
         subqueries_msg = "🔍 Subqueries for company analysis:\n" + "\n".join([f"• {query}" for query in queries])
@@ -44,25 +53,11 @@ class CompanyAnalyzer(BaseResearcher):
         
         company_data = {}
         
-        # If we have site_scrape data, include it first
-        if site_scrape := state.get('site_scrape'):
-            msg.append("\n📊 Including site scrape data in company analysis...")
-            company_url = state.get('company_url', 'company-website')
-            company_data[company_url] = {
-                'title': state.get('company', 'Unknown Company'),
-                'raw_content': site_scrape,
-                'query': f'Company overview and information about {company}'  # Add a default query for site scrape
-            }
-        
         # Perform additional research with comprehensive search
         try:
-            # Store documents with their respective queries
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                if documents:  # Only process if we got results
-                    for url, doc in documents.items():
-                        doc['query'] = query  # Associate each document with its query
-                        company_data[url] = doc
+            # Documents carry the query that found them; stops early once
+            # enough good documents came back
+            company_data = await self.search_adaptively(state, queries)
             
             msg.append(f"\n✓ Found {len(company_data)} documents")
             if websocket_manager := state.get('websocket_manager'):
@@ -7,6 +7,20 @@ from .base import BaseResearcher
 logger = logging.getLogger(__name__)
 
 class FinancialAnalyst(BaseResearcher):
+    category = "financial"
+    site_query = "Financial information on {company}"
+    query_prompt = """
+                针对{company}（所属行业：{industry}）的财务状况，生成如下相关的检索查询：
+        - 融资历史与估值
+        - 财务报表与关键财务指标
+        - 收入与利润来源
+                """
+
+    query_templates = [
+        "{company} 融资 估值 {year}",
+        "{company} financial results revenue {year}"
+    ]
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "financial_analyzer"
@@ -18,14 +32,7 @@ class FinancialAnalyst(BaseResearcher):
         
         try:
             # Generate search queries
-            queries = await self.generate_queries(
-                state,
-                """
-                针对{company}（所属行业：{industry}）的财务状况，生成如下相关的检索查询：
-        - 融资历史与估值
-        - 财务报表与关键财务指标
-        - 收入与利润来源
-                """)
+            queries = await self.generate_queries(state, self.query_prompt)
             
             # Add message to show subqueries with emojis
             subqueries_msg = "🔍 Subqueries for financial analysis:\n" + "\n".join([f"• {query}" for query in queries])
@@ -47,21 +54,8 @@ class FinancialAnalyst(BaseResearcher):
                         }
                     )
             
-            # Process site scrape data
-            financial_data = {}
-            if site_scrape := state.get('site_scrape'):
-                company_url = state.get('company_url', 'company-website')
-                financial_data[company_url] = {
-                    'title': state.get('company', 'Unknown Company'),
-                    'raw_content': site_scrape,
-                    'query': f'Financial information on {company}'
-                }
-
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                for url, doc in documents.items():
-                    doc['query'] = query
-                    financial_data[url] = doc
+            # Stops early once enough good documents came back
+            financial_data = await self.search_adaptively(state, queries)
 
             # Final status update
             completion_msg = f"Completed analysis with {len(financial_data)} documents"
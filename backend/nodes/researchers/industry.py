@@ -4,6 +4,21 @@ from ...classes import ResearchState
 from .base import BaseResearcher
 
 class IndustryAnalyzer(BaseResearcher):
+    category = "industry"
+    site_query = "Industry analysis on {company}"
+    query_prompt = """
+        针对{company}（所属行业：{industry}），生成行业分析相关的检索查询，包括但不限于以下方面：
+        - 市场地位
+        - 主要竞争对手
+        - {industry} 行业趋势与挑战
+        - 市场规模与增长情况
+        """
+
+    query_templates = [
+        "{company} 竞争对手 市场份额",
+        "{industry} 行业趋势 市场规模 {year}"
+    ]
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "industry_analyzer"
@@ -14,13 +29,7 @@ class IndustryAnalyzer(BaseResearcher):
         msg = [f"🏭 Industry Analyzer analyzing {company} in {industry}"]
         
         # 使用LLM生成行业分析相关的检索查询
-        queries = await self.generate_queries(state, """
-        针对{company}（所属行业：{industry}），生成行业分析相关的检索查询，包括但不限于以下方面：
-        - 市场地位
-        - 主要竞争对手
-        - {industry} 行业趋势与挑战
-        - 市场规模与增长情况
-        """)
+        queries = await self.generate_queries(state, self.query_prompt)
 
         subqueries_msg = "🔍 Subqueries for industry analysis:\n" + "\n".join([f"• {query}" for query in queries])
         messages = state.get('messages', [])
@@ -43,25 +52,11 @@ class IndustryAnalyzer(BaseResearcher):
         
         industry_data = {}
         
-        # If we have site_scrape data, include it first
-        if site_scrape := state.get('site_scrape'):
-            msg.append("\n📊 Including site scrape data in company analysis...")
-            company_url = state.get('company_url', 'company-website')
-            industry_data[company_url] = {
-                'title': state.get('company', 'Unknown Company'),
-                'raw_content': site_scrape,
-                'query': f'Industry analysis on {company}'  # Add a default query for site scrape
-            }
-        
         # Perform additional research with increased search depth
         try:
-            # Store documents with their respective queries
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                if documents:  # Only process if we got results
-                    for url, doc in documents.items():
-                        doc['query'] = query  # Associate each document with its query
-                        industry_data[url] = doc
+            # Documents carry the query that found them; stops early once
+            # enough good documents came back
+            industry_data = await self.search_adaptively(state, queries)
             
             msg.append(f"\n✓ Found {len(industry_data)} documents")
             if websocket_manager := state.get('websocket_manager'):
@@ -4,6 +4,20 @@ from ...classes import ResearchState
 from .base import BaseResearcher
 
 class NewsScanner(BaseResearcher):
+    category = "news"
+    site_query = "News and announcements about {company}"
+    query_prompt = """
+        针对{company}，生成与近期新闻报道相关的检索查询，包括但不限于以下方面：
+        - 公司最新公告
+        - 新闻稿
+        - 新的合作伙伴关系
+        """
+
+    query_templates = [
+        "{company} 最新消息 {year}",
+        "{company} latest news {year}"
+    ]
+
     def __init__(self) -> None:
         super().__init__()
         self.analyst_type = "news_analyzer"
@@ -12,12 +26,7 @@ class NewsScanner(BaseResearcher):
         company = state.get('company', 'Unknown Company')
         msg = [f"📰 News Scanner analyzing {company}"]
         # 使用LLM生成与公司相关新闻的检索查询
-        queries = await self.generate_queries(state, """
-        针对{company}，生成与近期新闻报道相关的检索查询，包括但不限于以下方面：
-        - 公司最新公告
-        - 新闻稿
-        - 新的合作伙伴关系
-        """)
+        queries = await self.generate_queries(state, self.query_prompt)
 
         subqueries_msg = "🔍 Subqueries for news analysis:\n" + "\n".join([f"• {query}" for query in queries])
         messages = state.get('messages', [])
@@ -26,25 +35,11 @@ class NewsScanner(BaseResearcher):
         
         news_data = {}
         
-        # If we have site_scrape data, include it first
-        if site_scrape := state.get('site_scrape'):
-            msg.append("\n📊 Including site scrape data in company analysis...")
-            company_url = state.get('company_url', 'company-website')
-            news_data[company_url] = {
-                'title': state.get('company', 'Unknown Company'),
-                'raw_content': site_scrape,
-                'query': f'News and announcements about {company}'  # Add a default query for site scrape
-            }
-        
         # Perform additional research with recent time filter
         try:
-            # Store documents with their respective queries
-            for query in queries:
-                documents = await self.search_documents(state, [query])
-                if documents:  # Only process if we got results
-                    for url, doc in documents.items():
-                        doc['query'] = query  # Associate each document with its query
-                        news_data[url] = doc
+            # Documents carry the query that found them; stops early once
+            # enough good documents came back
+            news_data = await self.search_adaptively(state, queries)
             
             msg.append(f"\n✓ Found {len(news_data)} documents")
             if websocket_manager := state.get('websocket_manager'):
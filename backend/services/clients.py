@@ -0,0 +1,109 @@
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+from tavily import AsyncTavilyClient
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+TAVILY_BASE_URL = "https://api.tavily.com"
+
+
+class _SharedConnection:
+    """Async context manager that hands out a pooled client without closing it.
+
+    AsyncTavilyClient opens and closes an httpx client around every request;
+    returning this from its client factory makes it reuse the shared pool.
+    """
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        return self.client
+
+    async def __aexit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+class ClientRegistry:
+    """Process-wide HTTP connection pools and API clients shared by all jobs.
+
+    Every upstream gets one pooled httpx client with keep-alive, so jobs no
+    longer pay a TCP and TLS handshake per request. Pools are created
+    lazily and closed on application shutdown through aclose().
+    """
+
+    def __init__(self) -> None:
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+        )
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._tavily: Dict[str, AsyncTavilyClient] = {}
+        self._llms: Dict[Tuple, ChatOpenAI] = {}
+
+    def http_client(self, name: str, **kwargs: Any) -> httpx.AsyncClient:
+        """Pooled httpx client for one upstream; kwargs apply on first use only."""
+        client = self._http.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, http2=HTTP2_AVAILABLE, **kwargs)
+            self._http[name] = client
+            logger.info(f"Opened shared HTTP pool '{name}' (http2={HTTP2_AVAILABLE})")
+        return client
+
+    def tavily(self, api_key: Optional[str] = None) -> AsyncTavilyClient:
+        """AsyncTavilyClient whose requests go through the shared Tavily pool."""
+        api_key = api_key or os.getenv("TAVILY_API_KEY")
+        if (client := self._tavily.get(api_key)) is None:
+            client = AsyncTavilyClient(api_key=api_key)
+            self._tavily[api_key] = client
+        # The API key travels in the pool's default headers, so each key gets its own pool
+        pool = self.http_client(
+            f"tavily-{list(self._tavily).index(api_key)}",
+            base_url=TAVILY_BASE_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}"
+            },
+            # ResilientTavilyClient enforces the per-call deadlines
+            timeout=httpx.Timeout(180.0, connect=10.0)
+        )
+        client._client_creator = lambda: _SharedConnection(pool)
+        return client
+
+    def llm(self, **kwargs: Any) -> ChatOpenAI:
+        """Shared ChatOpenAI for the given settings, using the pooled LLM connection."""
+        key = tuple(sorted(kwargs.items()))
+        llm = self._llms.get(key)
+        if llm is None or llm.http_async_client.is_closed:
+            # Long streamed generations must not hit a read timeout
+            http_async_client = self.http_client("llm", timeout=httpx.Timeout(600.0, connect=10.0))
+            llm = ChatOpenAI(http_async_client=http_async_client, **kwargs)
+            self._llms[key] = llm
+        return llm
+
+    async def aclose(self) -> None:
+        """Close every pool; clients are recreated on next use."""
+        for name, client in self._http.items():
+            await client.aclose()
+            logger.info(f"Closed shared HTTP pool '{name}'")
+        self._http.clear()
+        self._tavily.clear()
+        self._llms.clear()
+
+
+_registry = ClientRegistry()
+
+
+def get_clients() -> ClientRegistry:
+    return _registry
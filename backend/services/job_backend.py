@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _default_job() -> Dict[str, Any]:
+    return {
+        "status": "pending",
+        "result": None,
+        "error": None,
+        "debug_info": [],
+        "company": None,
+        "report": None,
+        "last_update": datetime.now().isoformat()
+    }
+
+
+class _MemorySubscription:
+    """Queue-backed subscription to every job event published in this process."""
+
+    def __init__(self, backend: "InMemoryJobBackend"):
+        self._backend = backend
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def __aiter__(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        return self._iterate()
+
+    async def _iterate(self):
+        while True:
+            yield await self._queue.get()
+
+    async def close(self) -> None:
+        self._backend._subscribers.discard(self._queue)
+
+
+class InMemoryJobBackend:
+    """Job state and event fan-out kept in process memory (single worker).
+
+    Like the Redis backend, a job and its event log expire job_ttl seconds
+    after they were last written.
+    """
+
+    def __init__(self, max_events_per_job: int = 2000, job_ttl: float = 86400) -> None:
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.max_events_per_job = max_events_per_job
+        self.job_ttl = job_ttl
+        self._events: Dict[str, Deque[Tuple[int, Dict[str, Any]]]] = {}
+        self._event_counters: Dict[str, int] = {}
+        # job id -> expiry time, least recently written first
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+
+    def _touch(self, job_id: str) -> None:
+        self._expire()
+        self._expiry[job_id] = time.monotonic() + self.job_ttl
+        self._expiry.move_to_end(job_id)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._expiry and next(iter(self._expiry.values())) <= now:
+            job_id, _ = self._expiry.popitem(last=False)
+            self._jobs.pop(job_id, None)
+            self._events.pop(job_id, None)
+            self._event_counters.pop(job_id, None)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the job record, or None if the job is unknown."""
+        self._expire()
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def update_job(self, job_id: str, **fields: Any) -> None:
+        """Merge fields into the job record, creating it if needed."""
+        self._touch(job_id)
+        job = self._jobs.setdefault(job_id, _default_job())
+        job.update(fields)
+        job["last_update"] = datetime.now().isoformat()
+
+    async def publish(self, job_id: str, message: Dict[str, Any]) -> int:
+        """Append a job event to its log and deliver it to every subscriber."""
+        self._touch(job_id)
+        event_id = self._event_counters.get(job_id, 0) + 1
+        self._event_counters[job_id] = event_id
+        message["event_id"] = event_id
+        log = self._events.setdefault(job_id, deque(maxlen=self.max_events_per_job))
+        log.append((event_id, message))
+        for queue in list(self._subscribers):
+            queue.put_nowait((job_id, message))
+        return event_id
+
+    async def get_events(self, job_id: str, after_id: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return logged events for a job with an id greater than after_id, oldest first."""
+        self._expire()
+        return [(event_id, message) for event_id, message in self._events.get(job_id, ())
+                if event_id > after_id]
+
+    async def subscribe(self) -> _MemorySubscription:
+        """Subscribe to events for all jobs; active as soon as this returns."""
+        subscription = _MemorySubscription(self)
+        self._subscribers.add(subscription._queue)
+        return subscription
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+
+
+class _RedisSubscription:
+    """Pub/sub subscription to the shared job event channel."""
+
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def __aiter__(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        return self._iterate()
+
+    async def _iterate(self):
+        async for item in self._pubsub.listen():
+            if item.get("type") != "message":
+                continue
+            try:
+                payload = json.loads(item["data"])
+                yield payload["job_id"], payload["message"]
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Dropping malformed job event: {e}")
+
+    async def close(self) -> None:
+        await self._pubsub.unsubscribe()
+        await self._pubsub.aclose()
+
+
+class RedisJobBackend:
+    """Job state and event fan-out shared across workers through Redis.
+
+    Any client exposing the ``redis.asyncio`` API can be passed in, which lets
+    a local stand-in such as ``fakeredis.aioredis.FakeRedis`` replace a real
+    server in tests.
+    """
+
+    def __init__(self, client, prefix: str = "research", job_ttl: int = 86400) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.job_ttl = job_ttl
+        self.channel = f"{prefix}:events"
+
+    async def ping(self) -> None:
+        """Raise if the Redis server cannot be reached."""
+        await self.client.ping()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _events_key(self, job_id: str) -> str:
+        return f"{self.prefix}:events:{job_id}"
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.hgetall(self._job_key(job_id))
+        if not raw:
+            return None
+        job = _default_job()
+        for field, value in raw.items():
+            if isinstance(field, bytes):
+                field = field.decode()
+            job[field] = json.loads(value)
+        return job
+
+    async def update_job(self, job_id: str, **fields: Any) -> None:
+        # Each field is stored as its own hash entry so that concurrent
+        # writers merge instead of overwriting each other's updates. The
+        # defaults only fill fields no writer has set yet, in the same
+        # transaction, so a new job can never lose a concurrent update.
+        key = self._job_key(job_id)
+        fields["last_update"] = datetime.now().isoformat()
+        async with self.client.pipeline(transaction=True) as pipe:
+            for field, value in _default_job().items():
+                if field not in fields:
+                    pipe.hsetnx(key, field, json.dumps(value))
+            pipe.hset(key, mapping={k: json.dumps(v) for k, v in fields.items()})
+            pipe.expire(key, self.job_ttl)
+            await pipe.execute()
+
+    async def publish(self, job_id: str, message: Dict[str, Any]) -> int:
+        # The list length after RPUSH doubles as a monotonic per-job event id;
+        # the logged message gets it back from its position when read.
+        key = self._events_key(job_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(message))
+            pipe.expire(key, self.job_ttl)
+            event_id, _ = await pipe.execute()
+        message["event_id"] = event_id
+        await self.client.publish(self.channel, json.dumps({"job_id": job_id, "message": message}))
+        return event_id
+
+    async def get_events(self, job_id: str, after_id: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        raw = await self.client.lrange(self._events_key(job_id), after_id, -1)
+        events = []
+        for event_id, value in enumerate(raw, start=after_id + 1):
+            message = json.loads(value)
+            message["event_id"] = event_id
+            events.append((event_id, message))
+        return events
+
+    async def subscribe(self) -> _RedisSubscription:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+        return _RedisSubscription(pubsub)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_job_backend(redis_url: Optional[str] = None):
+    """Build the job backend: Redis when a URL is given, in-process otherwise."""
+    if not redis_url:
+        return InMemoryJobBackend()
+
+    import redis.asyncio as aioredis
+    return RedisJobBackend(aioredis.from_url(redis_url))
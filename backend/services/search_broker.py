@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+
+from ..utils.dedup import normalize_text, query_tokens, token_jaccard
+
+logger = logging.getLogger(__name__)
+
+# Search parameters that only decide how much of a response comes back, not
+# which results it holds; a search asking for at least as much can serve it
+ADDITIVE_PARAMS = ('max_results', 'include_raw_content')
+DEFAULT_MAX_RESULTS = 5  # Tavily's default
+
+
+class SearchBroker:
+    """Per-job front for Tavily that runs each distinct search and extract once.
+
+    All researchers and the enricher of a job share one broker. A search
+    whose normalized query matches, or nearly matches, one already issued
+    with the same topic and depth waits for that search instead, so every
+    interested category receives the same results. The earlier search must
+    ask for at least as many results, and for raw content if the later one
+    does; the shared response is cut to the results asked for. Extracts are
+    shared by URL. Exposes the same search/extract interface as the Tavily
+    client.
+    """
+
+    def __init__(self, client: Any, duplicate_threshold: float = 0.8) -> None:
+        self.client = client
+        self.duplicate_threshold = duplicate_threshold
+        # params other than ADDITIVE_PARAMS -> [(normalized query, query tokens, params, task)]
+        self._searches: Dict[Tuple, List[Tuple[str, Set[str], Dict[str, Any], asyncio.Task]]] = {}
+        self._extracts: Dict[Tuple, asyncio.Task] = {}
+        self.stats: Counter = Counter()
+
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((key, repr(value)) for key, value in params.items()))
+
+    @staticmethod
+    def _covers(issued: Dict[str, Any], requested: Dict[str, Any]) -> bool:
+        """Whether a search issued with these params answers the requested ones."""
+        return (issued.get('max_results', DEFAULT_MAX_RESULTS) >= requested.get('max_results', DEFAULT_MAX_RESULTS)
+                and (issued.get('include_raw_content') or not requested.get('include_raw_content')))
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        self.stats['search_requests'] += 1
+        normalized = normalize_text(query)
+        tokens = query_tokens(query)
+        key = self._params_key({k: v for k, v in kwargs.items() if k not in ADDITIVE_PARAMS})
+        issued = self._searches.setdefault(key, [])
+
+        for other_normalized, other_tokens, other_params, task in issued:
+            if not self._covers(other_params, kwargs):
+                continue
+            if normalized == other_normalized or token_jaccard(tokens, other_tokens) >= self.duplicate_threshold:
+                self.stats['searches_shared'] += 1
+                logger.info(f"Sharing search results for '{query}'")
+                break
+        else:
+            task = asyncio.create_task(self.client.search(query, **kwargs))
+            entry = (normalized, tokens, dict(kwargs), task)
+            issued.append(entry)
+            # Failed searches may be retried by a later request
+            task.add_done_callback(lambda done: issued.remove(entry) if done.cancelled() or done.exception() else None)
+
+        # Shielded, so one caller giving up does not cancel the search for the others
+        response = await asyncio.shield(task)
+        max_results = kwargs.get('max_results', DEFAULT_MAX_RESULTS)
+        if len(response.get('results') or []) > max_results:
+            response = {**response, 'results': response['results'][:max_results]}
+        return response
+
+    async def extract(self, urls: Any, **kwargs: Any) -> dict:
+        self.stats['extract_requests'] += 1
+        key = (tuple(urls) if isinstance(urls, list) else urls, self._params_key(kwargs))
+        if (task := self._extracts.get(key)) is None:
+            task = asyncio.create_task(self.client.extract(urls, **kwargs))
+            self._extracts[key] = task
+            task.add_done_callback(
+                lambda done: self._extracts.pop(key, None) if done.cancelled() or done.exception() else None
+            )
+        else:
+            self.stats['extracts_shared'] += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,274 @@
+import asyncio
+import ipaddress
+import logging
+import os
+import re
+import socket
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from ..utils.enrichment import url_domain
+from .clients import get_clients
+
+logger = logging.getLogger(__name__)
+
+# Pages worth extracting, in order of preference; each group contributes at
+# most one page, matched against the segments of the URL path
+KEY_PAGES = [
+    ('About', {'about', 'about-us', 'aboutus', 'company', 'who-we-are', 'overview', 'gywm', 'jianjie'}),
+    ('Team', {'team', 'leadership', 'management', 'people', 'founders', 'executives'}),
+    ('Products', {'products', 'product', 'solutions', 'services'}),
+    ('Pricing', {'pricing', 'plans', 'price'}),
+    ('Investors', {'investors', 'investor', 'investor-relations', 'ir'}),
+    ('Press', {'press', 'newsroom', 'news', 'media', 'press-releases'}),
+]
+
+LOC_PATTERN = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>', re.IGNORECASE)
+HREF_PATTERN = re.compile(r'href\s*=\s*["\']([^"\'#]+)["\']', re.IGNORECASE)
+SKIPPED_SUFFIXES = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.zip', '.css', '.js', '.mp4')
+# Second-level labels under which registrations happen, as in example.co.uk or example.com.cn
+SECOND_LEVEL_LABELS = {'ac', 'co', 'com', 'edu', 'gov', 'net', 'org'}
+
+
+def key_page_group(url: str) -> Optional[int]:
+    """Index of the first KEY_PAGES group the URL's path matches, if any."""
+    path = urlparse(url).path.lower()
+    if path.endswith(SKIPPED_SUFFIXES):
+        return None
+    segments = {segment for segment in re.split(r'[/_.]', path) if segment}
+    for index, (_, keywords) in enumerate(KEY_PAGES):
+        if segments & keywords:
+            return index
+    return None
+
+
+def registrable_domain(url: str) -> str:
+    """Domain a site was registered under, e.g. example.co.uk for shop.example.co.uk."""
+    labels = (urlparse(url).hostname or '').rstrip('.').split('.')
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+async def is_public_url(url: str) -> bool:
+    """Whether url is http(s) and its host only resolves to public addresses.
+
+    Keeps the crawler, which fetches URLs supplied by users and by the sites
+    themselves, away from loopback, private and link-local services.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return False
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parsed.hostname, parsed.port or 443,
+                                                             type=socket.SOCK_STREAM)
+    except (OSError, UnicodeError):
+        return False
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split('%')[0])
+        if not address.is_global or address.is_multicast:
+            return False
+    return bool(infos)
+
+
+class SiteCache:
+    """Crawled pages per site and crawl limits with TTL and LRU eviction, shared by all jobs.
+
+    Entries are keyed by (domain, max_pages, max_bytes), so a deep crawl is
+    never answered from a shallower one, and hold no job-specific data.
+    """
+
+    def __init__(self, max_domains: int = 256, ttl_seconds: float = 21600) -> None:
+        self.max_domains = max_domains
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, int, int], Tuple[float, Dict[str, Dict[str, Any]]]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[Dict[str, Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Tuple[str, int, int], pages: Dict[str, Dict[str, Any]]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, pages)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_domains:
+            self._entries.popitem(last=False)
+
+
+_site_cache: Optional[SiteCache] = None
+
+
+def site_cache() -> SiteCache:
+    """Process-wide crawl cache (SITE_CACHE_SIZE, SITE_CACHE_TTL_SECONDS)."""
+    global _site_cache
+    if _site_cache is None:
+        _site_cache = SiteCache(
+            max_domains=int(os.getenv("SITE_CACHE_SIZE", "256")),
+            ttl_seconds=float(os.getenv("SITE_CACHE_TTL_SECONDS", "21600"))
+        )
+    return _site_cache
+
+
+class SiteCrawler:
+    """Bounded crawl of the key pages of a company website.
+
+    Key pages (about, team, products, pricing, investors, press) are found
+    through the sitemap, or the links of the landing page when there is no
+    sitemap, and extracted in parallel together with the landing page.
+    Pages are kept in order of preference until the page or byte budget is
+    spent. Results are cached per domain and crawl limits.
+    """
+
+    def __init__(self, tavily_client: Any, max_pages: Optional[int] = None,
+                 max_bytes: Optional[int] = None, fetch_timeout: float = 5.0) -> None:
+        self.tavily_client = tavily_client
+        self.max_pages = max_pages or int(os.getenv("SITE_CRAWL_MAX_PAGES", "6"))
+        self.max_bytes = max_bytes or int(os.getenv("SITE_CRAWL_MAX_BYTES", "200000"))
+        self.fetch_timeout = fetch_timeout  # Per request while discovering pages
+        self.max_sitemaps = 3  # Nested sitemaps read from a sitemap index
+        self.max_redirects = 3
+
+    async def fetch_text(self, url: str) -> str:
+        """Body of a page or sitemap, or "" when it cannot be fetched.
+
+        Redirects are followed by hand so that every hop is checked to be a
+        public address. Only the first max_bytes of the body are read.
+        """
+        client = get_clients().http_client(
+            "sites",
+            follow_redirects=False,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; company-research-agent)"}
+        )
+        try:
+            for _ in range(self.max_redirects + 1):
+                if not await is_public_url(url):
+                    logger.warning(f"Not fetching {url}: not a public address")
+                    return ""
+                async with client.stream("GET", url, timeout=self.fetch_timeout) as response:
+                    if not response.is_redirect:
+                        response.raise_for_status()
+                        return await self.read_body(response)
+                    location = response.headers.get('location', '')
+                url = urljoin(url, location)
+            logger.info(f"Could not fetch {url}: more than {self.max_redirects} redirects")
+            return ""
+        except (httpx.HTTPError, ValueError) as e:
+            logger.info(f"Could not fetch {url}: {e}")
+            return ""
+
+    async def read_body(self, response: httpx.Response) -> str:
+        """Decode at most max_bytes of a streamed body; sitemaps may be 50MB."""
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) >= self.max_bytes:
+                logger.info(f"Truncated {response.url} at {self.max_bytes} bytes")
+                break
+        try:
+            return bytes(body[:self.max_bytes]).decode(response.charset_encoding or 'utf-8', errors='ignore')
+        except LookupError:
+            return bytes(body[:self.max_bytes]).decode('utf-8', errors='ignore')
+
+    async def sitemap_urls(self, url: str) -> List[str]:
+        sitemap = await self.fetch_text(urljoin(url, '/sitemap.xml'))
+        locations = LOC_PATTERN.findall(sitemap)
+        if '<sitemapindex' in sitemap.lower():
+            # A sitemap index may only point at sitemaps of the same site
+            domain = registrable_domain(url)
+            nested_sitemaps = [loc for loc in locations if registrable_domain(loc) == domain]
+            nested = await asyncio.gather(*(self.fetch_text(loc) for loc in nested_sitemaps[:self.max_sitemaps]))
+            locations = [loc for text in nested for loc in LOC_PATTERN.findall(text)]
+        return locations
+
+    async def link_urls(self, url: str) -> List[str]:
+        html = await self.fetch_text(url)
+        return [urljoin(url, href) for href in HREF_PATTERN.findall(html)]
+
+    async def discover(self, url: str) -> List[Tuple[str, str]]:
+        """Return (label, url) of the key pages to extract besides the landing page."""
+        domain = url_domain(url)
+        candidates = await self.sitemap_urls(url) or await self.link_urls(url)
+
+        best: Dict[int, str] = {}
+        for candidate in candidates:
+            if url_domain(candidate) != domain or candidate.rstrip('/') == url.rstrip('/'):
+                continue
+            group = key_page_group(candidate)
+            # The shortest path of a group is usually its index page
+            if group is not None and (group not in best or len(candidate) < len(best[group])):
+                best[group] = candidate
+        return [(KEY_PAGES[group][0], best[group]) for group in sorted(best)][:self.max_pages - 1]
+
+    async def extract_page(self, url: str) -> str:
+        result = await self.tavily_client.extract(url, extract_depth="basic")
+        return "\n\n".join(
+            content for item in result.get("results", []) if (content := item.get("raw_content"))
+        )
+
+    async def crawl(self, url: str, company: str) -> Dict[str, Dict[str, Any]]:
+        """Crawl the site of url; returns {page url: {'title', 'raw_content'}}.
+
+        The landing page comes first. Raises the landing page's extraction
+        error when no page at all could be extracted.
+        """
+        domain = url_domain(url)
+        cache = site_cache()
+        cache_key = (domain, self.max_pages, self.max_bytes)
+        if (pages := cache.get(cache_key)) is None:
+            pages = await self.crawl_pages(url)
+            if pages:
+                cache.set(cache_key, pages)
+        else:
+            logger.info(f"Using cached crawl of {domain} ({len(pages)} pages)")
+        # Cached pages only carry their labels; titles name the company of this job
+        return {
+            page_url: {
+                'title': f"{company} - {page['label']}" if page['label'] else company,
+                'raw_content': page['raw_content']
+            }
+            for page_url, page in pages.items()
+        }
+
+    async def crawl_pages(self, url: str) -> Dict[str, Dict[str, Any]]:
+        """Extract the landing and key pages; returns {page url: {'label', 'raw_content'}}."""
+        domain = url_domain(url)
+
+        # Discovery runs while the landing page is already being extracted
+        landing = asyncio.create_task(self.extract_page(url))
+        try:
+            key_pages = await self.discover(url) if self.max_pages > 1 else []
+        except Exception as e:
+            logger.warning(f"Page discovery failed for {url}: {e}")
+            key_pages = []
+        targets = [('', url)] + key_pages
+        results = await asyncio.gather(
+            landing, *(self.extract_page(page_url) for _, page_url in targets[1:]),
+            return_exceptions=True
+        )
+
+        pages = {}
+        remaining = self.max_bytes
+        for (label, page_url), content in zip(targets, results):
+            if isinstance(content, Exception):
+                logger.warning(f"Extraction failed for {page_url}: {content}")
+                continue
+            if not content or remaining <= 0:
+                continue
+            encoded = content.encode('utf-8')
+            if len(encoded) > remaining:
+                content = encoded[:remaining].decode('utf-8', errors='ignore')
+            remaining -= len(content.encode('utf-8'))
+            pages[page_url] = {'label': label, 'raw_content': content}
+
+        if not pages and isinstance(results[0], Exception):
+            raise results[0]
+        logger.info(f"Crawled {len(pages)} pages of {domain} "
+                    f"({self.max_bytes - remaining} bytes, {len(key_pages)} key pages found)")
+        return pages
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+from tavily.errors import UsageLimitExceededError
+
+from .clients import get_clients
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; everything else is the caller's fault. The
+# SDK turns every 429 into UsageLimitExceededError, see is_transient.
+TRANSIENT_STATUS_CODES = {408, 500, 502, 503, 504}
+# Error details of a 429 telling throttling from a spent plan
+_THROTTLED = re.compile(r'rate limit|too many requests', re.IGNORECASE)
+_QUOTA_EXHAUSTED = re.compile(r'usage limit|\bplan\b|credits?\b|quota', re.IGNORECASE)
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies for one operation."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.samples: deque = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """Latency at the given quantile, or None until enough calls were seen."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+
+# Latencies are shared by every client in the process, so that per-job
+# clients start hedging with what earlier jobs have observed
+_latency = defaultdict(LatencyTracker)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed Tavily call may succeed when simply repeated."""
+    if isinstance(error, UsageLimitExceededError):
+        # Raised for every 429: throttling passes after a backoff, but once
+        # the plan's usage limit is spent retries would fail the same way
+        detail = str(error)
+        return bool(_THROTTLED.search(detail)) or not _QUOTA_EXHAUSTED.search(detail)
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+class ResilientTavilyClient:
+    """Drop-in AsyncTavilyClient with deadlines, retries and hedged requests.
+
+    Every attempt runs under a per-call timeout. Transient failures are
+    retried with full-jitter exponential backoff. Once enough latencies are
+    known, an attempt still running after the p95 latency gets a duplicate
+    request, and whichever answers first wins.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        search_timeout: Optional[float] = None,
+        extract_timeout: Optional[float] = None,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 4.0,
+        hedge_quantile: float = 0.95,
+        min_hedge_delay: float = 0.5
+    ) -> None:
+        self.client = get_clients().tavily(api_key)
+        self.search_timeout = search_timeout or float(os.getenv("TAVILY_SEARCH_TIMEOUT", "15"))
+        self.extract_timeout = extract_timeout or float(os.getenv("TAVILY_EXTRACT_TIMEOUT", "30"))
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        return await self._call("search", self.search_timeout, lambda: self.client.search(query, **kwargs))
+
+    async def extract(self, urls: Any, **kwargs: Any) -> dict:
+        return await self._call("extract", self.extract_timeout, lambda: self.client.extract(urls, **kwargs))
+
+    async def _call(self, operation: str, timeout: float, request: Callable[[], Awaitable[dict]]) -> dict:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self._hedged(operation, timeout, request)
+            except Exception as e:
+                if attempt == self.max_attempts or not is_transient(e):
+                    raise
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                logger.warning(f"Tavily {operation} attempt {attempt} failed ({type(e).__name__}: {e}); "
+                               f"retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _hedged(self, operation: str, timeout: float, request: Callable[[], Awaitable[dict]]) -> dict:
+        tracker = _latency[operation]
+
+        async def attempt() -> dict:
+            started = time.monotonic()
+            result = await asyncio.wait_for(request(), timeout)
+            tracker.observe(time.monotonic() - started)
+            return result
+
+        hedge_delay = tracker.percentile(self.hedge_quantile)
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await attempt()
+
+        tasks = {asyncio.create_task(attempt())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(hedge_delay, self.min_hedge_delay))
+            if not done:
+                logger.info(f"Hedging Tavily {operation} after {hedge_delay:.2f}s")
+                tasks.add(asyncio.create_task(attempt()))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # Checking every finished task also marks failures as retrieved
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    return succeeded[0].result()
+                error = next(iter(done)).exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
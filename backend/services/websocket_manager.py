@@ -1,19 +1,96 @@
 from fastapi import WebSocket
 from typing import Dict, Set
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
 import json
 import logging
+from .job_backend import InMemoryJobBackend
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Backoff between attempts to resubscribe after the event stream fails
+RELAY_RETRY_SECONDS = 0.5
+RELAY_MAX_RETRY_SECONDS = 30.0
+
 class WebSocketManager:
-    def __init__(self):
+    def __init__(self, backend=None):
         # Store active connections for each job
         self.active_connections: Dict[str, Set[WebSocket]] = {}
-        
+        # Wake-up queues for SSE and long-poll clients waiting on a job
+        self.listeners: Dict[str, Set[asyncio.Queue]] = {}
+        # Job events travel through the backend so that any worker can
+        # relay them to the sockets it holds.
+        self.backend = backend or InMemoryJobBackend()
+        self._subscription = None
+        self._relay_task = None
+
+    async def start(self):
+        """Subscribe to job events and start relaying them to local sockets."""
+        if self._relay_task is None or self._relay_task.done():
+            if self._subscription is None:
+                self._subscription = await self.backend.subscribe()
+            self._relay_task = asyncio.create_task(self._relay())
+
+    async def stop(self):
+        """Stop relaying job events."""
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            self._relay_task = None
+        await self._close_subscription()
+
+    async def _relay(self):
+        """Relay job events until stopped, resubscribing if the event stream fails."""
+        delay = RELAY_RETRY_SECONDS
+        while True:
+            try:
+                if self._subscription is None:
+                    self._subscription = await self.backend.subscribe()
+                    logger.info("Resubscribed to job events")
+                async for job_id, message in self._subscription:
+                    delay = RELAY_RETRY_SECONDS
+                    for queue in self.listeners.get(job_id, ()):
+                        queue.put_nowait(message)
+                    try:
+                        await self.broadcast_to_job(job_id, message)
+                    except Exception as e:
+                        logger.error(f"Error relaying event for job {job_id}: {str(e)}", exc_info=True)
+                logger.warning(f"Job event stream ended, resubscribing in {delay}s")
+            except Exception as e:
+                logger.error(f"Job event stream failed, resubscribing in {delay}s: {str(e)}")
+            await self._close_subscription()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RELAY_MAX_RETRY_SECONDS)
+
+    async def _close_subscription(self):
+        subscription, self._subscription = self._subscription, None
+        if subscription is not None:
+            try:
+                await subscription.close()
+            except Exception as e:
+                logger.debug(f"Error closing job event subscription: {str(e)}")
+
+    @asynccontextmanager
+    async def listen(self, job_id: str):
+        """Yield a queue that receives every event published for a job."""
+        await self.start()
+        queue: asyncio.Queue = asyncio.Queue()
+        self.listeners.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            self.listeners[job_id].discard(queue)
+            if not self.listeners[job_id]:
+                del self.listeners[job_id]
+
+    async def get_events(self, job_id: str, after_id: int = 0):
+        """Return the logged events for a job published after after_id."""
+        return await self.backend.get_events(job_id, after_id)
+
     async def connect(self, websocket: WebSocket, job_id: str):
         """Connect a new client to a specific job."""
+        await self.start()
         if job_id not in self.active_connections:
             self.active_connections[job_id] = set()
         self.active_connections[job_id].add(websocket)
@@ -32,13 +109,13 @@ class WebSocketManager:
             logger.info(f"Remaining active jobs: {list(self.active_connections.keys())}")
                 
     async def broadcast_to_job(self, job_id: str, message: dict):
-        """Send a message to all clients connected to a specific job."""
+        """Send a message to all clients of a specific job connected to this worker."""
         if job_id not in self.active_connections:
-            logger.warning(f"No active connections for job {job_id}")
+            logger.debug(f"No local connections for job {job_id}")
             return
             
         # Add timestamp to message
-        message["timestamp"] = datetime.now().isoformat()
+        message.setdefault("timestamp", datetime.now().isoformat())
         
         # Convert message to JSON string
         message_str = json.dumps(message)
@@ -58,6 +135,11 @@ class WebSocketManager:
         # Clean up disconnected clients
         for connection in disconnected:
             self.disconnect(connection, job_id)
+
+    async def publish(self, job_id: str, message: dict):
+        """Publish a job event to every worker holding a connection for the job."""
+        message["timestamp"] = datetime.now().isoformat()
+        await self.backend.publish(job_id, message)
             
     async def send_status_update(self, job_id: str, status: str, message: str = None, error: str = None, result: dict = None):
         """Helper method to send formatted status updates."""
@@ -71,4 +153,4 @@ class WebSocketManager:
             }
         }
         #logger.info(f"Status: {status}, Message: {message}")
-        await self.broadcast_to_job(job_id, update)
\ No newline at end of file
+        await self.publish(job_id, update)
\ No newline at end of file
@@ -0,0 +1,13 @@
+import asyncio
+import os
+from typing import Optional
+
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def llm_semaphore() -> asyncio.Semaphore:
+    """Process-wide limit on concurrent LLM generations (LLM_MAX_CONCURRENCY)."""
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+    return _llm_semaphore
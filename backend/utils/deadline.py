@@ -0,0 +1,47 @@
+import time
+from typing import Any, Mapping, Optional
+
+# Seconds of budget that the stages after each degradation point typically
+# need. Below these, the stage is cut down so that a report still comes out
+# in time; jobs without a deadline are never degraded.
+FULL_QUERIES_SECONDS = 120  # Remaining time for all four queries per analyst
+REDUCED_QUERIES_SECONDS = 60  # Below this, only two queries per analyst
+ENRICHMENT_SECONDS = 75  # Enrichment is skipped below this
+FULL_BRIEFING_SECONDS = 60  # Briefing prompts shrink below this
+CONTENT_SWEEP_SECONDS = 45  # The editor's second pass is skipped below this
+
+
+def deadline_at(deadline_s: Optional[float]) -> Optional[float]:
+    """Absolute wall-clock deadline for a budget that starts now."""
+    return time.time() + deadline_s if deadline_s else None
+
+
+def remaining_seconds(state: Mapping[str, Any]) -> Optional[float]:
+    """Seconds left before the job deadline, or None when there is none."""
+    if not (deadline := state.get('deadline_at')):
+        return None
+    return max(deadline - time.time(), 0.0)
+
+
+def running_short(state: Mapping[str, Any], needed_seconds: float) -> bool:
+    """Whether less than needed_seconds remain before the deadline."""
+    remaining = remaining_seconds(state)
+    return remaining is not None and remaining < needed_seconds
+
+
+def query_count(state: Mapping[str, Any], default: int = 4) -> int:
+    """How many search queries each analyst should generate."""
+    if running_short(state, REDUCED_QUERIES_SECONDS):
+        return min(default, 2)
+    if running_short(state, FULL_QUERIES_SECONDS):
+        return min(default, 3)
+    return default
+
+
+def briefing_budget_scale(state: Mapping[str, Any]) -> float:
+    """Fraction of the normal document budget a briefing prompt may use."""
+    remaining = remaining_seconds(state)
+    if remaining is None or remaining >= FULL_BRIEFING_SECONDS:
+        return 1.0
+    # Prompt processing time grows with its length; shrink towards a quarter
+    return max(remaining / FULL_BRIEFING_SECONDS, 0.25)
@@ -0,0 +1,162 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .extractive import tokenize
+
+# Mersenne prime modulus for the universal hash family used by MinHash
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse punctuation and whitespace to single spaces."""
+    return re.sub(r'[\W_]+', ' ', (text or '').lower()).strip()
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """Hash the character shingles of normalized text.
+
+    Character shingles work the same for Chinese and English text, which is
+    why they are used here instead of word n-grams.
+    """
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {zlib.crc32(normalized.encode('utf-8'))} if normalized else set()
+    return {
+        zlib.crc32(normalized[i:i + size].encode('utf-8'))
+        for i in range(len(normalized) - size + 1)
+    }
+
+
+class MinHasher:
+    """Computes MinHash signatures with a fixed family of hash permutations."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, shingle_hashes: Set[int]) -> np.ndarray:
+        if not shingle_hashes:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes)) % _PRIME
+        # (num_perm, n_shingles) matrix of permuted hashes; min over shingles
+        return ((self._a * values + self._b) % _PRIME).min(axis=1)
+
+
+def estimate_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    return float(np.mean(left == right))
+
+
+class MinHashLSH:
+    """Banded locality-sensitive index over MinHash signatures.
+
+    With 16 bands of 8 rows, pairs above ~0.7 Jaccard similarity collide in
+    at least one band with high probability; candidates are then confirmed
+    against the exact threshold using their full signatures.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def insert(self, key: Hashable, signature: np.ndarray) -> None:
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def query(self, signature: np.ndarray) -> List[Hashable]:
+        """Return indexed keys whose estimated similarity reaches the threshold."""
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return [
+            key for key in candidates
+            if estimate_similarity(signature, self._signatures[key]) >= self.threshold
+        ]
+
+
+def find_near_duplicates(
+    items: List[Tuple[Hashable, str, float]],
+    threshold: float = 0.8
+) -> Dict[Hashable, List[Hashable]]:
+    """Cluster near-duplicate texts and pick a representative for each cluster.
+
+    items are (key, text, score) tuples. Returns a mapping from the
+    highest-scoring key of every cluster to the keys it replaces; texts with
+    no near-duplicate are absent from the result.
+    """
+    lsh = MinHashLSH(threshold=threshold)
+    parent: Dict[Hashable, Hashable] = {}
+
+    def find(key: Hashable) -> Hashable:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    scores = {}
+    for key, text, score in items:
+        parent[key] = key
+        scores[key] = score
+        shingle_hashes = shingles(text)
+        if not shingle_hashes:
+            continue
+        signature = lsh.hasher.signature(shingle_hashes)
+        for match in lsh.query(signature):
+            parent[find(match)] = find(key)
+        lsh.insert(key, signature)
+
+    clusters: Dict[Hashable, List[Hashable]] = defaultdict(list)
+    for key in parent:
+        clusters[find(key)].append(key)
+
+    duplicates = {}
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        representative = max(members, key=lambda key: scores[key])
+        duplicates[representative] = [key for key in members if key != representative]
+    return duplicates
+
+
+def is_near_duplicate(lsh: MinHashLSH, key: Hashable, text: str) -> Optional[Hashable]:
+    """Index text under key unless it nearly duplicates something already indexed.
+
+    Returns the key of the matching earlier text, or None after indexing.
+    """
+    shingle_hashes = shingles(text)
+    if not shingle_hashes:
+        return None
+    signature = lsh.hasher.signature(shingle_hashes)
+    if matches := lsh.query(signature):
+        return matches[0]
+    lsh.insert(key, signature)
+    return None
+
+
+def query_tokens(query: str) -> Set[str]:
+    """Token set of a search query (latin words and CJK bigrams)."""
+    return set(tokenize(query))
+
+
+def token_jaccard(left: Set[str], right: Set[str]) -> float:
+    """Jaccard similarity of two token sets; short texts like queries need no MinHash."""
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
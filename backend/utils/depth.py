@@ -0,0 +1,60 @@
+from typing import Any, Dict
+
+# Research depth presets, applied to the nodes of a job when its graph is
+# built. "standard" reproduces the defaults of every node; "fast" trades
+# coverage for latency and "deep" spends more searches and prompt room.
+# A mode of None keeps the node's configured (environment) mode.
+DEPTH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "site_pages": 1,  # Landing page only
+        "queries": 2,  # Search queries per analyst
+        "max_results": 5,  # Tavily results per query
+        "search_depth": "basic",
+        "search_raw_content": True,  # Page content comes with the search results
+        "search_target_docs": 5,  # Good documents after which searching stops
+        "relevance_threshold": 0.5,  # Curator score cut-off
+        "max_curated_docs": 12,  # Documents kept per category
+        "enrich": False,  # Search results already carry their page content
+        "max_doc_tokens": 1000,  # Prompt tokens per document in briefings
+        "briefing_mode": "single",
+        "editor_mode": "single_pass"
+    },
+    "standard": {
+        "site_pages": 6,
+        "queries": 4,
+        "max_results": 5,
+        "search_depth": "basic",
+        "search_raw_content": False,
+        "search_target_docs": 8,
+        "relevance_threshold": 0.4,
+        "max_curated_docs": 30,
+        "enrich": True,
+        "max_doc_tokens": 2000,
+        "briefing_mode": None,
+        "editor_mode": None
+    },
+    "deep": {
+        "site_pages": 10,
+        "queries": 6,
+        "max_results": 10,
+        "search_depth": "advanced",
+        "search_raw_content": False,
+        "search_target_docs": 16,
+        "relevance_threshold": 0.3,
+        "max_curated_docs": 45,
+        "enrich": True,
+        "max_doc_tokens": 3000,
+        "briefing_mode": None,
+        "editor_mode": "two_pass"
+    }
+}
+
+DEPTHS = tuple(DEPTH_PROFILES)
+
+
+def depth_profile(depth: str | None) -> Dict[str, Any]:
+    """Settings of a depth preset; None means "standard"."""
+    depth = depth or "standard"
+    if depth not in DEPTH_PROFILES:
+        raise ValueError(f"Unknown research depth: {depth}")
+    return DEPTH_PROFILES[depth]
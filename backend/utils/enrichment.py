@@ -0,0 +1,118 @@
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .packing import DOC_OVERHEAD_TOKENS
+from .tokens import count_tokens
+
+
+def url_domain(url: str) -> str:
+    """Lowercase host of a URL without the "www." prefix."""
+    host = urlparse(url if '://' in url else f'https://{url}').netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class DomainHistory:
+    """Extraction outcomes per domain, kept for the lifetime of the process."""
+
+    def __init__(self, max_domains: int = 5000) -> None:
+        self.max_domains = max_domains
+        # domain -> [attempts, successes, total tokens of successful extracts]
+        self._stats: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    def record(self, url: str, tokens: Optional[int]) -> None:
+        """Record one extraction; tokens is None when it failed or came back empty."""
+        domain = url_domain(url)
+        stats = self._stats.pop(domain, [0, 0, 0])
+        stats[0] += 1
+        if tokens:
+            stats[1] += 1
+            stats[2] += tokens
+        self._stats[domain] = stats
+        while len(self._stats) > self.max_domains:
+            self._stats.popitem(last=False)
+
+    def success_rate(self, url: str) -> Tuple[int, float]:
+        """Return (attempts, success rate) for the URL's domain."""
+        attempts, successes, _ = self._stats.get(url_domain(url), (0, 0, 0))
+        return attempts, successes / attempts if attempts else 1.0
+
+    def average_tokens(self, url: str) -> Optional[int]:
+        """Average token count of successful extracts from the URL's domain."""
+        _, successes, tokens = self._stats.get(url_domain(url), (0, 0, 0))
+        return tokens // successes if successes else None
+
+
+_domain_history = DomainHistory()
+
+
+def domain_history() -> DomainHistory:
+    """Process-wide extraction history shared by all jobs."""
+    return _domain_history
+
+
+class EnrichmentPolicy:
+    """Decides which curated documents are worth a raw content extraction.
+
+    Documents are visited best-first and charged against the token budget
+    that the briefing prompt will have for documents. A document is only
+    extracted if its full text is still expected to fit, its search snippet
+    is too short to stand on its own and its domain has not kept failing.
+    Everything else goes into the briefing with the snippet it already has.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: Optional[int] = None,
+        max_doc_tokens: int = 2000,
+        sufficient_snippet_tokens: int = 400,
+        min_success_rate: float = 0.3,
+        min_attempts: int = 3,
+        history: Optional[DomainHistory] = None
+    ) -> None:
+        self.budget_tokens = budget_tokens  # None means no budget limit
+        self.max_doc_tokens = max_doc_tokens
+        self.sufficient_snippet_tokens = sufficient_snippet_tokens
+        self.min_success_rate = min_success_rate
+        self.min_attempts = min_attempts
+        self.history = history or domain_history()
+
+    def select(self, docs: Dict[str, Dict[str, Any]]) -> Tuple[List[str], Dict[str, int]]:
+        """Return the URLs to extract and how many documents each rule decided."""
+        ranked = sorted(
+            docs.items(),
+            key=lambda item: float(item[1].get('evaluation', {}).get('overall_score', item[1].get('score', 0))),
+            reverse=True
+        )
+        remaining = self.budget_tokens if self.budget_tokens is not None else float('inf')
+        selected: List[str] = []
+        decisions: Counter = Counter()
+
+        for url, doc in ranked:
+            if raw_content := doc.get('raw_content'):
+                remaining -= min(count_tokens(raw_content), self.max_doc_tokens) + DOC_OVERHEAD_TOKENS
+                decisions['has_content'] += 1
+                continue
+
+            snippet_tokens = min(count_tokens(doc.get('content', '')), self.max_doc_tokens) + DOC_OVERHEAD_TOKENS
+            attempts, success_rate = self.history.success_rate(url)
+            expected = min(self.history.average_tokens(url) or self.max_doc_tokens, self.max_doc_tokens)
+            expected += DOC_OVERHEAD_TOKENS
+
+            if snippet_tokens >= self.sufficient_snippet_tokens:
+                decision = 'snippet_sufficient'
+            elif attempts >= self.min_attempts and success_rate < self.min_success_rate:
+                decision = 'unreliable_domain'
+            elif expected > remaining:
+                decision = 'over_budget'
+            else:
+                decision = 'extract'
+
+            decisions[decision] += 1
+            if decision == 'extract':
+                selected.append(url)
+                remaining -= expected
+            else:
+                remaining -= snippet_tokens
+
+        return selected, dict(decisions)
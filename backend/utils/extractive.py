@@ -0,0 +1,112 @@
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Lines that are almost always site chrome rather than article text
+_BOILERPLATE_PATTERNS = re.compile(
+    r'\bcookies?\b|\bprivacy policy\b|\bterms of (use|service)\b|\ball rights reserved\b|'
+    r'\bsubscribe\b|\bnewsletter\b|\bsign (in|up)\b|\blog in\b|\bskip to (main )?content\b|'
+    r'\bshare (this|on)\b|\bfollow us\b|©|版权所有|隐私政策|用户协议|免责声明|'
+    r'登录|立即注册|免费注册|关注我们|分享到|备案号',
+    re.IGNORECASE
+)
+_MARKDOWN_LINK = re.compile(r'!?\[[^\]]*\]\([^)]*\)')
+# Short latin labels joined by separators, e.g. "Home | Products | Contact"
+_MENU_LINE = re.compile(r"^[A-Za-z][A-Za-z&' ]{0,24}(?:\s*[|·•»›]\s*[A-Za-z][A-Za-z&' ]{0,24})+$")
+_LATIN_TOKEN = re.compile(r'[a-z0-9]+')
+_CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+')
+
+
+def strip_boilerplate(text: str) -> str:
+    """Remove navigation, footer, banner and repeated lines from page text."""
+    kept = []
+    seen = set()
+    for line in (text or '').splitlines():
+        stripped = line.strip()
+        if not stripped:
+            kept.append('')
+            continue
+        # Lines made only of links are menus, breadcrumbs or link lists
+        without_links = _MARKDOWN_LINK.sub('', stripped).strip(' |·•-*>#')
+        if not without_links:
+            continue
+        if len(without_links) < 120 and _BOILERPLATE_PATTERNS.search(without_links):
+            continue
+        # Headings, bullets, table rows and short facts stay; only
+        # separator-joined menus go
+        if not stripped.startswith('|') and _MENU_LINE.match(without_links):
+            continue
+        if stripped in seen:
+            continue
+        seen.add(stripped)
+        kept.append(stripped)
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(kept)).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase latin words and CJK character bigrams."""
+    text = (text or '').lower()
+    tokens = _LATIN_TOKEN.findall(text)
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def bm25_scores(passages: Sequence[str], queries: Sequence[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """Score every passage against the combined queries with BM25.
+
+    Only the query vocabulary is materialized, so the term-frequency matrix
+    stays small (passages x query terms) and scoring is a single product.
+    """
+    query_counts = Counter(token for query in queries for token in tokenize(query))
+    if not passages or not query_counts:
+        return np.zeros(len(passages))
+
+    terms = list(query_counts)
+    term_index = {term: i for i, term in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)))
+    lengths = np.zeros(len(passages))
+    for row, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[row] = len(tokens)
+        for token, count in Counter(tokens).items():
+            if (column := term_index.get(token)) is not None:
+                tf[row, column] = count
+
+    doc_freq = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(passages) - doc_freq + 0.5) / (doc_freq + 0.5))
+    avg_length = max(lengths.mean(), 1.0)
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    saturated = tf * (k1 + 1) / (tf + norm[:, None])
+    weights = np.array([query_counts[term] for term in terms], dtype=float)
+    return saturated @ (idf * weights)
+
+
+def select_passages(
+    passages_by_doc: Dict[str, List[str]],
+    queries: Sequence[str],
+    max_passages: int
+) -> Dict[str, List[str]]:
+    """Keep each document's top-scoring passages, in their original order.
+
+    Passages of all documents are scored together so that term rarity is
+    measured across the whole category rather than within one page.
+    """
+    flat = [(key, index, passage)
+            for key, passages in passages_by_doc.items()
+            for index, passage in enumerate(passages)]
+    scores = bm25_scores([passage for _, _, passage in flat], queries)
+
+    selected: Dict[str, List[str]] = {}
+    offset = 0
+    for key, passages in passages_by_doc.items():
+        doc_scores = scores[offset:offset + len(passages)]
+        offset += len(passages)
+        top = sorted(np.argsort(-doc_scores, kind='stable')[:max_passages])
+        selected[key] = [passages[i] for i in top]
+    return selected
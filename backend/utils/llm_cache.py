@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+
+class LLMCache:
+    """In-process cache of deterministic LLM responses with TTL and LRU eviction.
+
+    Only use it for temperature-0 calls, where the same prompt is expected
+    to produce the same answer.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(model: str, messages: Sequence[Any], **params: Any) -> str:
+        """Stable key for a model, its messages and any generation parameters."""
+        payload = {
+            "model": model,
+            "messages": [[getattr(m, "type", type(m).__name__), getattr(m, "content", m)] for m in messages],
+            "params": params
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def llm_cache() -> LLMCache:
+    """Process-wide LLM response cache (LLM_CACHE_SIZE, LLM_CACHE_TTL_SECONDS)."""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+        )
+    return _llm_cache
@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Tuple
+
+from .dedup import MinHashLSH, is_near_duplicate
+from .tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "... [content truncated]"
+
+# Passages shorter than this are merged into their neighbour before dedup
+MIN_PASSAGE_CHARS = 80
+
+# MinHash similarity above which two passages count as the same text
+PASSAGE_SIMILARITY_THRESHOLD = 0.9
+
+# Title line, content label and separator around each document entry
+DOC_OVERHEAD_TOKENS = 16
+
+
+def split_passages(text: str) -> List[str]:
+    """Split document text into paragraph-sized passages."""
+    passages = []
+    current = ""
+    for block in re.split(r'\n\s*\n|\n', text or ""):
+        block = block.strip()
+        if not block:
+            continue
+        current = f"{current}\n{block}" if current else block
+        if len(current) >= MIN_PASSAGE_CHARS:
+            passages.append(current)
+            current = ""
+    if current:
+        passages.append(current)
+    return passages
+
+
+def passage_fingerprint(passage: str) -> str:
+    """Fingerprint a passage ignoring case, whitespace and punctuation."""
+    normalized = re.sub(r'[\W_]+', '', passage.lower())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def dedupe_passages(docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Drop passages already seen in a higher-ranked document.
+
+    Documents must be ordered best first. Each returned document carries a
+    'passages' list; the second value is the number of passages removed.
+    """
+    seen = set()
+    lsh = MinHashLSH(threshold=PASSAGE_SIMILARITY_THRESHOLD)
+    removed = 0
+    deduped = []
+    for doc_index, doc in enumerate(docs):
+        passages = []
+        for passage_index, passage in enumerate(split_passages(doc['content'])):
+            # Exact fingerprints catch verbatim copies cheaply; MinHash catches
+            # passages that differ only by a few characters.
+            fingerprint = passage_fingerprint(passage)
+            if fingerprint in seen or is_near_duplicate(lsh, (doc_index, passage_index), passage) is not None:
+                removed += 1
+                continue
+            seen.add(fingerprint)
+            passages.append(passage)
+        if passages:
+            deduped.append({**doc, 'passages': passages})
+    return deduped, removed
+
+
+def _allocate(needs: List[int], weights: List[float], budget: int) -> List[int]:
+    """Split budget across documents in proportion to weight.
+
+    Documents that need less than their share keep only what they need and
+    the surplus is redistributed among the rest (water-filling).
+    """
+    allocation = [0] * len(needs)
+    active = set(range(len(needs)))
+    remaining = budget
+    while active and remaining > 0:
+        total_weight = sum(weights[i] for i in active)
+        shares = {i: remaining * weights[i] / total_weight for i in active}
+        satisfied = [i for i in active if needs[i] <= shares[i]]
+        if not satisfied:
+            for i in active:
+                allocation[i] = int(shares[i])
+            break
+        for i in satisfied:
+            allocation[i] = needs[i]
+            remaining -= needs[i]
+            active.discard(i)
+    return allocation
+
+
+def pack_documents(
+    docs: List[Dict[str, Any]],
+    budget_tokens: int,
+    max_doc_tokens: int,
+    min_doc_tokens: int = 200
+) -> List[Dict[str, Any]]:
+    """Fit scored documents into a token budget.
+
+    Each doc is a dict with 'title', 'content' and 'score', ordered best
+    first. Near-identical passages are removed, then the budget is shared
+    out by score and every document is cut to its allocation. Returns the
+    packed docs with 'content' replaced and 'tokens' set.
+    """
+    if not docs or budget_tokens <= 0:
+        return []
+
+    deduped, removed = dedupe_passages(docs)
+    if removed:
+        logger.info(f"Removed {removed} duplicate passages before packing")
+
+    # Only keep as many documents as can each get a useful minimum share
+    max_docs = max(1, budget_tokens // max(min_doc_tokens, 1))
+    deduped = deduped[:max_docs]
+
+    for doc in deduped:
+        doc['content'] = "\n\n".join(doc.pop('passages'))
+        doc['overhead'] = count_tokens(doc['title']) + DOC_OVERHEAD_TOKENS
+        doc['length'] = count_tokens(doc['content'])
+        doc['need'] = min(doc['length'], max_doc_tokens)
+
+    # Scores of zero would starve a document entirely; keep a small floor
+    weights = [max(float(doc['score']), 0.01) for doc in deduped]
+    needs = [doc['need'] + doc['overhead'] for doc in deduped]
+    allocation = _allocate(needs, weights, budget_tokens)
+
+    packed = []
+    for doc, tokens in zip(deduped, allocation):
+        content_tokens = min(tokens - doc.pop('overhead'), doc.pop('need'))
+        length = doc.pop('length')
+        if content_tokens < min(min_doc_tokens, length):
+            continue
+        content = doc['content']
+        if content_tokens < length:
+            marker_tokens = count_tokens(TRUNCATION_MARKER)
+            content = truncate_to_tokens(content, content_tokens - marker_tokens) + TRUNCATION_MARKER
+        packed.append({**doc, 'content': content, 'tokens': content_tokens})
+    return packed
+
+
+def chunk_documents(
+    docs: List[Dict[str, Any]],
+    chunk_tokens: int,
+    max_doc_tokens: int
+) -> List[List[Dict[str, Any]]]:
+    """Group scored documents into consecutive chunks of at most chunk_tokens.
+
+    Unlike pack_documents nothing is dropped: duplicate passages are removed
+    and each document is cut to max_doc_tokens, then documents are assigned
+    to chunks in rank order.
+    """
+    deduped, _ = dedupe_passages(docs)
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for doc in deduped:
+        content = "\n\n".join(doc.pop('passages'))
+        tokens = count_tokens(content)
+        if tokens > max_doc_tokens:
+            content = truncate_to_tokens(content, max_doc_tokens - count_tokens(TRUNCATION_MARKER)) + TRUNCATION_MARKER
+            tokens = max_doc_tokens
+        cost = tokens + count_tokens(doc['title']) + DOC_OVERHEAD_TOKENS
+        if current and used + cost > chunk_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append({**doc, 'content': content, 'tokens': tokens})
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
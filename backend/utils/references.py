@@ -136,6 +136,9 @@ def process_references_from_search_results(state: Dict[str, Any]) -> Tuple[List[
     for data_type in data_types:
         if curated_data := state.get(data_type, {}):
             for url, doc in curated_data.items():
+                # Another category holds the higher-scoring copy
+                if doc.get('duplicate_of'):
+                    continue
                 try:
                     # Ensure we have a valid score
                     if 'evaluation' in doc and 'overall_score' in doc['evaluation']:
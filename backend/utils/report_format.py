@@ -0,0 +1,128 @@
+import re
+from typing import Dict, List
+
+from .dedup import MinHashLSH, is_near_duplicate
+
+# Report sections in their required order, keyed by briefing category
+SECTION_TITLES = {
+    'company': '公司概览',
+    'industry': '行业概览',
+    'financial': '财务概览',
+    'news': '新闻'
+}
+REFERENCE_TITLES = {'参考文献', 'references'}
+
+_BULLET = re.compile(r'^(\s*)(?:[-•+]|\d+[.)、])\s+')
+
+# Bullets shorter than this are too generic to treat as duplicated facts
+MIN_DEDUP_LINE_CHARS = 20
+
+
+def _normalize_line(line: str) -> str:
+    line = line.rstrip()
+    # Unordered bullets of any style become "*"; numbered lists are kept
+    if match := re.match(r'^(\s*)[-•+]\s+', line):
+        return f"{match.group(1)}* {line[match.end():]}"
+    return line
+
+
+def _is_list_item(line: str) -> bool:
+    return bool(line.lstrip().startswith('* ') or _BULLET.match(line))
+
+
+def tidy_spacing(lines: List[str]) -> List[str]:
+    """Collapse blank runs and put one blank line around headings and lists."""
+    tidy: List[str] = []
+    for line in lines:
+        if not line.strip():
+            if tidy and tidy[-1]:
+                tidy.append('')
+            continue
+        if tidy and tidy[-1]:
+            previous = tidy[-1]
+            if (line.startswith('#') or previous.startswith('#')
+                    or _is_list_item(line) != _is_list_item(previous)):
+                tidy.append('')
+        tidy.append(line)
+    while tidy and not tidy[-1]:
+        tidy.pop()
+    return tidy
+
+
+def split_sections(report: str) -> Dict[str, List[str]]:
+    """Group report lines under their "##" heading.
+
+    Lines before the first "##" heading are stored under the empty key.
+    Unknown "##" headings are demoted to "###" inside the current section so
+    that their content is kept; reference sections are dropped because the
+    canonical reference list is re-attached after editing.
+    """
+    canonical = set(SECTION_TITLES.values())
+    sections: Dict[str, List[str]] = {'': []}
+    current = ''
+    in_references = False
+    for raw_line in report.splitlines():
+        if raw_line.strip().startswith('```'):
+            continue
+        line = _normalize_line(raw_line)
+        if line.startswith('# '):
+            continue
+        if line.startswith('## '):
+            title = line[3:].strip().strip('#').strip()
+            in_references = title.lower() in REFERENCE_TITLES
+            if in_references:
+                continue
+            if title in canonical:
+                current = title
+                sections.setdefault(current, [])
+                continue
+            line = f"### {title}"
+        if not in_references:
+            sections[current].append(line)
+    return sections
+
+
+def normalize_report(report: str, company: str, reference_text: str = "", sections: List[str] | None = None) -> str:
+    """Deterministically clean an edited report.
+
+    Strips code fences, normalizes bullets to "*", restores the fixed
+    section order (optionally limited to the given section titles), removes
+    headings from the news section, collapses blank lines and re-attaches
+    the reference list.
+    """
+    parsed = split_sections(report or "")
+    order = sections or list(SECTION_TITLES.values())
+
+    lines = [f"# {company} 研究报告", ""]
+    lines.extend(parsed.get('', []))
+    for title in order:
+        content = parsed.get(title)
+        if not content or not any(line.strip() for line in content):
+            continue
+        if title == SECTION_TITLES['news']:
+            content = [line for line in content if not line.startswith('#')]
+        lines.extend(["", f"## {title}", ""])
+        lines.extend(content)
+
+    normalized = "\n".join(tidy_spacing(lines))
+    if reference_text:
+        normalized = f"{normalized}\n\n{reference_text.strip()}"
+    return normalized
+
+
+def dedupe_section_lines(sections: Dict[str, str], threshold: float = 0.85) -> Dict[str, str]:
+    """Remove list items that repeat a fact already stated in an earlier section.
+
+    Sections are visited in the order given; headings and prose are kept.
+    """
+    lsh = MinHashLSH(threshold=threshold)
+    deduped = {}
+    for key, content in sections.items():
+        kept = []
+        for index, line in enumerate(content.splitlines()):
+            if _is_list_item(line) and len(line.strip()) >= MIN_DEDUP_LINE_CHARS:
+                if is_near_duplicate(lsh, (key, index), _BULLET.sub('', line.lstrip('* '))) is not None:
+                    continue
+            kept.append(line)
+        deduped[key] = "\n".join(kept)
+    return deduped
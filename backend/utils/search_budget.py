@@ -0,0 +1,65 @@
+from typing import Any, Dict, List, Optional
+
+
+class SearchBudget:
+    """Decides how many of a category's queries are worth searching.
+
+    Queries run in waves. After each wave the budget counts the documents
+    scoring at or above the curation threshold; once target_docs of them
+    are in, the remaining queries are skipped. Good documents from
+    speculative searches are counted separately: they help reach the
+    target, but the first wave of planned queries always runs. When a wave
+    brought back fewer good documents per query than min_yield, the next
+    wave searches harder: first with more results per query, then at
+    advanced depth.
+    """
+
+    def __init__(
+        self,
+        target_docs: int = 8,
+        score_threshold: float = 0.4,
+        wave_size: int = 2,
+        min_yield: float = 1.0,
+        escalated_max_results: int = 10
+    ) -> None:
+        self.target_docs = target_docs
+        self.score_threshold = score_threshold  # Same cut-off as Curator.relevance_threshold
+        self.wave_size = wave_size
+        self.min_yield = min_yield  # Good documents per query below which a wave is poor
+        self.escalated_max_results = escalated_max_results
+        self.good_urls: set = set()  # Good documents from planned queries
+        self.speculative_urls: set = set()  # Good documents from speculative queries
+        self.planned_waves = 0
+
+    def waves(self, queries: List[str]) -> List[List[str]]:
+        return [queries[i:i + self.wave_size] for i in range(0, len(queries), self.wave_size)]
+
+    def record(self, docs: Dict[str, Dict[str, Any]], speculative: bool = False) -> int:
+        """Count a wave's results; returns how many new good documents it found."""
+        urls = self.speculative_urls if speculative else self.good_urls
+        if not speculative:
+            self.planned_waves += 1
+        before = len(urls)
+        for url, doc in docs.items():
+            try:
+                if float(doc.get('score', 0)) >= self.score_threshold:
+                    urls.add(url)
+            except (TypeError, ValueError):
+                continue
+        return len(urls) - before
+
+    def good_count(self) -> int:
+        return len(self.good_urls | self.speculative_urls)
+
+    def satisfied(self) -> bool:
+        return self.planned_waves > 0 and self.good_count() >= self.target_docs
+
+    def escalate(self, params: Dict[str, Any], new_good: int, wave_queries: int) -> Optional[Dict[str, Any]]:
+        """Search parameters for the next wave, or None to keep the current ones."""
+        if not wave_queries or new_good / wave_queries >= self.min_yield:
+            return None
+        if params.get('max_results', 5) < self.escalated_max_results:
+            return {**params, 'max_results': self.escalated_max_results}
+        if params.get('search_depth') != 'advanced':
+            return {**params, 'search_depth': 'advanced'}
+        return None
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .extractive import bm25_scores, strip_boilerplate
+from .packing import split_passages
+
+
+class SiteIndex:
+    """Company website pages split into passages once per job.
+
+    Every lane routes the passages relevant to its own queries into its
+    category, so the site is neither copied whole into each category nor
+    sent whole to every briefing. Documents carry the text of their routed
+    passages and record their indices under 'site_passages'.
+    """
+
+    def __init__(self, pages: Dict[str, Dict[str, Any]]) -> None:
+        self.pages = {url: page.get('title', '') for url, page in pages.items()}
+        self.passages: List[Dict[str, str]] = [
+            {'url': url, 'text': text}
+            for url, page in pages.items()
+            for text in split_passages(strip_boilerplate(page.get('raw_content') or ''))
+        ]
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def route(self, queries: Sequence[str], max_passages: int) -> List[int]:
+        """Indices of the passages matching the queries best, in site order."""
+        if not self.passages:
+            return []
+        scores = bm25_scores([passage['text'] for passage in self.passages], queries)
+        top = np.argsort(-scores, kind='stable')[:max_passages]
+        return sorted(int(i) for i in top if scores[i] > 0)
+
+    def documents(self, indices: Sequence[int]) -> Dict[str, Dict[str, Any]]:
+        """One document per page holding only the given passages."""
+        by_page: Dict[str, List[int]] = {}
+        for index in indices:
+            by_page.setdefault(self.passages[index]['url'], []).append(index)
+        return {
+            url: {
+                'title': self.pages[url],
+                'raw_content': "\n\n".join(self.passages[i]['text'] for i in page_indices),
+                'site_passages': page_indices
+            }
+            for url, page_indices in by_page.items()
+        }
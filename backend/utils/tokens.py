@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tokenizer of the served model; a local tokenizer.json path also works.
+DEFAULT_TOKENIZER = "Qwen/Qwen2.5-72B-Instruct"
+
+# CJK ideographs, kana, hangul and full-width punctuation each cost roughly
+# one token with the Qwen vocabulary; everything else averages ~4 chars/token.
+_CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+_CHARS_PER_TOKEN = 4
+
+
+# Seconds before a failed tokenizer load is attempted again
+RETRY_SECONDS = float(os.getenv("TOKENIZER_RETRY_SECONDS", "300"))
+
+_tokenizer: Optional[Any] = None
+_load_task: Optional[asyncio.Task] = None
+_retry_at = 0.0
+
+
+def _load() -> Any:
+    from tokenizers import Tokenizer
+    source = os.getenv("TOKENIZER_PATH", DEFAULT_TOKENIZER)
+    if os.path.isfile(source):
+        return Tokenizer.from_file(source)
+    return Tokenizer.from_pretrained(source)
+
+
+async def _load_tokenizer() -> Optional[Any]:
+    global _tokenizer, _retry_at
+    try:
+        # from_pretrained may download the tokenizer; keep that off the event loop
+        _tokenizer = await asyncio.to_thread(_load)
+        logger.info("Tokenizer loaded; counting tokens exactly")
+    except Exception as e:
+        _retry_at = time.monotonic() + RETRY_SECONDS
+        logger.warning(f"Tokenizer unavailable ({e}); estimating token counts, retrying in {RETRY_SECONDS:.0f}s")
+    return _tokenizer
+
+
+def start_loading_tokenizer() -> Optional[asyncio.Task]:
+    """Start loading the tokenizer in the background, unless it is loaded or loading.
+
+    Returns the loading task, or None when there is nothing to do or no
+    running event loop to load on.
+    """
+    global _load_task
+    if _tokenizer is not None or time.monotonic() < _retry_at:
+        return None
+    if _load_task is None or _load_task.done():
+        try:
+            _load_task = asyncio.get_running_loop().create_task(_load_tokenizer())
+        except RuntimeError:
+            return None
+    return _load_task
+
+
+def get_tokenizer():
+    """The model tokenizer, or None to use the estimate while it is not loaded.
+
+    Never blocks: the first call on an event loop starts the load in a
+    worker thread, and a failed load is retried after RETRY_SECONDS.
+    """
+    if _tokenizer is None:
+        start_loading_tokenizer()
+    return _tokenizer
+
+
+def _estimate_tokens(text: str) -> int:
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / _CHARS_PER_TOKEN)
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text with the model tokenizer (or a CJK-aware estimate)."""
+    if not text:
+        return 0
+    if tokenizer := get_tokenizer():
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+    return _estimate_tokens(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text so that it fits within max_tokens."""
+    if max_tokens <= 0:
+        return ""
+    if tokenizer := get_tokenizer():
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        return text[:encoding.offsets[max_tokens - 1][1]]
+
+    if _estimate_tokens(text) <= max_tokens:
+        return text
+    # Walk the text spending one token per CJK char and 1/4 token otherwise.
+    budget = float(max_tokens)
+    for index, char in enumerate(text):
+        budget -= 1 if _CJK_PATTERN.match(char) else 1 / _CHARS_PER_TOKEN
+        if budget < 0:
+            return text[:index]
+    return text
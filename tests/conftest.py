@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def offline_tokenizer(monkeypatch):
+    """Token counts use the estimate; tests never download the tokenizer."""
+    def unavailable():
+        raise OSError("tokenizer download disabled in tests")
+    monkeypatch.setattr("backend.utils.tokens._load", unavailable)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import application
+    with TestClient(application.app) as client:
+        yield client, application
+
+
+def test_websocket_reconnects_do_not_log_events(api):
+    client, application = api
+    asyncio.run(application.job_backend.update_job("job-ws", status="completed", result={"report": "Done"}))
+
+    for _ in range(2):
+        with client.websocket_connect("/research/ws/job-ws") as websocket:
+            snapshot = websocket.receive_json()
+            assert snapshot["type"] == "status_update"
+            assert snapshot["data"]["status"] == "completed"
+
+    assert asyncio.run(application.job_backend.get_events("job-ws")) == []
+
+
+def publish_job(client, application, job_id, statuses):
+    client.portal.call(lambda: application.job_backend.update_job(job_id, status="processing"))
+    for number, status in enumerate(statuses, start=1):
+        client.portal.call(lambda: application.manager.send_status_update(job_id, status=status, message=f"Step {number}"))
+
+
+def test_sse_resumes_after_last_event_id(api):
+    client, application = api
+    publish_job(client, application, "job-sse", ["processing", "processing", "completed"])
+
+    response = client.get("/research/job-sse/events", headers={"Last-Event-ID": "1"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    ids = [line[4:] for line in response.text.splitlines() if line.startswith("id: ")]
+    assert ids == ["2", "3"]
+    assert '"status": "completed"' in response.text
+
+
+def test_long_poll_returns_new_events_and_completion(api):
+    client, application = api
+    publish_job(client, application, "job-poll", ["processing", "completed"])
+
+    body = client.get("/research/job-poll/events/poll", params={"after": 1, "timeout": 0}).json()
+    assert [event["id"] for event in body["events"]] == [2]
+    assert body["events"][0]["status"] == "completed"
+    assert "error" not in body["events"][0]
+    assert body["last_event_id"] == 2 and body["done"]
+
+
+def test_long_poll_times_out_without_events(api):
+    client, application = api
+    publish_job(client, application, "job-idle", [])
+
+    body = client.get("/research/job-idle/events/poll", params={"after": 0, "timeout": 0.1}).json()
+    assert body == {"job_id": "job-idle", "events": [], "last_event_id": 0, "done": False}
+    assert client.get("/research/unknown/events/poll").status_code == 404
+    assert client.get("/research/unknown/events").status_code == 404
+
+
+def test_unreachable_redis_keeps_job_state_local(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    import application
+    from backend.services.job_backend import InMemoryJobBackend
+
+    with TestClient(application.app):
+        assert isinstance(application.job_backend, InMemoryJobBackend)
+        assert application.manager.backend is application.job_backend
@@ -0,0 +1,91 @@
+import asyncio
+
+from backend.nodes.curator import Curator
+
+ARTICLE = (
+    "Acme Corp reported quarterly revenue of 1.2 billion dollars, up 18 percent "
+    "from a year earlier, driven by strong demand for its cloud products in Europe and Asia."
+)
+
+
+def doc(url, score, content):
+    return {"url": url, "title": url, "content": content, "score": score}
+
+
+def test_shared_documents_go_to_the_highest_scoring_copy():
+    curator = Curator()
+    lanes = {
+        "financial": {
+            # Same URL as a news document, scored lower here
+            "https://news.example.com/acme-q3": doc("https://news.example.com/acme-q3", 0.7, ARTICLE),
+            "https://example.com/other": doc("https://example.com/other", 0.8, "Acme hires a new CFO from a rival bank."),
+        },
+        "company": {
+            # Syndicated copy under another URL
+            "https://mirror.example.org/acme": doc("https://mirror.example.org/acme", 0.5, ARTICLE + " "),
+        },
+        "news": {
+            "https://news.example.com/acme-q3": doc("https://news.example.com/acme-q3", 0.9, ARTICLE),
+            "https://example.com/launch": doc("https://example.com/launch", 0.6, "Acme launches a robot vacuum."),
+        },
+    }
+
+    # The highest-scoring lane finishes last; each lane briefs from its own copies
+    state = {}
+    for doc_type, docs in lanes.items():
+        lane = {f"{doc_type}_data": docs}
+        counts = asyncio.run(curator.curate_category(lane, f"{doc_type}_data", doc_type))
+        state[f"curated_{doc_type}_data"] = lane[f"curated_{doc_type}_data"]
+    assert counts == {"initial": 2, "kept": 2, "duplicates": 0}
+
+    dedup = asyncio.run(curator.report_curation(state))
+    assert dedup["removed"] == dedup["cross_category"] == 2
+    owner = state["curated_news_data"]["https://news.example.com/acme-q3"]
+    assert "duplicate_of" not in owner
+    assert owner["duplicate_urls"] == ["https://mirror.example.org/acme"]
+    assert state["curated_financial_data"]["https://news.example.com/acme-q3"]["duplicate_of"] == owner["url"]
+    assert state["curated_company_data"]["https://mirror.example.org/acme"]["duplicate_of"] == owner["url"]
+
+    curator.select_references(state)
+    assert set(state["references"]) == {
+        "https://news.example.com/acme-q3", "https://example.com/other", "https://example.com/launch"
+    }
+
+
+def test_website_documents_are_kept_in_every_lane():
+    curator = Curator()
+    page = {**doc("https://acme.com/about", 0.6, ARTICLE), "site_passages": [0]}
+    first = {"company_data": {page["url"]: dict(page)}}
+    second = {"financial_data": {page["url"]: dict(page)}}
+
+    asyncio.run(curator.curate_category(first, "company_data", "company"))
+    asyncio.run(curator.curate_category(second, "financial_data", "financial"))
+
+    assert list(first["curated_company_data"]) == [page["url"]]
+    assert list(second["curated_financial_data"]) == [page["url"]]
+
+
+class FakeWebSocketManager:
+    def __init__(self):
+        self.updates = []
+
+    async def send_status_update(self, job_id, status, message=None, error=None, result=None):
+        self.updates.append((status, result))
+
+
+def test_curation_report_covers_only_the_requested_categories():
+    curator = Curator()
+    curator.categories = ["company", "news"]
+    manager = FakeWebSocketManager()
+    state = {"websocket_manager": manager, "job_id": "job",
+             "news_data": {"https://example.com/launch": doc("https://example.com/launch", 0.6, ARTICLE)}}
+
+    asyncio.run(curator.curate_category(state, "news_data", "news"))
+    asyncio.run(curator.report_curation(state))
+
+    status, result = manager.updates[-1]
+    assert status == "curation_complete"
+    assert result["doc_counts"] == {
+        "company": {"initial": 0, "kept": 0},
+        "news": {"initial": 1, "kept": 1, "duplicates": 0}
+    }
@@ -0,0 +1,29 @@
+import time
+
+from backend.utils.deadline import briefing_budget_scale, deadline_at, query_count, remaining_seconds, running_short
+
+
+def state_with(seconds_left):
+    return {"deadline_at": time.time() + seconds_left}
+
+
+def test_jobs_without_a_deadline_are_never_degraded():
+    assert deadline_at(None) is None
+    assert remaining_seconds({}) is None
+    assert not running_short({}, 1e9)
+    assert query_count({}, 4) == 4
+    assert briefing_budget_scale({}) == 1.0
+
+
+def test_query_count_shrinks_as_the_deadline_nears():
+    assert query_count(state_with(600), 4) == 4
+    assert query_count(state_with(90), 4) == 3
+    assert query_count(state_with(30), 4) == 2
+    assert query_count(state_with(30), 1) == 1
+
+
+def test_briefing_budget_scales_down_to_a_quarter():
+    assert briefing_budget_scale(state_with(120)) == 1.0
+    assert 0.45 < briefing_budget_scale(state_with(30)) < 0.55
+    assert briefing_budget_scale(state_with(1)) == 0.25
+    assert remaining_seconds({"deadline_at": time.time() - 5}) == 0.0
@@ -0,0 +1,40 @@
+from backend.utils.dedup import (MinHashLSH, find_near_duplicates, is_near_duplicate, normalize_text,
+                                 query_tokens, shingles, token_jaccard)
+
+ARTICLE = (
+    "Acme Corp reported quarterly revenue of 1.2 billion dollars, up 18 percent from a year "
+    "earlier, as demand for its industrial robots grew in Europe and Asia."
+)
+CHINESE = "阿克米公司第三季度营收达到十二亿美元，同比增长百分之十八，主要得益于欧洲和亚洲市场对工业机器人的需求增长。"
+
+
+def test_normalize_text_and_shingles_ignore_case_and_punctuation():
+    assert normalize_text("Acme, Corp!  Revenue") == "acme corp revenue"
+    assert shingles("ACME corp.") == shingles("acme Corp")
+    assert shingles("") == set()
+
+
+def test_find_near_duplicates_keeps_the_highest_score():
+    items = [
+        ("original", ARTICLE, 0.5),
+        ("syndicated", ARTICLE.replace("Acme Corp", "ACME Corp."), 0.9),
+        ("other", "Acme opened a new research centre in Munich to develop warehouse automation.", 0.7),
+        ("chinese", CHINESE, 0.6),
+        ("chinese copy", CHINESE + "。", 0.4),
+    ]
+    clusters = find_near_duplicates(items, threshold=0.8)
+    assert clusters == {"syndicated": ["original"], "chinese": ["chinese copy"]}
+
+
+def test_is_near_duplicate_indexes_only_new_texts():
+    lsh = MinHashLSH(threshold=0.8)
+    assert is_near_duplicate(lsh, "a", ARTICLE) is None
+    assert is_near_duplicate(lsh, "b", ARTICLE + " ") == "a"
+    assert is_near_duplicate(lsh, "c", CHINESE) is None
+    assert is_near_duplicate(lsh, "d", "") is None
+
+
+def test_query_similarity():
+    assert token_jaccard(query_tokens("Acme revenue 2026"), query_tokens("acme 2026 revenue")) == 1.0
+    assert token_jaccard(query_tokens("Acme revenue"), query_tokens("Acme layoffs")) < 0.5
+    assert token_jaccard(set(), query_tokens("Acme")) == 0.0
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from backend.nodes.editor import Editor
+from backend.utils.report_format import SECTION_TITLES
+
+
+class FakeLLM:
+    """Answers section edits by title, and streams a fixed report."""
+
+    def __init__(self, sections=None, report="", delays=None):
+        self.sections = sections or {}
+        self.report = report
+        self.delays = delays or {}
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        prompt = messages[-1].content
+        for category, content in self.sections.items():
+            if f"“{SECTION_TITLES[category]}”" in prompt:
+                await asyncio.sleep(self.delays.get(category, 0))
+                return AIMessage(content=content)
+        raise AssertionError("Unexpected prompt")
+
+    async def astream(self, messages):
+        self.calls += 1
+        for line in self.report.splitlines(keepends=True):
+            yield AIMessageChunk(content=line)
+
+
+class Recorder:
+    def __init__(self):
+        self.updates = []
+
+    async def send_status_update(self, job_id, status, message=None, error=None, result=None):
+        self.updates.append((status, result or {}))
+
+    def chunks(self):
+        return [result["chunk"] for status, result in self.updates if status == "report_chunk"]
+
+
+@pytest.fixture
+def make_editor(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    def make(mode, llm):
+        editor = Editor(mode=mode)
+        editor.llm_client = llm
+        editor.context = {"company": "Acme", "industry": "Robotics", "hq_location": "Berlin"}
+        return editor
+    return make
+
+
+def test_unknown_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    with pytest.raises(ValueError):
+        Editor(mode="three_pass")
+
+
+def test_single_pass_cleans_the_streamed_report_locally(make_editor):
+    llm = FakeLLM(report="```\n# Acme 研究报告\n## 新闻\n- Acme opened a factory\n## 公司概览\n- Acme builds robots\n```")
+    editor = make_editor("single_pass", llm)
+    recorder = Recorder()
+    state = {"websocket_manager": recorder, "job_id": "job"}
+
+    report = asyncio.run(editor.compile_and_clean(state, {"company": "...", "news": "..."}))
+    assert report == "# Acme 研究报告\n\n## 公司概览\n\n* Acme builds robots\n\n## 新闻\n\n* Acme opened a factory"
+    assert llm.calls == 1
+    assert "".join(recorder.chunks()).startswith("```")
+
+
+def test_sectioned_edits_stream_in_report_order(make_editor):
+    llm = FakeLLM(
+        sections={"company": "* Acme builds robots for car makers", "news": "* Acme opened a factory in Munich"},
+        delays={"company": 0.05}
+    )
+    editor = make_editor("sectioned", llm)
+    recorder = Recorder()
+    state = {"websocket_manager": recorder, "job_id": "job"}
+
+    report = asyncio.run(editor.compile_sections(state, {"news": "news briefing", "company": "company briefing"}))
+    chunks = recorder.chunks()
+    assert chunks[0].startswith("# Acme 研究报告\n\n## 公司概览")
+    assert chunks[1].startswith("## 新闻")
+    assert report.index("## 公司概览") < report.index("## 新闻")
+
+
+def test_pipelined_sections_start_before_the_editor_runs(make_editor):
+    llm = FakeLLM(sections={"company": "* Acme builds robots", "financial": "* Revenue grew 18 percent"})
+    editor = make_editor("pipelined", llm)
+    editor.section_order = ["company", "industry", "financial"]
+    recorder = Recorder()
+    state = {"websocket_manager": recorder, "job_id": "job", "company": "Acme"}
+
+    async def scenario():
+        await editor.queue_section(state, "financial", "financial briefing")
+        await asyncio.sleep(0.01)
+        emitted_early = list(recorder.chunks())
+        await editor.queue_section(state, "company", "company briefing")
+        await editor.queue_section(state, "industry", "")  # Briefing failed
+        return emitted_early, await editor.compile_pipelined(
+            state, {"company": "company briefing", "financial": "financial briefing"}
+        )
+
+    emitted_early, report = asyncio.run(scenario())
+    # Financial was edited first but waits for the company section
+    assert emitted_early == []
+    chunks = recorder.chunks()
+    assert "公司概览" in chunks[0] and "财务概览" in chunks[1] and len(chunks) == 2
+    assert "行业概览" not in report
+    assert llm.calls == 2
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.nodes.enricher import Enricher
+from backend.utils.enrichment import DomainHistory
+
+
+class FakeExtractClient:
+    def __init__(self):
+        self.urls = []
+
+    async def extract(self, url, **params):
+        self.urls.append(url)
+        if "broken" in url:
+            raise RuntimeError("extraction failed")
+        return {"results": [{"url": url, "raw_content": f"Full text of {url}"}]}
+
+
+@pytest.fixture
+def enricher(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    enricher = Enricher(budget_tokens=10000)
+    enricher.tavily_client = FakeExtractClient()
+    enricher.policy.history = DomainHistory()
+    return enricher
+
+
+def curated_state(**extra):
+    return {
+        "curated_news_data": {
+            "https://a.com/1": {"content": "snippet", "evaluation": {"overall_score": 0.9}},
+            "https://broken.com/1": {"content": "snippet", "evaluation": {"overall_score": 0.8}},
+            "https://b.com/1": {"content": "snippet", "raw_content": "Already here", "evaluation": {"overall_score": 0.7}},
+        },
+        **extra
+    }
+
+
+def test_enrich_category_extracts_selected_documents(enricher):
+    state = curated_state()
+    result = asyncio.run(enricher.enrich_category(state, "news_data", "news", "News"))
+    assert result == {"category": "news", "enriched": 1, "total": 2, "errors": 1}
+    docs = state["curated_news_data"]
+    assert docs["https://a.com/1"]["raw_content"] == "Full text of https://a.com/1"
+    assert "raw_content" not in docs["https://broken.com/1"]
+    assert sorted(enricher.tavily_client.urls) == ["https://a.com/1", "https://broken.com/1"]
+    assert enricher.policy.history.success_rate("https://broken.com/x") == (1, 0.0)
+
+
+def test_enrichment_is_skipped_close_to_the_deadline(enricher):
+    state = curated_state(deadline_at=time.time() + 30)
+    result = asyncio.run(enricher.enrich_category(state, "news_data", "news", "News"))
+    assert result["total"] == 0
+    assert enricher.tavily_client.urls == []
+
+
+def test_disabled_enricher_does_nothing(enricher):
+    enricher.enabled = False
+    asyncio.run(enricher.enrich_category(curated_state(), "news_data", "news", "News"))
+    assert enricher.tavily_client.urls == []
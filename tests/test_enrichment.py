@@ -0,0 +1,49 @@
+from backend.utils.enrichment import DomainHistory, EnrichmentPolicy, url_domain
+
+
+def curated(score, content="", raw_content=None):
+    doc = {"content": content, "evaluation": {"overall_score": score}}
+    if raw_content:
+        doc["raw_content"] = raw_content
+    return doc
+
+
+def test_url_domain():
+    assert url_domain("https://WWW.Acme.com/about") == "acme.com"
+    assert url_domain("acme.com/investors") == "acme.com"
+
+
+def test_domain_history_tracks_success_and_size():
+    history = DomainHistory(max_domains=2)
+    history.record("https://a.com/1", 100)
+    history.record("https://a.com/2", None)
+    assert history.success_rate("https://www.a.com/x") == (2, 0.5)
+    assert history.average_tokens("https://a.com/") == 100
+    history.record("https://b.com/", 10)
+    history.record("https://c.com/", 10)
+    assert history.success_rate("https://a.com/") == (0, 1.0)  # Evicted
+
+
+def test_policy_extracts_best_documents_that_fit():
+    history = DomainHistory()
+    for _ in range(3):
+        history.record("https://flaky.com/page", None)
+    docs = {
+        "https://good.com/1": curated(0.9, "short snippet"),
+        "https://good.com/2": curated(0.8, "short snippet"),
+        "https://flaky.com/1": curated(0.7, "short snippet"),
+        "https://long.com/1": curated(0.6, "word " * 2000),
+        "https://has.com/1": curated(0.5, raw_content="already fetched page"),
+        "https://good.com/3": curated(0.4, "short snippet"),
+    }
+    policy = EnrichmentPolicy(budget_tokens=2500, max_doc_tokens=1000, history=history)
+    selected, decisions = policy.select(docs)
+    assert selected == ["https://good.com/1", "https://good.com/2"]
+    assert decisions == {"extract": 2, "unreliable_domain": 1, "snippet_sufficient": 1,
+                         "has_content": 1, "over_budget": 1}
+
+
+def test_policy_without_budget_extracts_every_short_snippet():
+    docs = {f"https://site{i}.com/": curated(0.5, "snippet") for i in range(4)}
+    selected, _ = EnrichmentPolicy(history=DomainHistory()).select(docs)
+    assert len(selected) == 4
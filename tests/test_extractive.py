@@ -0,0 +1,40 @@
+from backend.utils.extractive import bm25_scores, select_passages, strip_boilerplate, tokenize
+
+PAGE = (
+    "Skip to content\n"
+    "[Home](/) | [About](/about)\n\n"
+    "Acme builds industrial robots for car makers and warehouses across Europe.\n\n"
+    "© 2026 Acme. All rights reserved."
+)
+
+
+def test_strip_boilerplate_keeps_article_text():
+    assert strip_boilerplate(PAGE) == "Acme builds industrial robots for car makers and warehouses across Europe."
+
+
+def test_tokenize_mixes_latin_words_and_cjk_bigrams():
+    assert tokenize("Acme 营收增长") == ["acme", "营收", "收增", "增长"]
+
+
+def test_bm25_prefers_passages_matching_the_queries():
+    passages = ["Acme revenue and profit grew", "Acme opened an office", "Weather in Berlin"]
+    scores = bm25_scores(passages, ["Acme revenue"])
+    assert scores.argmax() == 0 and scores[2] == 0
+    assert not bm25_scores(passages, []).any()
+    selected = select_passages({"a": passages[:2], "b": passages[2:]}, ["revenue"], max_passages=1)
+    assert selected == {"a": ["Acme revenue and profit grew"], "b": ["Weather in Berlin"]}
+
+
+def test_strip_boilerplate_keeps_short_facts_headings_and_cjk():
+    page = "\n".join([
+        "Home | Products | Contact",
+        "## Funding",
+        "- 2023年完成B轮融资5亿元",
+        "Founded 2015",
+        "CEO Jane Doe",
+        "| Name | Role |",
+        "[About](/about) · [Careers](/careers)",
+    ])
+    assert strip_boilerplate(page).splitlines() == [
+        "## Funding", "- 2023年完成B轮融资5亿元", "Founded 2015", "CEO Jane Doe", "| Name | Role |"
+    ]
@@ -0,0 +1,60 @@
+import pytest
+
+from backend.graph import Graph
+from backend.utils.depth import DEPTH_PROFILES, DEPTHS, depth_profile
+
+
+@pytest.fixture(autouse=True)
+def keys(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    for name in ("EDITOR_MODE", "BRIEFING_MODE", "SEARCH_RAW_CONTENT"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_depth_profiles_share_their_settings():
+    assert DEPTHS == ("fast", "standard", "deep")
+    assert depth_profile(None) is DEPTH_PROFILES["standard"]
+    assert all(profile.keys() == DEPTH_PROFILES["standard"].keys() for profile in DEPTH_PROFILES.values())
+    with pytest.raises(ValueError):
+        depth_profile("thorough")
+
+
+def test_standard_depth_keeps_node_defaults():
+    graph = Graph(company="Acme", job_id="job")
+    researcher = graph.lanes["financial"].researcher
+    assert (researcher.max_queries, researcher.max_results, researcher.search_depth) == (4, 5, "basic")
+    assert graph.curator.max_curated_docs == 30
+    assert graph.editor.mode == "two_pass"
+    assert graph.briefing.mode == "auto"
+    assert graph.enricher.enabled
+
+
+@pytest.mark.parametrize("depth", ["fast", "deep"])
+def test_depth_preset_is_applied_to_every_node(depth):
+    profile = DEPTH_PROFILES[depth]
+    graph = Graph(company="Acme", job_id="job", depth=depth)
+    assert graph.input_state["depth"] == depth
+    assert graph.ground.crawler.max_pages == profile["site_pages"]
+    for lane in graph.lanes.values():
+        assert lane.researcher.max_queries == profile["queries"]
+        assert lane.researcher.max_results == profile["max_results"]
+        assert lane.researcher.search_depth == profile["search_depth"]
+        assert lane.researcher.search_target_docs == profile["search_target_docs"]
+        assert lane.researcher.tavily_client is graph.search_broker
+    assert graph.curator.relevance_threshold == profile["relevance_threshold"]
+    assert graph.curator.max_curated_docs == profile["max_curated_docs"]
+    assert graph.briefing.max_doc_tokens == profile["max_doc_tokens"]
+    assert graph.enricher.enabled == profile["enrich"]
+    assert graph.editor.mode == profile["editor_mode"]
+
+
+def test_categories_prune_lanes_and_sections():
+    graph = Graph(company="Acme", job_id="job", categories=["news", "company"])
+    assert set(graph.lanes) == {"company", "news"}
+    assert graph.editor.categories == graph.curator.categories == ["company", "news"]
+    assert set(graph.planner.researchers) == {"company", "news"}
+    assert {"company_lane", "news_lane"} <= set(graph.workflow.nodes)
+    assert "financial_lane" not in graph.workflow.nodes
+    with pytest.raises(ValueError):
+        Graph(company="Acme", categories=["weather"])
@@ -0,0 +1,65 @@
+import asyncio
+
+from backend.services import job_backend
+from backend.services.job_backend import InMemoryJobBackend
+
+
+def test_memory_jobs_expire_after_their_last_write(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(job_backend.time, "monotonic", lambda: now[0])
+    backend = InMemoryJobBackend(job_ttl=60)
+
+    async def scenario():
+        await backend.update_job("old", status="completed")
+        await backend.publish("old", {"type": "status_update"})
+        now[0] += 30
+        await backend.update_job("fresh", status="processing")
+        now[0] += 45
+        return await backend.get_job("old"), await backend.get_events("old"), await backend.get_job("fresh")
+
+    old, events, fresh = asyncio.run(scenario())
+    assert old is None and events == []
+    assert fresh["status"] == "processing"
+    assert "old" not in backend._event_counters
+
+
+def redis_backend():
+    from fakeredis import aioredis
+    from backend.services.job_backend import RedisJobBackend
+    return RedisJobBackend(aioredis.FakeRedis())
+
+
+def test_redis_events_are_logged_and_relayed():
+    backend = redis_backend()
+
+    async def scenario():
+        subscription = await backend.subscribe()
+        events = aiter(subscription)
+        ids = await asyncio.gather(*(backend.publish("job", {"type": "step", "n": n}) for n in range(5)))
+        relayed = [await asyncio.wait_for(anext(events), 1) for _ in range(5)]
+        await subscription.close()
+        return ids, relayed, await backend.get_events("job", after_id=2)
+
+    ids, relayed, resumed = asyncio.run(scenario())
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    assert sorted(message["event_id"] for _, message in relayed) == [1, 2, 3, 4, 5]
+    assert [event_id for event_id, _ in resumed] == [3, 4, 5]
+    assert all(message["event_id"] == event_id for event_id, message in resumed)
+
+
+def test_concurrent_redis_updates_of_a_new_job_are_all_kept():
+    backend = redis_backend()
+
+    async def scenario():
+        await asyncio.gather(
+            backend.update_job("job", status="processing"),
+            backend.update_job("job", company="Acme"),
+            backend.update_job("job", result={"step": "Research"})
+        )
+        return await backend.get_job("job")
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "processing"
+    assert job["company"] == "Acme"
+    assert job["result"] == {"step": "Research"}
+    assert job["report"] is None
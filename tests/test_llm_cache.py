@@ -0,0 +1,27 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from backend.utils import llm_cache as llm_cache_module
+from backend.utils.llm_cache import LLMCache
+
+
+def test_fingerprint_depends_on_model_messages_and_params():
+    messages = [SystemMessage(content="system"), HumanMessage(content="plan Acme")]
+    key = LLMCache.fingerprint("model", messages, temperature=0)
+    assert key == LLMCache.fingerprint("model", list(messages), temperature=0)
+    assert key != LLMCache.fingerprint("other", messages, temperature=0)
+    assert key != LLMCache.fingerprint("model", messages, temperature=0.5)
+    assert key != LLMCache.fingerprint("model", [HumanMessage(content="system"), messages[1]], temperature=0)
+
+
+def test_entries_expire_and_least_recently_used_are_evicted(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(llm_cache_module.time, "monotonic", lambda: now[0])
+    cache = LLMCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # Evicts "b", the least recently used
+    assert cache.get("b") is None
+    now[0] = 11
+    assert cache.get("a") is None and cache.get("c") is None
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,61 @@
+from backend.utils.packing import (MIN_PASSAGE_CHARS, TRUNCATION_MARKER, chunk_documents, dedupe_passages,
+                                   pack_documents, split_passages)
+from backend.utils.tokens import count_tokens
+
+PARAGRAPH = "Acme Corp sells industrial robots to car makers and logistics companies across Europe. "
+
+
+def facts(topic, count):
+    """Distinct paragraphs, so that passage dedup leaves them alone."""
+    return [f"{topic} fact {i}: the {topic} unit of Acme booked {i * 37 % 101} orders worth {i * 13} million "
+            f"dollars in region {i % 7} during quarter {i % 4 + 1} of year {2000 + i}." for i in range(count)]
+
+
+def doc(title, score, paragraphs):
+    return {"title": title, "score": score, "content": "\n\n".join(paragraphs)}
+
+
+def test_split_passages_merges_short_lines():
+    passages = split_passages("Menu\nHome\n\n" + PARAGRAPH + "\n\nShort tail")
+    assert passages[0].startswith("Menu\nHome\n")
+    assert passages[-1] == "Short tail"
+    assert all(len(passage) >= MIN_PASSAGE_CHARS for passage in passages[:-1])
+
+
+def test_dedupe_passages_drops_repeats_from_lower_ranked_docs():
+    shared = PARAGRAPH * 2
+    docs = [
+        doc("best", 0.9, [shared, "Acme was founded in 1990 in Berlin and employs about 4000 people worldwide."]),
+        doc("copy", 0.5, [shared.upper()]),
+        doc("near copy", 0.4, [shared.replace("Europe", "Europe!"), "Revenue reached 1.2 billion dollars in 2025, up 18 percent."]),
+    ]
+    deduped, removed = dedupe_passages(docs)
+    assert removed == 2
+    assert [d["title"] for d in deduped] == ["best", "near copy"]
+    assert len(deduped[1]["passages"]) == 1
+
+
+def test_pack_documents_stays_within_budget_and_favours_scores():
+    docs = [doc(f"doc {i}", score, facts(f"topic{i}", 40)) for i, score in enumerate((0.9, 0.6, 0.3))]
+    packed = pack_documents(docs, budget_tokens=1500, max_doc_tokens=2000, min_doc_tokens=200)
+    assert [d["title"] for d in packed] == ["doc 0", "doc 1", "doc 2"]
+    assert sum(d["tokens"] for d in packed) <= 1500
+    assert packed[0]["tokens"] > packed[1]["tokens"] > packed[2]["tokens"]
+    assert all(d["content"].endswith(TRUNCATION_MARKER) for d in packed)
+
+
+def test_pack_documents_keeps_short_documents_whole():
+    docs = [doc("short", 0.9, [PARAGRAPH]), doc("long", 0.5, facts("sales", 100))]
+    packed = pack_documents(docs, budget_tokens=1000, max_doc_tokens=2000, min_doc_tokens=100)
+    assert packed[0]["content"] == PARAGRAPH.strip()
+    assert packed[1]["content"].endswith(TRUNCATION_MARKER)
+    assert pack_documents([], 1000, 2000) == []
+
+
+def test_chunk_documents_keeps_every_document_within_chunks():
+    docs = [doc(f"doc {i}", 0.5, facts(f"topic{i}", 10)) for i in range(5)]
+    chunks = chunk_documents(docs, chunk_tokens=600, max_doc_tokens=300)
+    titles = [d["title"] for chunk in chunks for d in chunk]
+    assert titles == [f"doc {i}" for i in range(5)]
+    assert len(chunks) > 1
+    assert all(d["tokens"] <= 300 and count_tokens(d["content"]) <= 300 for chunk in chunks for d in chunk)
@@ -0,0 +1,38 @@
+import datetime as real_datetime
+
+import pytest
+
+from backend.nodes import planner as planner_module
+from backend.nodes.planner import QueryPlanner
+from backend.nodes.researchers import FinancialAnalyst, NewsScanner
+from backend.utils.llm_cache import LLMCache
+
+
+@pytest.fixture
+def planner(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return QueryPlanner({"financial": FinancialAnalyst(), "news": NewsScanner()}, speculative=False)
+
+
+def frozen_day(day):
+    class FrozenDatetime(real_datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 3, day)
+    return FrozenDatetime
+
+
+def test_plan_cache_key_is_stable_within_a_year(planner, monkeypatch):
+    state = {"company": "Acme", "industry": "Robotics", "hq_location": "Berlin"}
+    keys = []
+    for day in (1, 2):
+        monkeypatch.setattr(planner_module, "datetime", frozen_day(day))
+        keys.append(LLMCache.fingerprint("model", planner.build_messages(state, 4), temperature=0))
+    assert keys[0] == keys[1]
+
+
+def test_parse_plan_keeps_known_categories_and_dedupes(planner):
+    text = 'Plan: {"financial": ["Acme revenue 2026", "Acme revenue 2026 "], "news": "Acme news", "other": ["x"]}'
+    plan = planner.dedupe_plan(planner.parse_plan(text, 4))
+    assert plan == {"financial": ["Acme revenue 2026"], "news": ["Acme news"]}
@@ -0,0 +1,57 @@
+from backend.utils.report_format import dedupe_section_lines, normalize_report, split_sections
+
+MESSY = """```markdown
+# Acme Research Report
+## 新闻
+### Recent headlines
+- Acme opened a robot factory in Munich in March 2026
+## 公司概览
+• Acme builds industrial robots for car makers
+
+
+## Extra insights
++ Acme has 4000 employees across twelve countries
+## 参考文献
+* https://old.example.com
+```"""
+
+
+def test_split_sections_demotes_unknown_headings_and_drops_references():
+    sections = split_sections(MESSY)
+    assert sections["公司概览"][-2:] == ["### Extra insights", "* Acme has 4000 employees across twelve countries"]
+    assert not any("old.example.com" in line for lines in sections.values() for line in lines)
+
+
+def test_normalize_report_restores_order_and_format():
+    report = normalize_report(MESSY, "Acme", "## 参考文献\n\n* https://acme.com")
+    assert report == """# Acme 研究报告
+
+## 公司概览
+
+* Acme builds industrial robots for car makers
+
+### Extra insights
+
+* Acme has 4000 employees across twelve countries
+
+## 新闻
+
+* Acme opened a robot factory in Munich in March 2026
+
+## 参考文献
+
+* https://acme.com"""
+
+
+def test_normalize_report_limits_sections():
+    report = normalize_report(MESSY, "Acme", sections=["新闻"])
+    assert "## 公司概览" not in report and "## 新闻" in report
+
+
+def test_dedupe_section_lines_drops_facts_repeated_in_later_sections():
+    sections = dedupe_section_lines({
+        "company": "### Overview\n* Acme builds industrial robots for car makers in Europe",
+        "news": "* Acme builds industrial robots for car makers in Europe.\n* Acme opened a factory in Munich\n* Short",
+    })
+    assert sections["company"].count("*") == 1
+    assert sections["news"] == "* Acme opened a factory in Munich\n* Short"
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from backend.nodes.researchers import FinancialAnalyst, IndustryAnalyzer
+
+
+class FakeSearchClient:
+    """Records every search and answers with five results of a fixed score."""
+
+    def __init__(self, score):
+        self.score = score
+        self.queries = []
+
+    async def search(self, query, **params):
+        self.queries.append(query)
+        return {"results": [
+            {"url": f"https://example.com/{len(self.queries)}/{i}", "title": f"Result {i}",
+             "content": "Revenue grew", "score": self.score}
+            for i in range(5)
+        ]}
+
+
+@pytest.fixture
+def analyst(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return FinancialAnalyst()
+
+
+def research_state():
+    return {
+        "company": "Acme",
+        "planned_queries": {"financial": [
+            "Acme revenue 2024 annual report",
+            "Acme Series C funding valuation",
+            "Acme profit margin trend",
+            "Acme debt and cash position"
+        ]},
+        "speculative_queries": {"financial": ["Acme 融资 估值 2025", "Acme financial results revenue 2025"]},
+        "messages": []
+    }
+
+
+def test_planned_queries_are_searched_even_when_speculation_fills_the_budget(analyst):
+    client = FakeSearchClient(score=0.9)
+    analyst.tavily_client = client
+
+    result = asyncio.run(analyst.analyze(research_state()))
+
+    planned = research_state()["planned_queries"]["financial"]
+    assert planned[0] in client.queries and planned[1] in client.queries
+    # The first planned wave reached the target, so the rest is skipped
+    assert planned[2] not in client.queries
+    assert len(result["financial_data"]) == 20
+
+
+def test_poor_results_search_every_planned_query(analyst):
+    client = FakeSearchClient(score=0.1)
+    analyst.tavily_client = client
+
+    asyncio.run(analyst.analyze(research_state()))
+
+    for query in research_state()["planned_queries"]["financial"]:
+        assert query in client.queries
+
+
+def test_templates_missing_a_value_are_not_speculated(analyst):
+    analyst = IndustryAnalyzer()
+    assert analyst._fallback_queries("Acme", 2026) == ["Acme 竞争对手 市场份额"]
+    assert analyst._fallback_queries("Acme", 2026, "机器人") == ["Acme 竞争对手 市场份额", "机器人 行业趋势 市场规模 2026"]
@@ -0,0 +1,68 @@
+import asyncio
+
+from backend.services.search_broker import SearchBroker
+
+
+class CountingClient:
+    def __init__(self):
+        self.searches = []
+        self.extracts = []
+
+    async def search(self, query, **params):
+        self.searches.append((query, params))
+        await asyncio.sleep(0)
+        count = params.get("max_results", 5)
+        return {"results": [{"url": f"https://example.com/{query}/{i}"} for i in range(count)]}
+
+    async def extract(self, urls, **params):
+        self.extracts.append(urls)
+        return {"results": [{"url": urls, "raw_content": "page"}]}
+
+
+def run(broker, *calls):
+    async def scenario():
+        return await asyncio.gather(*calls)
+    return asyncio.run(scenario())
+
+
+def test_near_duplicate_queries_share_one_search():
+    client = CountingClient()
+    broker = SearchBroker(client)
+    first, second = run(
+        broker,
+        broker.search("Acme Corp revenue 2026", search_depth="basic"),
+        broker.search("acme corp revenue 2026!", search_depth="basic")
+    )
+    assert len(client.searches) == 1
+    assert first == second
+    assert broker.stats["searches_shared"] == 1
+
+
+def test_larger_search_serves_smaller_one_but_not_the_reverse():
+    client = CountingClient()
+    broker = SearchBroker(client)
+
+    async def scenario():
+        big = await broker.search("acme revenue", max_results=10, include_raw_content=True)
+        small = await broker.search("acme revenue", max_results=5)
+        bigger = await broker.search("acme revenue", max_results=20)
+        return big, small, bigger
+
+    big, small, bigger = asyncio.run(scenario())
+    assert len(client.searches) == 2
+    assert small["results"] == big["results"][:5]
+    assert len(bigger["results"]) == 20
+
+
+def test_different_topics_are_not_shared():
+    client = CountingClient()
+    broker = SearchBroker(client)
+    run(broker, broker.search("acme", topic="news"), broker.search("acme", topic="finance"))
+    assert len(client.searches) == 2
+
+
+def test_extracts_are_shared_by_url():
+    client = CountingClient()
+    broker = SearchBroker(client)
+    run(broker, broker.extract("https://acme.com"), broker.extract("https://acme.com"))
+    assert client.extracts == ["https://acme.com"]
@@ -0,0 +1,34 @@
+from backend.utils.search_budget import SearchBudget
+
+
+def results(prefix, scores):
+    return {f"https://example.com/{prefix}/{i}": {"score": score} for i, score in enumerate(scores)}
+
+
+def test_waves_and_target():
+    budget = SearchBudget(target_docs=3, wave_size=2)
+    assert budget.waves(["a", "b", "c"]) == [["a", "b"], ["c"]]
+    assert budget.record(results("w1", [0.9, 0.8, 0.1, "n/a"])) == 2
+    assert not budget.satisfied()
+    budget.record(results("w2", [0.5]))
+    assert budget.satisfied()
+
+
+def test_speculative_results_need_a_planned_wave():
+    budget = SearchBudget(target_docs=2)
+    assert budget.record(results("spec", [0.9, 0.9, 0.9]), speculative=True) == 3
+    assert not budget.satisfied()
+    budget.record({})
+    assert budget.satisfied()
+    assert budget.good_count() == 3
+
+
+def test_poor_waves_escalate_results_then_depth():
+    budget = SearchBudget(min_yield=1.0, escalated_max_results=10)
+    params = {"max_results": 5, "search_depth": "basic"}
+    assert budget.escalate(params, new_good=4, wave_queries=2) is None
+    params = budget.escalate(params, new_good=1, wave_queries=2)
+    assert params == {"max_results": 10, "search_depth": "basic"}
+    params = budget.escalate(params, new_good=0, wave_queries=2)
+    assert params == {"max_results": 10, "search_depth": "advanced"}
+    assert budget.escalate(params, new_good=0, wave_queries=2) is None
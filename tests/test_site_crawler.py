@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.services.clients import get_clients
+from backend.services.site_crawler import SiteCrawler, is_public_url, registrable_domain
+
+PUBLIC = "http://93.184.216.34"
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Serves the crawler's requests from a dict of {url: response}."""
+    responses = {}
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return responses.get(str(request.url), httpx.Response(404))
+
+    registry = get_clients()
+    monkeypatch.setitem(registry._http, "sites", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return responses, requested
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/admin",
+    "http://10.1.2.3/",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/",
+    "file:///etc/passwd",
+])
+def test_private_addresses_are_refused(url):
+    assert not asyncio.run(is_public_url(url))
+
+
+def test_registrable_domain():
+    assert registrable_domain("https://shop.example.co.uk/a") == "example.co.uk"
+    assert registrable_domain("https://www.acme.com/sitemap.xml") == "acme.com"
+
+
+def test_redirect_to_private_address_is_not_followed(site):
+    responses, requested = site
+    responses[f"{PUBLIC}/about"] = httpx.Response(302, headers={"location": "http://127.0.0.1/secret"})
+
+    assert asyncio.run(SiteCrawler(None).fetch_text(f"{PUBLIC}/about")) == ""
+    assert requested == [f"{PUBLIC}/about"]
+
+
+def test_redirects_are_capped(site):
+    responses, requested = site
+    for i in range(10):
+        responses[f"{PUBLIC}/{i}"] = httpx.Response(302, headers={"location": f"/{i + 1}"})
+
+    crawler = SiteCrawler(None)
+    assert asyncio.run(crawler.fetch_text(f"{PUBLIC}/0")) == ""
+    assert len(requested) == crawler.max_redirects + 1
+
+
+def test_nested_sitemaps_stay_on_the_site(site):
+    responses, requested = site
+    responses[f"{PUBLIC}/sitemap.xml"] = httpx.Response(200, text=(
+        "<sitemapindex>"
+        f"<sitemap><loc>{PUBLIC}/pages.xml</loc></sitemap>"
+        "<sitemap><loc>http://169.254.169.254/latest.xml</loc></sitemap>"
+        "</sitemapindex>"
+    ))
+    responses[f"{PUBLIC}/pages.xml"] = httpx.Response(200, text=f"<urlset><url><loc>{PUBLIC}/about</loc></url></urlset>")
+
+    assert asyncio.run(SiteCrawler(None).sitemap_urls(PUBLIC)) == [f"{PUBLIC}/about"]
+    assert not any("169.254" in url for url in requested)
+
+
+class FakeExtractClient:
+    def __init__(self):
+        self.urls = []
+
+    async def extract(self, url, **params):
+        self.urls.append(url)
+        return {"results": [{"raw_content": f"Content of {url}"}]}
+
+
+def test_cached_crawls_are_keyed_by_limits_and_titled_per_job(site, monkeypatch):
+    monkeypatch.setattr("backend.services.site_crawler._site_cache", None)
+    client = FakeExtractClient()
+    url = f"{PUBLIC}/"
+
+    first = asyncio.run(SiteCrawler(client, max_pages=1).crawl(url, "Acme"))
+    again = asyncio.run(SiteCrawler(client, max_pages=1).crawl(url, "Acme Holdings"))
+    asyncio.run(SiteCrawler(client, max_pages=1, max_bytes=10).crawl(url, "Acme"))
+
+    assert first[url] == {"title": "Acme", "raw_content": f"Content of {url}"}
+    assert again[url]["title"] == "Acme Holdings"
+    # The second crawl came from the cache; other limits crawl again
+    assert client.urls == [url, url]
+
+
+def test_bodies_are_read_up_to_the_byte_budget(site):
+    responses, _ = site
+    chunks = []
+
+    async def body():
+        for _ in range(1000):
+            chunks.append(1)
+            yield b"<url><loc>x</loc></url>" * 100
+
+    responses[f"{PUBLIC}/sitemap.xml"] = httpx.Response(200, content=body())
+
+    text = asyncio.run(SiteCrawler(None, max_bytes=5000).fetch_text(f"{PUBLIC}/sitemap.xml"))
+    assert len(text) == 5000
+    assert len(chunks) < 10
@@ -0,0 +1,27 @@
+from backend.utils.site_index import SiteIndex
+
+PAGES = {
+    "https://acme.com/": {"title": "Acme", "raw_content": (
+        "Skip to content\n"
+        "[Home](/) | [About](/about)\n\n"
+        "Acme builds industrial robots for car makers and warehouses across Europe.\n\n"
+        "© 2026 Acme. All rights reserved."
+    )},
+    "https://acme.com/investors": {"title": "Acme - Investors", "raw_content": (
+        "Acme revenue grew 18 percent to 1.2 billion dollars in the 2025 fiscal year.\n\n"
+        "The board proposed a dividend of 0.40 dollars per share for shareholders."
+    )},
+}
+
+
+def test_site_index_routes_passages_into_page_documents():
+    site = SiteIndex(PAGES)
+    assert len(site) == 2
+    indices = site.route(["Acme revenue dividend"], max_passages=1)
+    documents = site.documents(indices)
+    assert list(documents) == ["https://acme.com/investors"]
+    investors = documents["https://acme.com/investors"]
+    assert investors["title"] == "Acme - Investors"
+    assert investors["site_passages"] == indices
+    assert "dividend" in investors["raw_content"] and "revenue" in investors["raw_content"]
+    assert SiteIndex({}).route(["Acme"], 5) == []
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+import pytest
+from tavily.errors import UsageLimitExceededError
+
+from backend.services.tavily_client import ResilientTavilyClient, is_transient
+
+
+class FlakyTavily:
+    """Fails with the given errors in turn, then answers."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def search(self, query, **params):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"results": [{"url": "https://example.com"}]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+    return ResilientTavilyClient(backoff_base=0, backoff_cap=0)
+
+
+def test_transient_errors():
+    response = httpx.Response(503, request=httpx.Request("POST", "https://api.tavily.com/search"))
+    assert is_transient(httpx.HTTPStatusError("unavailable", request=response.request, response=response))
+    assert is_transient(asyncio.TimeoutError())
+    assert not is_transient(UsageLimitExceededError("This request exceeds your plan's set usage limit."))
+    assert is_transient(UsageLimitExceededError("Too many requests."))
+    assert not is_transient(ValueError("bad query"))
+
+
+def test_timeouts_are_retried(client):
+    client.client = FlakyTavily(asyncio.TimeoutError())
+    assert asyncio.run(client.search("acme"))["results"]
+    assert client.client.calls == 2
+
+
+def test_usage_limit_is_not_retried(client):
+    client.client = FlakyTavily(UsageLimitExceededError("This request exceeds your plan's set usage limit."))
+    with pytest.raises(UsageLimitExceededError):
+        asyncio.run(client.search("acme"))
+    assert client.client.calls == 1
+
+
+def test_rate_limiting_is_retried_a_bounded_number_of_times(client):
+    client.client = FlakyTavily(UsageLimitExceededError("Too many requests."))
+    assert asyncio.run(client.search("acme"))["results"]
+    assert client.client.calls == 2
+
+    client.client = FlakyTavily(*[UsageLimitExceededError("Too many requests.")] * 5)
+    with pytest.raises(UsageLimitExceededError):
+        asyncio.run(client.search("acme"))
+    assert client.client.calls == client.max_attempts
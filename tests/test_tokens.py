@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from backend.utils import tokens
+
+
+class FakeTokenizer:
+    pass
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(tokens, "_tokenizer", None)
+    monkeypatch.setattr(tokens, "_load_task", None)
+    monkeypatch.setattr(tokens, "_retry_at", 0.0)
+
+
+def test_tokenizer_loads_in_the_background(fresh, monkeypatch):
+    monkeypatch.setattr(tokens, "_load", FakeTokenizer)
+
+    async def scenario():
+        first = tokens.get_tokenizer()
+        await tokens.start_loading_tokenizer()
+        return first, tokens.get_tokenizer()
+
+    first, loaded = asyncio.run(scenario())
+    assert first is None
+    assert isinstance(loaded, FakeTokenizer)
+
+
+def test_failed_load_estimates_and_retries_later(fresh, monkeypatch):
+    now = [100.0]
+    attempts = []
+
+    def failing_load():
+        attempts.append(now[0])
+        raise OSError("offline")
+
+    monkeypatch.setattr(tokens, "_load", failing_load)
+    monkeypatch.setattr(tokens.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        await tokens.start_loading_tokenizer()
+        assert tokens.start_loading_tokenizer() is None  # Backing off
+        assert tokens.count_tokens("abcdefgh") == 2
+        now[0] += tokens.RETRY_SECONDS
+        monkeypatch.setattr(tokens, "_load", FakeTokenizer)
+        await tokens.start_loading_tokenizer()
+
+    asyncio.run(scenario())
+    assert attempts == [100.0]
+    assert isinstance(tokens.get_tokenizer(), FakeTokenizer)
+
+
+def test_estimate_counts_cjk_per_character(fresh):
+    # No running event loop, so nothing is loaded
+    assert tokens.get_tokenizer() is None
+    assert tokens.count_tokens("营收增长") == 4
+    assert tokens.truncate_to_tokens("营收增长很快", 3) == "营收增"
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+from backend.services.job_backend import InMemoryJobBackend, RedisJobBackend
+from backend.services.websocket_manager import WebSocketManager
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def test_events_published_on_one_worker_reach_sockets_on_another():
+    from fakeredis import FakeServer, aioredis
+
+    async def scenario():
+        server = FakeServer()
+        publisher = WebSocketManager(RedisJobBackend(aioredis.FakeRedis(server=server)))
+        relay = WebSocketManager(RedisJobBackend(aioredis.FakeRedis(server=server)))
+        socket = FakeSocket()
+        await relay.connect(socket, "job")
+        async with relay.listen("job") as queue:
+            await publisher.send_status_update("job", status="processing", message="Searching")
+            woken = await asyncio.wait_for(queue.get(), 1)
+        for _ in range(100):
+            if socket.sent:
+                break
+            await asyncio.sleep(0.01)
+        events = await relay.get_events("job")
+        await publisher.stop()
+        await relay.stop()
+        return socket.sent, woken, events
+
+    sent, woken, events = asyncio.run(scenario())
+    assert [message["data"]["message"] for message in sent] == ["Searching"]
+    assert sent[0]["event_id"] == woken["event_id"] == 1
+    assert [event_id for event_id, _ in events] == [1]
+
+
+class BrokenSubscription:
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise ConnectionError("connection lost")
+
+    async def close(self):
+        pass
+
+
+class FlakyBackend(InMemoryJobBackend):
+    """Hands out a subscription that fails before the working ones."""
+
+    def __init__(self):
+        super().__init__()
+        self.subscriptions = 0
+
+    async def subscribe(self):
+        self.subscriptions += 1
+        if self.subscriptions == 1:
+            return BrokenSubscription()
+        return await super().subscribe()
+
+
+def test_relay_resubscribes_after_the_event_stream_fails(monkeypatch):
+    monkeypatch.setattr("backend.services.websocket_manager.RELAY_RETRY_SECONDS", 0.01)
+
+    async def scenario():
+        backend = FlakyBackend()
+        manager = WebSocketManager(backend)
+        async with manager.listen("job") as queue:
+            while backend.subscriptions < 2:
+                await asyncio.sleep(0.01)
+            await manager.send_status_update("job", status="processing", message="Searching")
+            woken = await asyncio.wait_for(queue.get(), 1)
+        # A relay task that has finished is started again
+        manager._relay_task.cancel()
+        await asyncio.sleep(0)
+        await manager.start()
+        restarted = not manager._relay_task.done()
+        await manager.stop()
+        return woken, restarted
+
+    woken, restarted = asyncio.run(scenario())
+    assert woken["data"]["message"] == "Searching"
+    assert restarted